@@ -0,0 +1,11 @@
+"""Benchmarks for caldera.
+
+Run with ``python -m caldera.bench`` or ``pytest --benchmark -m benchmark``.
+"""
+from caldera.bench import data
+from caldera.bench import models
+from caldera.bench.core import benchmark
+from caldera.bench.core import Case
+from caldera.bench.core import compare
+from caldera.bench.core import registry
+from caldera.bench.core import run
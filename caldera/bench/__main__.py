@@ -0,0 +1,58 @@
+import argparse
+import json
+import sys
+
+from caldera.bench import compare
+from caldera.bench import registry
+from caldera.bench import run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m caldera.bench", description="Run caldera benchmarks."
+    )
+    parser.add_argument(
+        "suites", nargs="*", help="suites to run {}".format(sorted(registry))
+    )
+    parser.add_argument("-k", "--name", action="append", help="benchmark name(s)")
+    parser.add_argument("-o", "--output", help="path to write JSON results")
+    parser.add_argument("-r", "--repeats", type=int, default=5)
+    parser.add_argument("-w", "--warmup", type=int, default=1)
+    parser.add_argument(
+        "--quick", action="store_true", help="only run the smallest parameters"
+    )
+    parser.add_argument("--compare", help="baseline JSON results to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="median time ratio to flag as a regression",
+    )
+    args = parser.parse_args(argv)
+
+    report = run(
+        suites=args.suites or None,
+        names=args.name,
+        repeats=args.repeats,
+        warmup=args.warmup,
+        quick=args.quick,
+        output=args.output,
+        verbose=True,
+    )
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, threshold=args.threshold)
+        for r in regressions:
+            print(
+                "REGRESSION {suite}.{name} {params}: {baseline:.6f}s -> {current:.6f}s"
+                " ({ratio:.2f}x)".format(**r)
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""core.py.
+
+Benchmark registry, runner and regression comparison.
+"""
+import itertools
+import json
+import platform
+import statistics
+import time
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+import torch
+
+
+class Case(NamedTuple):
+    """A single benchmark case returned by a benchmark setup function.
+
+    :param fn: the function to time
+    :param before: optional function called (untimed) before each timed call
+    :param counts: optional counts (e.g. {'graphs': 100}) processed by a
+        single call of `fn`, reported as '<count>_per_sec' throughput
+    """
+
+    fn: Callable[[], Any]
+    before: Optional[Callable[[], Any]] = None
+    counts: Optional[Dict[str, int]] = None
+
+
+class Benchmark:
+    def __init__(
+        self,
+        suite: str,
+        name: str,
+        setup: Callable[..., Case],
+        params: Dict[str, List[Any]],
+    ):
+        """A benchmark over a grid of parameters.
+
+        :param suite: name of the benchmark suite
+        :param name: name of the benchmark
+        :param setup: function that accepts one value for each parameter and returns a :class:`Case`
+        :param params: parameter grid
+        """
+        self.suite = suite
+        self.name = name
+        self.setup = setup
+        self.params = params
+
+    def grid(self, quick: bool = False) -> List[Dict[str, Any]]:
+        """Return the parameter grid. In quick mode, only the first value of
+        each parameter is used."""
+        keys = list(self.params)
+        values = [self.params[k][:1] if quick else self.params[k] for k in keys]
+        return [dict(zip(keys, v)) for v in itertools.product(*values)]
+
+    def __repr__(self):
+        return "{}({}.{})".format(self.__class__.__name__, self.suite, self.name)
+
+
+registry: Dict[str, List[Benchmark]] = {}
+
+
+def benchmark(suite: str, **params: List[Any]) -> Callable:
+    """Decorator to register a benchmark setup function.
+
+    Usage:
+
+    .. code-block:: python
+
+        @benchmark("data", n_graphs=[10, 100])
+        def from_data_list(n_graphs):
+            datalist = [GraphData.random(5, 4, 3) for _ in range(n_graphs)]
+            return Case(lambda: GraphBatch.from_data_list(datalist))
+
+    :param suite: name of the benchmark suite
+    :param params: parameter grid
+    :return: decorator
+    """
+
+    def wrapped(f):
+        registry.setdefault(suite, []).append(Benchmark(suite, f.__name__, f, params))
+        return f
+
+    return wrapped
+
+
+def reset_peak_rss() -> bool:
+    """Reset the peak resident set size of this process reported by
+    :func:`peak_rss_mb` (and by `resource.getrusage`). Linux only.
+
+    :return: whether the peak was reset
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process since the last
+    :func:`reset_peak_rss`, in megabytes (None if not available)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return None
+
+
+def time_case(case: Case, repeats: int, warmup: int = 1) -> List[float]:
+    """Time a benchmark case.
+
+    :param case: the case
+    :param repeats: number of timed calls
+    :param warmup: number of untimed calls
+    :return: list of times in seconds
+    """
+    times = []
+    for i in range(warmup + repeats):
+        if case.before is not None:
+            case.before()
+        t0 = time.perf_counter()
+        case.fn()
+        t = time.perf_counter() - t0
+        if i >= warmup:
+            times.append(t)
+    return times
+
+
+def run_benchmark(
+    bench: Benchmark, repeats: int = 5, warmup: int = 1, quick: bool = False
+) -> List[Dict[str, Any]]:
+    """Run a benchmark over its parameter grid.
+
+    :param bench: the benchmark
+    :param repeats: number of timed calls per parameter set
+    :param warmup: number of untimed calls per parameter set
+    :param quick: only run the first value of each parameter
+    :return: list of results. `peak_rss_mb` is the peak resident set size
+        of the process while the case is run, so it can be compared between
+        cases (None where the peak cannot be reset, i.e. off Linux).
+    """
+    results = []
+    for params in bench.grid(quick):
+        case = bench.setup(**params)
+        reset = reset_peak_rss()
+        times = time_case(case, repeats, warmup)
+        peak = peak_rss_mb() if reset else None
+        median = statistics.median(times)
+        result = {
+            "suite": bench.suite,
+            "name": bench.name,
+            "params": params,
+            "repeats": repeats,
+            "min": min(times),
+            "median": median,
+            "mean": statistics.mean(times),
+            "peak_rss_mb": peak,
+        }
+        for k, v in (case.counts or {}).items():
+            result[k] = v
+            result["{}_per_sec".format(k)] = v / median if median else float("inf")
+        results.append(result)
+    return results
+
+
+def metadata() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "torch": torch.__version__,
+        "num_threads": torch.get_num_threads(),
+        "timestamp": time.time(),
+    }
+
+
+def run(
+    suites: Optional[List[str]] = None,
+    names: Optional[List[str]] = None,
+    repeats: int = 5,
+    warmup: int = 1,
+    quick: bool = False,
+    output: Optional[str] = None,
+    verbose: bool = False,
+) -> Dict[str, Any]:
+    """Run registered benchmarks.
+
+    :param suites: suites to run (default: all)
+    :param names: benchmark names to run (default: all)
+    :param repeats: number of timed calls per parameter set
+    :param warmup: number of untimed calls per parameter set
+    :param quick: only run the first value of each parameter
+    :param output: optional path to write JSON results to
+    :param verbose: print each result
+    :return: dictionary of metadata and results
+    """
+    if suites is None:
+        suites = sorted(registry)
+    for suite in suites:
+        if suite not in registry:
+            raise ValueError(
+                "Suite '{}' not one of the registered suites {}".format(
+                    suite, sorted(registry)
+                )
+            )
+    results = []
+    for suite in suites:
+        for bench in registry[suite]:
+            if names and bench.name not in names:
+                continue
+            for result in run_benchmark(bench, repeats, warmup, quick):
+                if verbose:
+                    print("{suite}.{name} {params}: {median:.6f}s".format(**result))
+                results.append(result)
+    report = {"meta": metadata(), "results": results}
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+def _key(result: Dict[str, Any]) -> Tuple[str, str, str]:
+    return (
+        result["suite"],
+        result["name"],
+        json.dumps(result["params"], sort_keys=True),
+    )
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 1.2
+) -> List[Dict[str, Any]]:
+    """Compare two benchmark reports and return regressions, i.e. results
+    whose median time increased by more than `threshold` times.
+
+    :param baseline: baseline report
+    :param current: current report
+    :param threshold: ratio of current to baseline median time to flag
+    :return: list of regressions
+    """
+    base = {_key(r): r for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        b = base.get(_key(r), None)
+        if b is None or not b["median"]:
+            continue
+        ratio = r["median"] / b["median"]
+        if ratio > threshold:
+            regressions.append(
+                {
+                    "suite": r["suite"],
+                    "name": r["name"],
+                    "params": r["params"],
+                    "baseline": b["median"],
+                    "current": r["median"],
+                    "ratio": ratio,
+                }
+            )
+    return regressions
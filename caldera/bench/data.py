@@ -0,0 +1,167 @@
+"""data.py.
+
+Benchmarks for the `caldera.data` batching primitives.
+"""
+import torch
+
+from caldera import utils
+from caldera.bench.core import benchmark
+from caldera.bench.core import Case
+from caldera.bench.synthetic import random_batch
+from caldera.bench.synthetic import random_data
+from caldera.bench.synthetic import random_data_list
+from caldera.data import ClusterLoader
+from caldera.data import GraphBatch
+from caldera.data import GraphBatchBuilder
+from caldera.data import GraphData
+from caldera.data import NeighborSampler
+
+SUITE = "data"
+
+n_graphs = [10, 100, 1000]
+n_nodes = [10, 100]
+degree = 4
+
+
+@benchmark(SUITE, n_graphs=n_graphs, n_nodes=n_nodes)
+def from_data_list(n_graphs, n_nodes):
+    datalist = random_data_list(n_graphs, n_nodes, n_nodes * degree)
+    return Case(
+        lambda: GraphBatch.from_data_list(datalist),
+        counts={"graphs": n_graphs, "edges": n_graphs * n_nodes * degree},
+    )
+
+
+@benchmark(SUITE, n_graphs=n_graphs, n_nodes=n_nodes)
+def batch_builder(n_graphs, n_nodes):
+    datalist = random_data_list(n_graphs, n_nodes, n_nodes * degree)
+    return Case(
+        lambda: GraphBatchBuilder().extend(datalist).build(),
+        counts={"graphs": n_graphs, "edges": n_graphs * n_nodes * degree},
+    )
+
+
+@benchmark(SUITE, n_graphs=n_graphs, n_nodes=n_nodes)
+def to_data_list(n_graphs, n_nodes):
+    batch = random_batch(n_graphs, n_nodes, n_nodes * degree)
+    return Case(
+        batch.to_data_list,
+        counts={"graphs": n_graphs, "edges": n_graphs * n_nodes * degree},
+    )
+
+
+@benchmark(SUITE, n_graphs=n_graphs, n_nodes=n_nodes)
+def append_nodes(n_graphs, n_nodes):
+    batch = random_batch(n_graphs, n_nodes, n_nodes * degree)
+    node_attr = torch.randn(n_graphs, batch.x.shape[1])
+    node_idx = torch.arange(n_graphs)
+    state = {}
+
+    def before():
+        state["batch"] = batch.clone()
+
+    return Case(
+        lambda: state["batch"].append_nodes(node_attr, node_idx),
+        before=before,
+        counts={"graphs": n_graphs},
+    )
+
+
+@benchmark(SUITE, n_graphs=n_graphs, n_nodes=n_nodes)
+def append_edges(n_graphs, n_nodes):
+    batch = random_batch(n_graphs, n_nodes, n_nodes * degree)
+    edge_attr = torch.randn(n_graphs, batch.e.shape[1])
+    edge_idx = torch.arange(n_graphs)
+    edges = (edge_idx * n_nodes).repeat(2, 1)
+    state = {}
+
+    def before():
+        state["batch"] = batch.clone()
+
+    return Case(
+        lambda: state["batch"].append_edges(edge_attr, edges, edge_idx),
+        before=before,
+        counts={"graphs": n_graphs},
+    )
+
+
+@benchmark(SUITE, n_items=[1000, 100000], n_groups=[10, 1000])
+def scatter_group(n_items, n_groups):
+    x = torch.randn(n_items, 8)
+    idx = torch.randint(0, n_groups, (n_items,))
+    return Case(lambda: utils.scatter_group(x, idx), counts={"items": n_items})
+
+
+@benchmark(SUITE, n_graphs=[10, 100], n_nodes=n_nodes)
+def to_networkx(n_graphs, n_nodes):
+    datalist = random_data_list(n_graphs, n_nodes, n_nodes * degree)
+    return Case(
+        lambda: [data.to_networkx() for data in datalist],
+        counts={"graphs": n_graphs},
+    )
+
+
+@benchmark(SUITE, n_graphs=[10, 100], n_nodes=n_nodes)
+def to_networkx_list(n_graphs, n_nodes):
+    batch = random_batch(n_graphs, n_nodes, n_nodes * degree)
+    return Case(batch.to_networkx_list, counts={"graphs": n_graphs})
+
+
+@benchmark(SUITE, n_graphs=[10, 100], n_nodes=n_nodes)
+def from_networkx(n_graphs, n_nodes):
+    graphs = [
+        data.to_networkx()
+        for data in random_data_list(n_graphs, n_nodes, n_nodes * degree)
+    ]
+    for g in graphs:
+        for _, ndata in g.nodes(data=True):
+            ndata["features"] = ndata["features"].numpy()
+        for _, _, edata in g.edges(data=True):
+            edata["features"] = edata["features"].numpy()
+        g.data["features"] = g.data["features"].numpy()
+    return Case(
+        lambda: [GraphData.from_networkx(g) for g in graphs],
+        counts={"graphs": n_graphs},
+    )
+
+
+@benchmark(SUITE, n_graphs=n_graphs, n_nodes=n_nodes)
+def topological_levels(n_graphs, n_nodes):
+    batch = random_batch(n_graphs, n_nodes, n_nodes * degree)
+    edges = torch.stack([batch.edges.min(0)[0], batch.edges.max(0)[0]])
+    return Case(
+        lambda: utils.topological_levels(edges, batch.num_nodes),
+        counts={"graphs": n_graphs, "edges": n_graphs * n_nodes * degree},
+    )
+
+
+@benchmark(SUITE, n_nodes=[10000, 100000], batch_size=[64, 512])
+def neighbor_sample(n_nodes, batch_size):
+    sampler = NeighborSampler(
+        random_data(n_nodes, n_nodes * degree), fanouts=[10, 5], seed=0
+    )
+    seeds = torch.randint(0, n_nodes, (batch_size,))
+    return Case(lambda: sampler.sample(seeds), counts={"seeds": batch_size})
+
+
+@benchmark(SUITE, n_nodes=[10000, 100000], n_parts=[16, 256])
+def partition(n_nodes, n_parts):
+    edges = random_data(n_nodes, n_nodes * degree).edges
+    return Case(
+        lambda: utils.partition(edges, n_nodes, n_parts, seed=0),
+        counts={"edges": n_nodes * degree},
+    )
+
+
+@benchmark(SUITE, n_nodes=[10000, 100000], clusters_per_batch=[4, 32])
+def cluster_sample(n_nodes, clusters_per_batch):
+    loader = ClusterLoader(
+        random_data(n_nodes, n_nodes * degree),
+        n_parts=256,
+        clusters_per_batch=clusters_per_batch,
+        seed=0,
+    )
+    clusters = torch.arange(clusters_per_batch)
+    return Case(
+        lambda: loader.sample(clusters), counts={"clusters": clusters_per_batch}
+    )
@@ -0,0 +1,179 @@
+"""models.py.
+
+Throughput benchmarks for `EncodeCoreDecode`, `GraphCore` and the
+aggregating blocks.
+"""
+import torch
+
+from caldera.bench.core import benchmark
+from caldera.bench.core import Case
+from caldera.bench.synthetic import n_edges_for_density
+from caldera.bench.synthetic import random_batch
+from caldera.blocks import AggregatingEdgeBlock
+from caldera.blocks import AggregatingGlobalBlock
+from caldera.blocks import AggregatingNodeBlock
+from caldera.blocks import Aggregator
+from caldera.blocks import Flex
+from caldera.blocks import MLP
+from caldera.data import GraphBatch
+from caldera.models import EncodeCoreDecode
+from caldera.models import GraphCore
+
+SUITE = "models"
+
+n_graphs = 32
+n_nodes = 32
+n_feat = 8
+
+latent_sizes = [16, 128]
+densities = [0.05, 0.2]
+aggregators = ["add", "mean", "max"]
+modes = ["forward", "backward"]
+
+
+def _batch(density: float) -> GraphBatch:
+    n_edges = n_edges_for_density(n_nodes, density)
+    return random_batch(n_graphs, n_nodes, n_edges, n_feat, n_feat, n_feat)
+
+
+def _loss(out) -> torch.Tensor:
+    if isinstance(out, torch.Tensor):
+        return out.sum()
+    elif isinstance(out, list):
+        return sum(_loss(o) for o in out)
+    return out.e.sum() + out.x.sum() + out.g.sum()
+
+
+def _case(model: torch.nn.Module, mode: str, batch: GraphBatch, f) -> Case:
+    """Create a case for the forward (no grad) or forward + backward pass.
+
+    :param model: the network
+    :param mode: 'forward' or 'backward'
+    :param batch: input batch
+    :param f: function of (model, batch) that runs the forward pass
+    :return: benchmark case
+    """
+    counts = {"graphs": batch.num_graphs, "edges": batch.e.shape[0]}
+    # resolve flexible dimensions, so timed calls do not construct layers
+    with torch.no_grad():
+        f(model, batch)
+    if mode == "forward":
+        model.eval()
+
+        def run():
+            with torch.no_grad():
+                f(model, batch)
+
+    elif mode == "backward":
+        model.train()
+
+        def run():
+            model.zero_grad()
+            _loss(f(model, batch)).backward()
+
+    else:
+        raise ValueError("Mode '{}' not one of {}".format(mode, modes))
+    return Case(run, counts=counts)
+
+
+def _mlp(latent_size: int):
+    return Flex(MLP)(Flex.d(), latent_size, latent_size)
+
+
+def _graph_core(latent_size: int, aggregator: str) -> GraphCore:
+    return GraphCore(
+        AggregatingEdgeBlock(_mlp(latent_size)),
+        AggregatingNodeBlock(_mlp(latent_size), Aggregator(aggregator)),
+        AggregatingGlobalBlock(
+            _mlp(latent_size),
+            edge_aggregator=Aggregator(aggregator),
+            node_aggregator=Aggregator(aggregator),
+        ),
+        pass_global_to_edge=True,
+        pass_global_to_node=True,
+    )
+
+
+@benchmark(SUITE, latent_size=latent_sizes, steps=[1, 5], density=densities, mode=modes)
+def encode_core_decode(latent_size, steps, density, mode):
+    model = EncodeCoreDecode(latent_sizes=(latent_size, latent_size, latent_size))
+    model.resolve(n_feat, n_feat, n_feat)
+    return _case(model, mode, _batch(density), lambda m, b: m(b, steps))
+
+
+@benchmark(
+    SUITE,
+    latent_size=latent_sizes,
+    aggregator=aggregators,
+    density=densities,
+    mode=modes,
+)
+def graph_core(latent_size, aggregator, density, mode):
+    model = _graph_core(latent_size, aggregator)
+    model.resolve(n_feat, n_feat, n_feat)
+    return _case(model, mode, _batch(density), lambda m, b: m(b))
+
+
+@benchmark(SUITE, latent_size=latent_sizes, density=densities, mode=modes)
+def aggregating_edge_block(latent_size, density, mode):
+    model = AggregatingEdgeBlock(_mlp(latent_size))
+
+    def f(m, b):
+        return m(
+            edge_attr=b.e,
+            node_attr=b.x,
+            edges=b.edges,
+            global_attr=b.g,
+            edge_idx=b.edge_idx,
+        )
+
+    return _case(model, mode, _batch(density), f)
+
+
+@benchmark(
+    SUITE,
+    latent_size=latent_sizes,
+    aggregator=aggregators,
+    density=densities,
+    mode=modes,
+)
+def aggregating_node_block(latent_size, aggregator, density, mode):
+    model = AggregatingNodeBlock(_mlp(latent_size), Aggregator(aggregator))
+
+    def f(m, b):
+        return m(
+            node_attr=b.x,
+            edge_attr=b.e,
+            edges=b.edges,
+            global_attr=b.g,
+            node_idx=b.node_idx,
+        )
+
+    return _case(model, mode, _batch(density), f)
+
+
+@benchmark(
+    SUITE,
+    latent_size=latent_sizes,
+    aggregator=aggregators,
+    density=densities,
+    mode=modes,
+)
+def aggregating_global_block(latent_size, aggregator, density, mode):
+    model = AggregatingGlobalBlock(
+        _mlp(latent_size),
+        edge_aggregator=Aggregator(aggregator),
+        node_aggregator=Aggregator(aggregator),
+    )
+
+    def f(m, b):
+        return m(
+            global_attr=b.g,
+            node_attr=b.x,
+            edge_attr=b.e,
+            edges=b.edges,
+            node_idx=b.node_idx,
+            edge_idx=b.edge_idx,
+        )
+
+    return _case(model, mode, _batch(density), f)
@@ -0,0 +1,59 @@
+"""synthetic.py.
+
+Synthetic graphs with controlled sizes for benchmarks.
+"""
+from typing import List
+
+import torch
+
+from caldera.data import GraphBatch
+from caldera.data import GraphData
+
+
+def n_edges_for_density(n_nodes: int, density: float) -> int:
+    """Number of directed edges for a graph with the given density."""
+    return max(1, int(round(density * n_nodes * max(n_nodes - 1, 1))))
+
+
+def random_data(
+    n_nodes: int, n_edges: int, n_feat: int = 8, e_feat: int = 8, g_feat: int = 8
+) -> GraphData:
+    return GraphData(
+        torch.randn(n_nodes, n_feat),
+        torch.randn(n_edges, e_feat),
+        torch.randn(1, g_feat),
+        torch.randint(0, n_nodes, (2, n_edges)),
+    )
+
+
+def random_data_list(
+    n_graphs: int,
+    n_nodes: int,
+    n_edges: int,
+    n_feat: int = 8,
+    e_feat: int = 8,
+    g_feat: int = 8,
+    seed: int = 0,
+) -> List[GraphData]:
+    """Create a list of random graphs with a fixed number of nodes and
+    edges."""
+    torch.manual_seed(seed)
+    return [
+        random_data(n_nodes, n_edges, n_feat, e_feat, g_feat) for _ in range(n_graphs)
+    ]
+
+
+def random_batch(
+    n_graphs: int,
+    n_nodes: int,
+    n_edges: int,
+    n_feat: int = 8,
+    e_feat: int = 8,
+    g_feat: int = 8,
+    seed: int = 0,
+) -> GraphBatch:
+    """Create a batch of random graphs with a fixed number of nodes and
+    edges."""
+    return GraphBatch.from_data_list(
+        random_data_list(n_graphs, n_nodes, n_edges, n_feat, e_feat, g_feat, seed)
+    )
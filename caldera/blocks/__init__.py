@@ -8,3 +8,5 @@ from caldera.blocks.global_block import GlobalBlock
 from caldera.blocks.mlp import MLP
 from caldera.blocks.node_block import AggregatingNodeBlock
 from caldera.blocks.node_block import NodeBlock
+from caldera.blocks.normalize import GraphNormalize
+from caldera.blocks.normalize import Normalize
@@ -30,6 +30,26 @@ class AggregatorBase(nn.Module):
         "add": torch_scatter.scatter_add,
     }
 
+    # reduced precision inputs are accumulated in float32
+    low_precision_dtypes = (torch.float16, torch.bfloat16)
+
+    @classmethod
+    def aggregate(cls, aggregator: str, x, indices, **kwargs):
+        """Apply the aggregation function. Reduced precision inputs (e.g. from
+        `torch.autocast`) are accumulated in float32 and cast back to the
+        input dtype.
+
+        :param aggregator: name of the aggregation function
+        :param x: values to aggregate
+        :param indices: indices to aggregate by
+        :param kwargs: scatter function keyword arguments
+        :return: aggregated values
+        """
+        func = cls.valid_aggregators[aggregator]
+        if x.dtype in cls.low_precision_dtypes:
+            return func(x.float(), indices, **kwargs).to(x.dtype)
+        return func(x, indices, **kwargs)
+
 
 # TODO: make aggregation selection trainable
 class Aggregator(AggregatorBase):
@@ -50,9 +70,7 @@ class Aggregator(AggregatorBase):
     def forward(self, x, indices, **kwargs):
         func_kwargs = dict(self.kwargs)
         func_kwargs.update(kwargs)
-        func = self.valid_aggregators[self.aggregator]
-        result = func(x, indices, **func_kwargs)
-        return result
+        return self.aggregate(self.aggregator, x, indices, **func_kwargs)
 
     @staticmethod
     @wraps(torch_scatter.scatter_max)
@@ -121,7 +139,7 @@ class MultiAggregator(AggregatorBase):
         weights = self.layers(x)
 
         # match shape of aggregated matrix
-        scatter_weights = self.valid_aggregators["add"](weights, indices, **func_kwargs)
+        scatter_weights = self.aggregate("add", weights, indices, **func_kwargs)
 
         # weight each 'function' by the learned weights
         return torch.sum(
@@ -1,6 +1,7 @@
 from functools import wraps
 from typing import Any
 from typing import Dict
+from typing import List
 from typing import Tuple
 from typing import Type
 
@@ -49,6 +50,7 @@ class FlexBlock(torch.nn.Module):
         self.args = args
         self.kwargs = kwargs
         self.resolved_module = None
+        self.resolved_dims = None
         self._apply_history = None
         self.__resolved = False
 
@@ -83,6 +85,29 @@ class FlexBlock(torch.nn.Module):
     def resolve(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]):
         resolved_args = self.resolve_args(args, kwargs)
         resolved_kwargs = self.resolve_kwargs(args, kwargs)
+        self._build(resolved_args, resolved_kwargs)
+
+    def resolve_dims(self, dims: List[int]):
+        """Resolve this block from explicit values for each of its flexible
+        dimensions (in the order they appear in the initialization
+        arguments), without an example.
+
+        :param dims: list of resolved dimensions
+        :return: None
+        """
+        n_flex = len([a for a in self.args if isinstance(a, FlexDim)])
+        if len(dims) != n_flex:
+            raise ValueError(
+                "Expected {} flexible dimension(s) but got {}".format(n_flex, dims)
+            )
+        dims = iter(dims)
+        resolved_args = [next(dims) if isinstance(a, FlexDim) else a for a in self.args]
+        self._build(resolved_args, self.kwargs)
+
+    def _build(self, resolved_args: List[Any], resolved_kwargs: Dict[str, Any]):
+        self.resolved_dims = [
+            int(v) for a, v in zip(self.args, resolved_args) if isinstance(a, FlexDim)
+        ]
         self.__resolved = True
         self.resolved_module = self.module(*resolved_args, **resolved_kwargs)
         if self._apply_history:
@@ -179,3 +204,52 @@ class Flex:
         :return: initialized torch.nn.Module
         """
         return FlexBlock(self.module_type, *args, **kwargs)
+
+    @staticmethod
+    def spec(module: torch.nn.Module) -> Dict[str, List[int]]:
+        """Return the resolved dimensions of every `FlexBlock` in the module,
+        keyed by module name. The spec is JSON serializable and can be saved
+        alongside a checkpoint so that a freshly constructed model can be
+        resolved (and have its state dict loaded) without an example.
+
+        Usage:
+
+        .. code-block:: python
+
+            torch.save({"spec": Flex.spec(model), "state": model.state_dict()}, path)
+
+            checkpoint = torch.load(path)
+            model = EncodeCoreDecode()
+            Flex.load_spec(model, checkpoint["spec"])
+            model.load_state_dict(checkpoint["state"])
+
+        :param module: module containing `FlexBlock` modules
+        :return: dictionary of module names to resolved dimensions
+        """
+        spec = {}
+        for name, m in module.named_modules():
+            if isinstance(m, FlexBlock):
+                if not m.is_resolved:
+                    raise CalderaNetsException(
+                        "Cannot create spec. Module '{}' is not resolved.".format(name)
+                    )
+                spec[name] = list(m.resolved_dims)
+        return spec
+
+    @staticmethod
+    def load_spec(module: torch.nn.Module, spec: Dict[str, List[int]]):
+        """Resolve every unresolved `FlexBlock` in the module from a spec
+        created by :meth:`Flex.spec`.
+
+        :param module: module containing `FlexBlock` modules
+        :param spec: dictionary of module names to resolved dimensions
+        :return: the module
+        """
+        for name, m in list(module.named_modules()):
+            if isinstance(m, FlexBlock) and not m.is_resolved:
+                if name not in spec:
+                    raise CalderaNetsException(
+                        "Module '{}' is missing from the spec.".format(name)
+                    )
+                m.resolve_dims(spec[name])
+        return module
@@ -1,11 +1,18 @@
+import statistics
+import time
 from typing import Callable
+from typing import Dict
 from typing import List
 from typing import Optional
 from typing import Union
 
+import torch
 from torch import nn
 
+from caldera.blocks.flex import FlexBlock
+from caldera.data import GraphData
 from caldera.defaults import CalderaDefaults as D
+from caldera.exceptions import CalderaNetsException
 from caldera.utils import pairwise
 
 
@@ -60,3 +67,90 @@ class MLP(nn.Module):
 
     def forward(self, x):
         return self.layers(x)
+
+
+def quantize_dynamic(
+    module: nn.Module, dtype: torch.dtype = torch.qint8, inplace: bool = False
+) -> nn.Module:
+    """Dynamically quantize the `nn.Linear` layers of a module for CPU
+    inference. Weights are stored as int8 and activations are quantized on
+    the fly. `nn.LayerNorm` and activation layers are left in float.
+
+    Usage:
+
+    .. code-block:: python
+
+        model = EncodeCoreDecode()
+        model(example, steps=1)  # resolve flexible dimensions
+        qmodel = quantize_dynamic(model.eval())
+
+    :param module: module to quantize. All `FlexBlock` modules must be resolved.
+    :param dtype: quantized weight dtype
+    :param inplace: if True, swap layers in place rather than on a copy
+    :return: the quantized module
+    """
+    for name, m in module.named_modules():
+        if isinstance(m, FlexBlock) and not m.is_resolved:
+            raise CalderaNetsException(
+                "Cannot quantize unresolved module '{}'. Resolve the module"
+                " by providing an example before quantizing.".format(name)
+            )
+    return torch.quantization.quantize_dynamic(
+        module, {nn.Linear}, dtype=dtype, inplace=inplace
+    )
+
+
+def _flatten_outputs(out) -> List[torch.Tensor]:
+    if torch.is_tensor(out):
+        return [out]
+    elif isinstance(out, GraphData):
+        return [out.e, out.x, out.g]
+    elif isinstance(out, (tuple, list)):
+        tensors = []
+        for o in out:
+            tensors += _flatten_outputs(o)
+        return tensors
+    raise TypeError("Cannot compare outputs of type {}".format(type(out)))
+
+
+def compare_quantized(
+    model: nn.Module, quantized: nn.Module, *args, repeats: int = 10, **kwargs
+) -> Dict[str, float]:
+    """Compare accuracy and latency of a float model and its quantized
+    counterpart on the same inputs.
+
+    :param model: float model
+    :param quantized: quantized model (e.g. from :func:`quantize_dynamic`)
+    :param args: forward arguments
+    :param repeats: number of timed forward passes for each model
+    :param kwargs: forward keyword arguments
+    :return: dictionary of max and mean absolute error and median latencies
+        (in seconds)
+    """
+
+    def run(m):
+        times = []
+        with torch.no_grad():
+            out = m(*args, **kwargs)
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                m(*args, **kwargs)
+                times.append(time.perf_counter() - t0)
+        return out, statistics.median(times)
+
+    expected, float_latency = run(model)
+    received, quantized_latency = run(quantized)
+
+    errors = torch.cat(
+        [
+            (a.float() - b.float()).abs().flatten()
+            for a, b in zip(_flatten_outputs(expected), _flatten_outputs(received))
+        ]
+    )
+    return {
+        "max_abs_error": errors.max().item() if errors.numel() else 0.0,
+        "mean_abs_error": errors.mean().item() if errors.numel() else 0.0,
+        "float_latency": float_latency,
+        "quantized_latency": quantized_latency,
+        "speedup": float_latency / quantized_latency,
+    }
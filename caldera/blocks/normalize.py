@@ -0,0 +1,75 @@
+from typing import Optional
+
+import torch
+from torch import nn
+
+from caldera.data import GraphBatch
+from caldera.data import GraphData
+from caldera.data.statistics import GraphStats
+from caldera.data.statistics import RunningStats
+
+
+class Normalize(nn.Module):
+    """Standardize features with a fixed mean and standard deviation, e.g.
+    computed with :class:`caldera.data.statistics.RunningStats`."""
+
+    def __init__(self, mean: torch.Tensor, std: torch.Tensor, eps: float = 1e-6):
+        super().__init__()
+        self.register_buffer("mean", torch.as_tensor(mean, dtype=torch.float32))
+        self.register_buffer("std", torch.as_tensor(std, dtype=torch.float32))
+        self.eps = eps
+
+    @classmethod
+    def from_stats(cls, stats: RunningStats, eps: float = 1e-6) -> "Normalize":
+        return cls(stats.mean, stats.std, eps=eps)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return (x - self.mean.to(x.dtype)) / (self.std.to(x.dtype) + self.eps)
+
+    def inverse(self, x: torch.Tensor) -> torch.Tensor:
+        return x * (self.std.to(x.dtype) + self.eps) + self.mean.to(x.dtype)
+
+
+class GraphNormalize(nn.Module):
+    """Standardize the node, edge and global features of a graph at the model
+    input using dataset-level statistics.
+
+    Usage:
+
+    .. code-block:: python
+
+        normalize = GraphNormalize.from_stats(loader.statistics())
+        out = model(normalize(batch), steps=5)
+    """
+
+    def __init__(
+        self,
+        node_norm: Optional[Normalize] = None,
+        edge_norm: Optional[Normalize] = None,
+        global_norm: Optional[Normalize] = None,
+    ):
+        super().__init__()
+        self.node_norm = node_norm
+        self.edge_norm = edge_norm
+        self.global_norm = global_norm
+
+    @classmethod
+    def from_stats(cls, stats: GraphStats, eps: float = 1e-6) -> "GraphNormalize":
+        def new(s):
+            if s.count:
+                return Normalize.from_stats(s, eps=eps)
+
+        return cls(new(stats.x), new(stats.e), new(stats.g))
+
+    def forward(self, data: GraphData) -> GraphData:
+        def apply(norm, x):
+            if norm is None:
+                return x
+            return norm(x)
+
+        x = apply(self.node_norm, data.x)
+        e = apply(self.edge_norm, data.e)
+        g = apply(self.global_norm, data.g)
+        if isinstance(data, GraphBatch):
+            return GraphBatch(x, e, g, data.edges, data.node_idx, data.edge_idx)
+        return GraphData(x, e, g, data.edges)
@@ -1,4 +1,11 @@
+from caldera.data.builder import GraphBatchBuilder
+from caldera.data.cluster import ClusterLoader
 from caldera.data.graph_batch import GraphBatch
 from caldera.data.graph_data import GraphData
 from caldera.data.graph_tuple import GraphTuple
 from caldera.data.loader import GraphDataLoader
+from caldera.data.sampler import NeighborSampler
+from caldera.data.stream import GraphStream
+from caldera.data.stream import ShardDataset
+from caldera.data.summary import GraphSummary
+from caldera.data.summary import summarize
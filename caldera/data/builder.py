@@ -0,0 +1,218 @@
+from typing import Iterable
+from typing import Optional
+from typing import Union
+
+import numpy as np
+import torch
+
+from caldera.data.graph_batch import GraphBatch
+from caldera.data.graph_data import GraphData
+
+ArrayLike = Union[torch.Tensor, np.ndarray]
+
+
+class GraphBatchBuilder:
+    """Build a :class:`caldera.data.GraphBatch` incrementally, one graph at a
+    time.
+
+    Graphs are written into preallocated buffers that grow geometrically
+    (amortized O(1) per graph), with node offsets and graph indices tracked
+    as graphs arrive. :meth:`build` returns a batch whose tensors are views
+    of the buffers, so finalizing does not copy.
+
+    Usage:
+
+    .. code-block:: python
+
+        builder = GraphBatchBuilder()
+        for data in stream:
+            builder.add(data)
+            if builder.num_nodes >= budget:
+                yield builder.build()
+    """
+
+    def __init__(
+        self,
+        n_feat: Optional[int] = None,
+        e_feat: Optional[int] = None,
+        g_feat: Optional[int] = None,
+        dtype: torch.dtype = torch.float32,
+        device: Optional[str] = None,
+        node_capacity: int = 1024,
+        edge_capacity: int = 4096,
+        graph_capacity: int = 64,
+        growth: float = 2.0,
+    ):
+        """
+
+        :param n_feat: number of node features (default: inferred from the first graph)
+        :param e_feat: number of edge features (default: inferred from the first graph)
+        :param g_feat: number of global features (default: inferred from the first graph)
+        :param dtype: feature dtype
+        :param device: device of the buffers
+        :param node_capacity: initial node capacity
+        :param edge_capacity: initial edge capacity
+        :param graph_capacity: initial graph capacity
+        :param growth: buffer growth factor
+        """
+        if growth <= 1:
+            raise ValueError("Growth factor must be greater than 1")
+        self.shape = (n_feat, e_feat, g_feat)
+        self.dtype = dtype
+        self.device = device
+        self.capacity = (node_capacity, edge_capacity, graph_capacity)
+        self.growth = growth
+        self.reset()
+
+    def reset(self):
+        """Discard all added graphs and release the buffers."""
+        self._x = self._e = self._g = None
+        self._edges = self._node_idx = self._edge_idx = None
+        self.num_nodes = 0
+        self.num_edges = 0
+        self.num_graphs = 0
+        return self
+
+    def __len__(self):
+        return self.num_graphs
+
+    def _allocate(self, n_feat: int, e_feat: int, g_feat: int):
+        for given, inferred in zip(self.shape, (n_feat, e_feat, g_feat)):
+            if given is not None and given != inferred:
+                raise RuntimeError(
+                    "Feature dimensions {} do not match builder dimensions {}".format(
+                        (n_feat, e_feat, g_feat), self.shape
+                    )
+                )
+        self.shape = (n_feat, e_feat, g_feat)
+        n, e, g = self.capacity
+        kwargs = dict(dtype=self.dtype, device=self.device)
+        self._x = torch.empty(n, n_feat, **kwargs)
+        self._e = torch.empty(e, e_feat, **kwargs)
+        self._g = torch.empty(g, g_feat, **kwargs)
+        self._edges = torch.empty(2, e, dtype=torch.long, device=self.device)
+        self._node_idx = torch.empty(n, dtype=torch.long, device=self.device)
+        self._edge_idx = torch.empty(e, dtype=torch.long, device=self.device)
+
+    def _grow(
+        self, t: torch.Tensor, size: int, used: int, dim: int = 0
+    ) -> torch.Tensor:
+        if size <= t.shape[dim]:
+            return t
+        capacity = max(size, int(t.shape[dim] * self.growth))
+        shape = list(t.shape)
+        shape[dim] = capacity
+        new = torch.empty(shape, dtype=t.dtype, device=t.device)
+        new.narrow(dim, 0, used).copy_(t.narrow(dim, 0, used))
+        return new
+
+    def _reserve(self, n_nodes: int, n_edges: int, n_graphs: int):
+        n = self.num_nodes + n_nodes
+        e = self.num_edges + n_edges
+        g = self.num_graphs + n_graphs
+        self._x = self._grow(self._x, n, self.num_nodes)
+        self._node_idx = self._grow(self._node_idx, n, self.num_nodes)
+        self._e = self._grow(self._e, e, self.num_edges)
+        self._edge_idx = self._grow(self._edge_idx, e, self.num_edges)
+        self._edges = self._grow(self._edges, e, self.num_edges, dim=1)
+        self._g = self._grow(self._g, g, self.num_graphs)
+
+    def add_arrays(
+        self,
+        node_attr: ArrayLike,
+        edge_attr: ArrayLike,
+        global_attr: ArrayLike,
+        edges: ArrayLike,
+    ) -> "GraphBatchBuilder":
+        """Add a single graph from raw arrays (numpy arrays or tensors).
+
+        :param node_attr: node attributes of shape (n_nodes, n_feat)
+        :param edge_attr: edge attributes of shape (n_edges, e_feat)
+        :param global_attr: global attributes of shape (1, g_feat) or (g_feat,)
+        :param edges: edge indices of shape (2, n_edges)
+        :return: self
+        """
+        x = torch.as_tensor(node_attr)
+        e = torch.as_tensor(edge_attr)
+        g = torch.as_tensor(global_attr).reshape(1, -1)
+        edges = torch.as_tensor(edges)
+        if x.ndim != 2 or e.ndim != 2:
+            raise RuntimeError("Node and edge attributes must have 2 dimensions")
+        if edges.ndim != 2 or edges.shape[0] != 2:
+            raise RuntimeError("Edges must be a tensor of shape `[2, num_edges]`")
+        if edges.shape[1] != e.shape[0]:
+            raise RuntimeError(
+                "Number of edges {} must match number of edge attributes {}".format(
+                    edges.shape[1], e.shape[0]
+                )
+            )
+        if edges.numel() and (edges.min() < 0 or edges.max() >= x.shape[0]):
+            raise RuntimeError("Edge indices out of range of the number of nodes")
+        return self._write(x, e, g, edges)
+
+    def _write(self, x, e, g, edges) -> "GraphBatchBuilder":
+        if self._x is None:
+            self._allocate(x.shape[1], e.shape[1], g.shape[1])
+        elif (x.shape[1], e.shape[1], g.shape[1]) != self.shape:
+            raise RuntimeError(
+                "Feature dimensions {} do not match builder dimensions {}".format(
+                    (x.shape[1], e.shape[1], g.shape[1]), self.shape
+                )
+            )
+
+        n_nodes, n_edges = x.shape[0], e.shape[0]
+        self._reserve(n_nodes, n_edges, 1)
+        n0, e0, i = self.num_nodes, self.num_edges, self.num_graphs
+        self._x[n0 : n0 + n_nodes] = x
+        self._e[e0 : e0 + n_edges] = e
+        self._g[i : i + 1] = g
+        self._edges[:, e0 : e0 + n_edges] = edges + n0
+        self._node_idx[n0 : n0 + n_nodes] = i
+        self._edge_idx[e0 : e0 + n_edges] = i
+        self.num_nodes += n_nodes
+        self.num_edges += n_edges
+        self.num_graphs += 1
+        return self
+
+    def add(self, data: GraphData) -> "GraphBatchBuilder":
+        """Add a single graph.
+
+        :param data: the graph
+        :return: self
+        """
+        # GraphData is validated on construction
+        return self._write(data.x, data.e, data.g, data.edges)
+
+    def extend(self, data_list: Iterable[GraphData]) -> "GraphBatchBuilder":
+        """Add each graph in an iterable.
+
+        :param data_list: iterable of graphs
+        :return: self
+        """
+        for data in data_list:
+            self.add(data)
+        return self
+
+    def build(self, compact: bool = False) -> GraphBatch:
+        """Finalize the added graphs into a GraphBatch and reset the builder.
+
+        :param compact: if True, copy the tensors to release unused buffer
+            capacity. Otherwise (default) the batch tensors are views of the
+            buffers and no copy is made.
+        :return: the batch
+        """
+        if self._x is None:
+            raise RuntimeError("No graphs have been added")
+        n, e, g = self.num_nodes, self.num_edges, self.num_graphs
+        fields = [
+            self._x[:n],
+            self._e[:e],
+            self._g[:g],
+            self._edges[:, :e],
+            self._node_idx[:n],
+            self._edge_idx[:e],
+        ]
+        if compact:
+            fields = [f.clone() for f in fields]
+        self.reset()
+        return GraphBatch(*fields)
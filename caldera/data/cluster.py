@@ -0,0 +1,185 @@
+"""cluster.py.
+
+Cluster batching: training on a large graph in batches of balanced
+clusters of its nodes.
+"""
+import hashlib
+import os
+from typing import Iterator
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Union
+
+import torch
+
+from caldera.data.graph_batch import GraphBatch
+from caldera.data.graph_data import GraphData
+from caldera.utils.topology import _gather_ranges
+from caldera.utils.topology import partition
+
+
+class ClusterSample(NamedTuple):
+    """A cluster batch.
+
+    :param batch: single graph batch induced by the selected clusters
+    :param node_ids: index of each batch node in the original graph
+    :param clusters: the selected clusters
+    """
+
+    batch: GraphBatch
+    node_ids: torch.LongTensor
+    clusters: torch.LongTensor
+
+
+class ClusterLoader:
+    """Iterate over a single large graph in batches of node clusters.
+
+    The nodes are partitioned once into `n_parts` balanced clusters with few
+    edges between clusters (see :func:`caldera.utils.partition`). Each batch
+    is the subgraph induced by `clusters_per_batch` clusters, i.e. their
+    nodes, the edges within each cluster and the edges between the selected
+    clusters. Node and edge features are copied once into cluster order (so
+    the loader holds a second copy of them), and a batch is gathered from
+    contiguous ranges of that copy.
+
+    The partition can be cached in `cache_dir`, keyed by a hash of the
+    edges and the partition arguments.
+
+    Usage:
+
+    .. code-block:: python
+
+        loader = ClusterLoader(data, n_parts=1000, clusters_per_batch=20, cache_dir=".cache")
+        for sample in loader:
+            out = model(sample.batch, steps=3)[-1]
+            loss = loss_fn(out.x, y[sample.node_ids])
+    """
+
+    def __init__(
+        self,
+        data: GraphData,
+        n_parts: int,
+        clusters_per_batch: int = 1,
+        shuffle: bool = True,
+        seed: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        parts: Optional[torch.LongTensor] = None,
+        **kwargs
+    ):
+        """
+
+        :param data: the (single) graph to partition
+        :param n_parts: number of clusters
+        :param clusters_per_batch: number of clusters per batch
+        :param shuffle: whether to combine random clusters on each iteration
+        :param seed: random seed for the partition and shuffling
+        :param cache_dir: optional directory to cache the partition in
+        :param parts: precomputed cluster index of each node
+        :param kwargs: additional :func:`caldera.utils.partition` keyword arguments
+        """
+        if isinstance(data, GraphBatch):
+            raise ValueError("Can only partition a single GraphData")
+        self.data = data
+        self.n_parts = n_parts
+        self.clusters_per_batch = clusters_per_batch
+        self.shuffle = shuffle
+        self.generator = torch.Generator()
+        if seed is None:
+            self.generator.seed()
+        else:
+            self.generator.manual_seed(seed)
+        if parts is None:
+            parts = self._partition(cache_dir, seed=seed, **kwargs)
+        self.parts = torch.as_tensor(parts, dtype=torch.long, device=data.x.device)
+
+        # node and edge data reordered so each cluster (and each pair of
+        # clusters) is contiguous, keeping the original order within each
+        n = torch.bincount(self.parts, minlength=n_parts)
+        node_order = torch.argsort(
+            self.parts * data.num_nodes + torch.arange(data.num_nodes, device=n.device)
+        )
+        self._node_ptr = torch.cumsum(n, 0) - n
+        self._node_count = n
+        self._node_ids = node_order
+        self._x = data.x[node_order]
+        rank = torch.empty_like(node_order)
+        rank[node_order] = torch.arange(
+            data.num_nodes, device=n.device
+        ) - torch.repeat_interleave(self._node_ptr, n)
+
+        keys = self.parts[data.edges[0]] * n_parts + self.parts[data.edges[1]]
+        n_edges = keys.shape[0]
+        edge_order = torch.argsort(
+            keys * n_edges + torch.arange(n_edges, device=keys.device)
+        )
+        self._edge_keys = keys[edge_order]
+        edges = data.edges[:, edge_order]
+        self._e = data.e[edge_order]
+        self._edge_parts = self.parts[edges]
+        self._edge_rank = rank[edges]
+
+    def _partition(self, cache_dir: Optional[str], **kwargs) -> torch.LongTensor:
+        data = self.data
+        path = None
+        if cache_dir is not None:
+            h = hashlib.blake2b(digest_size=16)
+            h.update(
+                "{};{};{}".format(
+                    data.num_nodes, self.n_parts, sorted(kwargs.items())
+                ).encode()
+            )
+            h.update(data.edges.detach().cpu().contiguous().numpy())
+            path = os.path.join(cache_dir, "partition-{}.pt".format(h.hexdigest()))
+            if os.path.isfile(path):
+                return torch.load(path)
+        parts = partition(data.edges, data.num_nodes, self.n_parts, **kwargs)
+        if path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            torch.save(parts.cpu(), path)
+        return parts
+
+    def __len__(self):
+        return -(-self.n_parts // self.clusters_per_batch)
+
+    def __iter__(self) -> Iterator[ClusterSample]:
+        if self.shuffle:
+            clusters = torch.randperm(self.n_parts, generator=self.generator)
+        else:
+            clusters = torch.arange(self.n_parts)
+        clusters = clusters.to(self.parts.device)
+        for i in range(0, self.n_parts, self.clusters_per_batch):
+            yield self.sample(clusters[i : i + self.clusters_per_batch])
+
+    def sample(self, clusters: Union[Sequence[int], torch.LongTensor]) -> ClusterSample:
+        """Return the subgraph induced by the given clusters.
+
+        :param clusters: cluster indices
+        :return: the batch, the original id of each node and the clusters
+        """
+        data = self.data
+        device = self.parts.device
+        clusters = torch.as_tensor(clusters, dtype=torch.long, device=device)
+
+        counts = self._node_count[clusters]
+        nodes = _gather_ranges(self._node_ptr[clusters], counts)
+        offset = torch.zeros(self.n_parts, dtype=torch.long, device=device)
+        offset[clusters] = torch.cumsum(counts, 0) - counts
+
+        pairs = (clusters.unsqueeze(1) * self.n_parts + clusters.unsqueeze(0)).flatten()
+        start = torch.searchsorted(self._edge_keys, pairs)
+        end = torch.searchsorted(self._edge_keys, pairs, right=True)
+        edges = _gather_ranges(start, end - start)
+        edge_idx = torch.zeros_like(edges)
+
+        batch = GraphBatch._from_fields(
+            {
+                "x": self._x[nodes],
+                "e": self._e[edges],
+                "g": data.g.clone(),
+                "edges": offset[self._edge_parts[:, edges]] + self._edge_rank[:, edges],
+                "node_idx": torch.zeros_like(nodes),
+                "edge_idx": edge_idx,
+            }
+        )
+        return ClusterSample(batch, self._node_ids[nodes], clusters)
@@ -6,8 +6,10 @@ from typing import Optional
 from typing import Type
 
 import networkx as nx
+import numpy as np
 import torch
 
+from caldera.data.graph_data import _to_networkx
 from caldera.data.graph_data import GraphData
 from caldera.data.graph_data import GraphType
 from caldera.utils import scatter_group
@@ -152,11 +154,53 @@ class GraphBatch(GraphData):
         global_attr_key: str = "data",
         graph_type: Type[GraphType] = nx.OrderedMultiDiGraph,
     ) -> List[GraphType]:
+        """Export each graph in the batch to a networkx graph, directly from
+        the batch using node and edge offsets (without unbatching to a list
+        of GraphData first).
+
+        :param feature_key: key for node, edge and global features
+        :param global_attr_key: graph attribute to store global data
+        :param graph_type: networkx graph class
+        :return: list of networkx graphs, one per graph in the batch
+        """
+        n_graphs = self.g.shape[0]
+        node_idx = self.node_idx.detach().cpu().numpy()
+        edge_idx = self.edge_idx.detach().cpu().numpy()
+        node_order = np.argsort(node_idx, kind="stable")
+        edge_order = np.argsort(edge_idx, kind="stable")
+        n_counts = np.bincount(node_idx, minlength=n_graphs)
+        e_counts = np.bincount(edge_idx, minlength=n_graphs)
+        n_offsets = np.cumsum(n_counts) - n_counts
+        e_offsets = np.cumsum(e_counts) - e_counts
+
+        # index of each node within its own graph
+        local = np.empty(node_idx.shape[0], dtype=np.int64)
+        local[node_order] = np.arange(node_idx.shape[0]) - np.repeat(
+            n_offsets, n_counts
+        )
+        edges = local[self.edges.detach().cpu().numpy()[:, edge_order]]
+
+        x, e = self.x, self.e
+        if np.any(np.diff(node_idx) < 0):
+            x = x[torch.from_numpy(node_order).to(x.device)]
+        if np.any(np.diff(edge_idx) < 0):
+            e = e[torch.from_numpy(edge_order).to(e.device)]
+        node_attr = x.unbind(0)
+        edge_attr = e.unbind(0)
+
         graphs = []
-        for data in self.to_data_list():
+        for i in range(n_graphs):
+            n_slice = slice(n_offsets[i], n_offsets[i] + n_counts[i])
+            e_slice = slice(e_offsets[i], e_offsets[i] + e_counts[i])
             graphs.append(
-                data.to_networkx(
-                    feature_key, global_attr_key=global_attr_key, graph_type=graph_type
+                _to_networkx(
+                    node_attr[n_slice],
+                    edge_attr[e_slice],
+                    self.g[i : i + 1],
+                    edges[:, e_slice],
+                    feature_key,
+                    global_attr_key,
+                    graph_type,
                 )
             )
         return graphs
@@ -320,6 +364,32 @@ class GraphBatch(GraphData):
             batch.requires_grad = requires_grad
         return batch
 
+    @classmethod
+    def empty(
+        cls,
+        n_feat: int,
+        e_feat: int,
+        g_feat: int,
+        dtype: torch.dtype = torch.float32,
+        device: Optional[str] = None,
+    ) -> GraphBatch:
+        """Create a batch with zero graphs but the given feature dimensions.
+        Useful for resolving shapes without running data through a network.
+
+        :param n_feat: number of node features
+        :param e_feat: number of edge features
+        :param g_feat: number of global features
+        :return: empty GraphBatch
+        """
+        return cls(
+            torch.empty(0, n_feat, dtype=dtype, device=device),
+            torch.empty(0, e_feat, dtype=dtype, device=device),
+            torch.empty(0, g_feat, dtype=dtype, device=device),
+            torch.empty(2, 0, dtype=torch.long, device=device),
+            torch.empty(0, dtype=torch.long, device=device),
+            torch.empty(0, dtype=torch.long, device=device),
+        )
+
     def __eq__(self, *args, **kwargs):
         raise NotImplementedError("Cannot compare batches")
 
@@ -338,11 +408,14 @@ class GraphBatch(GraphData):
             g_slice = slice(None, None, None)
         if edges_slice is None:
             edges_slice = slice(None, None, None)
-        return self.__class__(
-            self.x[:, x_slice],
-            self.e[:, e_slice],
-            self.g[:, g_slice],
-            self.edges[:, edges_slice],
-            self.node_idx[:],
-            self.edge_idx[e_slice],
-        )
+        fields = {
+            "x": self.x[:, x_slice],
+            "e": self.e[:, e_slice],
+            "g": self.g[:, g_slice],
+            "edges": self.edges[:, edges_slice],
+            "node_idx": self.node_idx,
+            "edge_idx": self.edge_idx[edges_slice],
+        }
+        if edges_slice == slice(None, None, None):
+            return self._from_fields(fields)
+        return self.__class__(*[fields[k] for k in self.__slots__])
@@ -5,6 +5,7 @@ from typing import Any
 from typing import Callable
 from typing import Dict
 from typing import Optional
+from typing import Sequence
 from typing import Tuple
 from typing import Type
 from typing import TypeVar
@@ -15,11 +16,52 @@ import numpy as np
 import torch
 
 from caldera.utils import _first
+from caldera.utils import pack_tensors
 from caldera.utils import same_storage
+from caldera.utils import select_columns
 
 GraphType = TypeVar("GraphType", nx.MultiDiGraph, nx.OrderedMultiDiGraph, nx.DiGraph)
 
 
+# maximum byte alignment of packed tensors (see `GraphData.pack`)
+MAX_PACK_ALIGNMENT = 512
+
+
+def _view_buffer(
+    buffer: torch.Tensor, dtype: torch.dtype, shape, stride, offset: int
+) -> torch.Tensor:
+    """Create a tensor view into a uint8 buffer's storage."""
+    return torch.empty(0, dtype=dtype, device=buffer.device).set_(
+        buffer.untyped_storage(), offset, shape, stride
+    )
+
+
+def _unpack(cls, buffer: torch.Tensor, layout):
+    return cls(*[_view_buffer(buffer, *args) for args in layout])
+
+
+def _to_networkx(
+    node_attr: Sequence[Any],
+    edge_attr: Sequence[Any],
+    global_attr: torch.Tensor,
+    edges: np.ndarray,
+    feature_key: str,
+    global_attr_key: str,
+    graph_type: Type[GraphType],
+) -> GraphType:
+    g = graph_type()
+    g.add_nodes_from((n, {feature_key: x}) for n, x in enumerate(node_attr))
+    src, dest = edges.tolist()
+    keys = g.add_edges_from(
+        (n1, n2, {feature_key: e}) for n1, n2, e in zip(src, dest, edge_attr)
+    )
+    if keys is None:
+        keys = [None] * len(src)
+    g.ordered_edges = list(zip(src, dest, keys))
+    setattr(g, global_attr_key, {feature_key: global_attr.clone()})
+    return g
+
+
 # TODO: there should be a super class, TorchComposition, with apply methods etc.
 # TODO: support n dim tensors
 # TODO: implicit support for torch.Tensor
@@ -136,8 +178,101 @@ class GraphData:
         return self._apply(func, new_inst=False, args=args, kwargs=kwargs, keys=keys)
 
     def to(self, device: str, *args, **kwargs):
+        if (
+            not args
+            and set(kwargs) <= {"non_blocking"}
+            and not isinstance(device, torch.dtype)
+        ):
+            buffer = self._packed_buffer(differentiable=False)
+            if buffer is not None:
+                return self._from_buffer(buffer.to(device, **kwargs))
         return self.apply(lambda x: x.to(device, *args, **kwargs))
 
+    def pack(
+        self,
+        alignment: int = 64,
+        device: Optional[str] = None,
+        pin_memory: bool = False,
+    ) -> GraphData:
+        """Return a copy of the data in which all tensors are views into a
+        single contiguous byte buffer. Device transfer (`to`), `clone`,
+        `copy`, `pin_memory` and pickling of packed data operate on the
+        buffer once rather than on each tensor. Packed tensors are detached.
+
+        Note that operations creating new tensors (e.g. `append_nodes`,
+        `apply`) return unpacked data.
+
+        :param alignment: byte alignment of each tensor in the buffer, a power
+            of two (tensors are also aligned to their element size)
+        :param device: device of the buffer (default: current device)
+        :param pin_memory: if True, allocate the buffer in pinned memory
+        :return: packed data
+        """
+        if alignment < 1 or alignment & (alignment - 1):
+            raise ValueError(
+                "Alignment must be a power of two, not {}".format(alignment)
+            )
+        if alignment > MAX_PACK_ALIGNMENT:
+            raise ValueError("Alignment must be at most {}".format(MAX_PACK_ALIGNMENT))
+        _, views = pack_tensors(
+            [getattr(self, k).detach() for k in self.__slots__],
+            alignment=alignment,
+            device=device,
+            pin_memory=pin_memory,
+        )
+        return self.__class__(*views)
+
+    @property
+    def is_packed(self) -> bool:
+        """Whether all tensors are views into a single buffer (see
+        :meth:`pack`)."""
+        return self._packed_buffer() is not None
+
+    def _packed_buffer(self, differentiable: bool = True) -> Optional[torch.Tensor]:
+        """Return the packed byte buffer backing all tensors or None if the
+        data is not packed.
+
+        :param differentiable: if False, also return None if any tensor
+            requires grad (operations on the buffer are not recorded in the
+            computation graph)
+        """
+        tensors = [getattr(self, k) for k in self.__slots__]
+        if not differentiable and any(t.requires_grad for t in tensors):
+            return None
+        storage = tensors[0].untyped_storage()
+        if any(
+            t.untyped_storage().data_ptr() != storage.data_ptr() for t in tensors[1:]
+        ):
+            return None
+        # guard against unrelated views into a larger tensor
+        nbytes = sum(t.numel() * t.element_size() for t in tensors)
+        if storage.nbytes() > nbytes + MAX_PACK_ALIGNMENT * len(tensors):
+            return None
+        return torch.empty(0, dtype=torch.uint8, device=tensors[0].device).set_(storage)
+
+    def _layout(self):
+        return [
+            (t.dtype, t.shape, t.stride(), t.storage_offset())
+            for t in (getattr(self, k) for k in self.__slots__)
+        ]
+
+    def _from_buffer(self, buffer: torch.Tensor) -> GraphData:
+        return _unpack(self.__class__, buffer, self._layout())
+
+    def __reduce_ex__(self, protocol):
+        buffer = self._packed_buffer()
+        if buffer is not None:
+            # pickle the buffer once instead of once per view
+            return _unpack, (self.__class__, buffer, self._layout())
+        return super().__reduce_ex__(protocol)
+
+    def pin_memory(self) -> GraphData:
+        """Copy the data into pinned memory."""
+        buffer = self._packed_buffer()
+        if buffer is not None:
+            return self._from_buffer(buffer.pin_memory())
+        return self.apply(lambda x: x.pin_memory())
+
     def share_storage(
         self, other: GraphData, return_dict: Optional[bool] = False
     ) -> Union[Dict[str, bool], bool]:
@@ -162,6 +297,25 @@ class GraphData:
     def contiguous(self):
         return self.apply(lambda x: x.contiguous())
 
+    def share_memory_(self):
+        """Move all tensors into a single flat buffer in shared memory, in
+        place. Each field becomes a view into the buffer, so sending the
+        data to another process (e.g. from a DataLoader worker) transfers
+        one shared memory handle instead of copying every tensor. Tensors are
+        detached.
+
+        :return: self
+        """
+        keys = self.__slots__
+        _, views = pack_tensors([getattr(self, k).detach() for k in keys], shared=True)
+        for k, v in zip(keys, views):
+            setattr(self, k, v)
+        return self
+
+    def is_shared(self) -> bool:
+        """Return whether all tensors are in shared memory."""
+        return all(getattr(self, k).is_shared() for k in self.__slots__)
+
     @property
     def num_graphs(self):
         return self.g.shape[0]
@@ -190,6 +344,26 @@ class GraphData:
     def size(self):
         return self.x.shape[:1] + self.e.shape[:1] + self.g.shape[:1]
 
+    def summary(self, max_bins: int = 1024):
+        """Compute tensor-native summary statistics (degrees, roots, leaves,
+        density, self loops, etc.). See :func:`caldera.data.summarize`.
+
+        :param max_bins: maximum number of bins of the degree histograms
+        :return: GraphSummary
+        """
+        from caldera.data.summary import summarize
+
+        return summarize(self, max_bins=max_bins)
+
+    @classmethod
+    def _from_fields(cls, fields: Dict[str, torch.Tensor]) -> GraphData:
+        """Create a new instance from already validated fields, without
+        running `debug` (e.g. for column projections of valid data)."""
+        inst = cls.__new__(cls)
+        for k in cls.__slots__:
+            setattr(inst, k, fields[k])
+        return inst
+
     def _mask_fields(self, masks: Dict[str, torch.tensor]):
         for m in masks:
             if m not in self.__slots__:
@@ -199,14 +373,46 @@ class GraphData:
             if field not in masks or masks[field] is None:
                 masked_fields.append(getattr(self, field))
             else:
-                masked_fields.append(getattr(self, field)[:, masks[field]])
+                masked_fields.append(select_columns(getattr(self, field), masks[field]))
         return masked_fields
 
     def mask(self, node_mask, edge_mask, global_mask, invert: bool = False):
+        """Select node, edge and global feature columns. Masks that select
+        evenly spaced columns return views of the features; other masks copy
+        the selected columns.
+
+        :param node_mask: node feature mask or index (None for all)
+        :param edge_mask: edge feature mask or index (None for all)
+        :param global_mask: global feature mask or index (None for all)
+        :param invert: if True, invert the (boolean) masks
+        :return: the masked data
+        """
         d = {"x": node_mask, "e": edge_mask, "g": global_mask}
         if invert:
-            d = {k: ~v for k, v in d.items()}
-        return self.__class__(*self._mask_fields(d))
+            d = {k: None if v is None else ~v for k, v in d.items()}
+        return self._from_fields(dict(zip(self.__slots__, self._mask_fields(d))))
+
+    def project(self, x=None, e=None, g=None):
+        """Lazily select node, edge and global feature columns, e.g. for
+        multi-task heads that each read a subset of wide feature matrices.
+        Columns are only selected when a field is first accessed, as a view
+        if the index can be expressed as a slice and as a gather otherwise.
+
+        Usage:
+
+        .. code-block:: python
+
+            head_input = batch.project(x=[0, 1, 2], e=slice(4, 8))
+            out = head(head_input.x, head_input.e)
+
+        :param x: node feature index (slice, list, long tensor or bool mask; None for all)
+        :param e: edge feature index
+        :param g: global feature index
+        :return: :class:`caldera.data.projection.GraphProjection`
+        """
+        from caldera.data.projection import GraphProjection
+
+        return GraphProjection(self, {"x": x, "e": e, "g": g})
 
     @property
     def requires_grad(self):
@@ -227,6 +433,9 @@ class GraphData:
         Note that like the `clone()` method, this function will be
         recorded in the computation graph.
         """
+        buffer = self._packed_buffer(differentiable=False)
+        if buffer is not None:
+            return self._from_buffer(buffer.clone())
         return self.apply(lambda x: x.clone())
 
     # TODO: copy tests
@@ -239,6 +448,12 @@ class GraphData:
         :return:
         """
         """Unlike clone, copies the data *without the computation graph*"""
+        if not emtpy_like_args and not emtpy_like_kwargs:
+            buffer = self._packed_buffer()
+            if buffer is not None:
+                return self._from_buffer(
+                    torch.empty_like(buffer).copy_(buffer, non_blocking=non_blocking)
+                )
         return self.apply(
             lambda x: torch.empty_like(x, *emtpy_like_args, **emtpy_like_kwargs).copy_(
                 x, non_blocking=non_blocking
@@ -347,15 +562,24 @@ class GraphData:
         global_attr_key: str = "data",
         graph_type: Type[GraphType] = nx.OrderedMultiDiGraph,
     ) -> GraphType:
-        g = graph_type()
-        for n, ndata in enumerate(self.x):
-            g.add_node(n, **{feature_key: ndata})
-        g.ordered_edges = []
-        for i, e in enumerate(self.edges.T):
-            n = g.add_edge(e[0].item(), e[1].item(), **{feature_key: self.e[i]})
-            g.ordered_edges.append((e[0].item(), e[1].item(), n))
-        setattr(g, global_attr_key, {feature_key: self.g.clone()})
-        return g
+        """Export to a networkx graph. Edges are converted to numpy once and
+        nodes and edges are added in bulk. Node and edge features are views
+        of the rows of `x` and `e`.
+
+        :param feature_key: key for node, edge and global features
+        :param global_attr_key: graph attribute to store global data
+        :param graph_type: networkx graph class
+        :return: networkx graph with an `ordered_edges` list of (n1, n2, key)
+        """
+        return _to_networkx(
+            self.x.unbind(0),
+            self.e.unbind(0),
+            self.g,
+            self.edges.detach().cpu().numpy(),
+            feature_key,
+            global_attr_key,
+            graph_type,
+        )
 
     def __repr__(self):
         return "<{cls} size(n,e,g)={size} features(n,e,g)={shape}>".format(
@@ -438,9 +662,12 @@ class GraphData:
             g_slice = slice(None, None, None)
         if edges_slice is None:
             edges_slice = slice(None, None, None)
-        return self.__class__(
-            self.x[:, x_slice],
-            self.e[:, e_slice],
-            self.g[:, g_slice],
-            self.edges[:, edges_slice],
-        )
+        fields = {
+            "x": self.x[:, x_slice],
+            "e": self.e[:, e_slice],
+            "g": self.g[:, g_slice],
+            "edges": self.edges[:, edges_slice],
+        }
+        if edges_slice == slice(None, None, None):
+            return self._from_fields(fields)
+        return self.__class__(*[fields[k] for k in self.__slots__])
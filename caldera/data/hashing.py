@@ -0,0 +1,98 @@
+"""hashing.py.
+
+Content hashing of GraphData.
+"""
+import hashlib
+
+import numpy as np
+import torch
+
+from caldera.data.graph_data import GraphData
+
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+hash_modes = ["exact", "wl"]
+
+
+def _to_numpy(x: torch.Tensor) -> np.ndarray:
+    x = x.detach().cpu()
+    if x.dtype is torch.bfloat16:
+        x = x.float()
+    return np.ascontiguousarray(x.numpy())
+
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    """Vectorized splitmix64 finalizer."""
+    h = h ^ (h >> np.uint64(30))
+    h = h * _M1
+    h = h ^ (h >> np.uint64(27))
+    h = h * _M2
+    return h ^ (h >> np.uint64(31))
+
+
+def _row_labels(x: np.ndarray) -> np.ndarray:
+    """Hash each row of a 2d array to a uint64 label."""
+    v = np.ascontiguousarray(x, dtype=np.float64).view(np.uint64)
+    cols = np.arange(1, v.shape[1] + 1, dtype=np.uint64) * _GOLDEN
+    return _mix(_mix(v + cols).sum(axis=1, dtype=np.uint64))
+
+
+def _exact_hash(data: GraphData, h) -> str:
+    if data.x.device.type != "cpu":
+        # a single transfer if the data is packed
+        data = data.to("cpu")
+    for k in data.__slots__:
+        arr = _to_numpy(getattr(data, k))
+        h.update("{}{}{};".format(k, arr.dtype, arr.shape).encode())
+        h.update(arr)
+    return h.hexdigest()
+
+
+def _wl_hash(data: GraphData, h, iterations: int) -> str:
+    n_nodes = data.x.shape[0]
+    src, dst = _to_numpy(data.edges)
+    labels = _row_labels(_to_numpy(data.x))
+    edge_labels = _row_labels(_to_numpy(data.e))
+    with np.errstate(over="ignore"):
+        for _ in range(iterations):
+            msg_in = np.zeros(n_nodes, dtype=np.uint64)
+            msg_out = np.zeros(n_nodes, dtype=np.uint64)
+            np.add.at(msg_in, dst, _mix(labels[src] + edge_labels))
+            np.add.at(msg_out, src, _mix((labels[dst] ^ _GOLDEN) + edge_labels))
+            labels = _mix(labels * _M1 + _mix(msg_in) + _mix(msg_out ^ _M2))
+    h.update("wl{};{};".format(n_nodes, src.shape[0]).encode())
+    h.update(np.sort(labels))
+    h.update(_to_numpy(data.g))
+    return h.hexdigest()
+
+
+def graph_hash(
+    data: GraphData, mode: str = "exact", iterations: int = 3, digest_size: int = 16
+) -> str:
+    """Compute a content hash for a graph.
+
+    In 'exact' mode the hash is taken over the raw bytes (and shapes and
+    dtypes) of the node, edge and global attributes and the edges, so two
+    graphs hash equally only if they are identical, including node order.
+
+    In 'wl' mode a Weisfeiler-Lehman style structural hash is computed.
+    Node labels are initialized from node features and refined from
+    incoming and outgoing neighbors (and edge features) for `iterations`
+    rounds. The hash is invariant to node and edge order, so two graphs
+    that are isomorphic (including features) hash equally. As with all WL
+    hashes, some non-isomorphic graphs may collide.
+
+    :param data: the graph
+    :param mode: 'exact' or 'wl'
+    :param iterations: number of WL refinement iterations ('wl' mode only)
+    :param digest_size: size of the digest in bytes
+    :return: hex digest
+    """
+    h = hashlib.blake2b(digest_size=digest_size)
+    if mode == "exact":
+        return _exact_hash(data, h)
+    elif mode == "wl":
+        return _wl_hash(data, h, iterations)
+    raise ValueError("Hash mode '{}' not one of {}".format(mode, hash_modes))
@@ -1,3 +1,4 @@
+import functools
 from itertools import tee
 from typing import Any
 from typing import Callable
@@ -7,20 +8,37 @@ from typing import Tuple
 from typing import TypeVar
 
 from torch.utils.data import DataLoader
+from torch.utils.data import get_worker_info
 
 from caldera.data import GraphBatch
 from caldera.data import GraphData
+from caldera.data.statistics import accumulate_stats
 from caldera.utils import _first
 
 
 T = TypeVar("T")
 
 
-def collate(data_list):
-    if isinstance(data_list[0], tuple):
+def collate(data_list, share_memory: bool = False):
+    """Collate a list of graphs (or tuples of graphs) into a GraphBatch.
+
+    :param data_list: list of GraphData or tuples of GraphData
+    :param share_memory: if True and called in a DataLoader worker process,
+        pack each batch into a single shared memory buffer (see
+        :meth:`caldera.data.GraphData.share_memory_`)
+    :return: GraphBatch or tuple of GraphBatch
+    """
+    if isinstance(data_list, GraphBatch):
+        # automatic batching is disabled (`batch_size=None`), e.g. for
+        # streams that yield batches
+        batch = data_list
+    elif isinstance(data_list[0], tuple):
         if issubclass(type(data_list[0][0]), GraphData):
             return tuple(
-                [collate([x[i] for x in data_list]) for i in range(len(data_list[0]))]
+                [
+                    collate([x[i] for x in data_list], share_memory=share_memory)
+                    for i in range(len(data_list[0]))
+                ]
             )
         else:
             raise RuntimeError(
@@ -28,16 +46,65 @@ def collate(data_list):
                     type(data_list), type(data_list[0]), type(data_list[0][0])
                 )
             )
-    return GraphBatch.from_data_list(data_list)
+    else:
+        batch = GraphBatch.from_data_list(data_list)
+    if share_memory and get_worker_info() is not None:
+        batch.share_memory_()
+    return batch
+
+
+def collate_stats(data_list, max_bins: int = 1024):
+    """Collate and reduce a list of graphs to partial statistics."""
+    return accumulate_stats([collate(data_list)], max_bins=max_bins)
 
 
 class GraphDataLoader(DataLoader):
-    def __init__(self, dataset, batch_size=1, shuffle=False, **kwargs):
-        super().__init__(dataset, batch_size, shuffle, collate_fn=collate, **kwargs)
+    def __init__(
+        self, dataset, batch_size=1, shuffle=False, share_memory: bool = True, **kwargs
+    ):
+        """A DataLoader of :class:`caldera.data.GraphBatch`.
+
+        :param dataset: dataset of GraphData or tuples of GraphData
+        :param batch_size: batch size
+        :param shuffle: whether to shuffle
+        :param share_memory: if True (default), worker processes pack each
+            batch into a single shared memory buffer so it is sent to the
+            main process as one handle rather than one copy per tensor
+        :param kwargs: additional DataLoader keyword arguments
+        """
+        super().__init__(
+            dataset,
+            batch_size,
+            shuffle,
+            collate_fn=functools.partial(collate, share_memory=share_memory),
+            **kwargs
+        )
 
     def first(self, *args, **kwargs):
         return _first(tee(self(*args, **kwargs))[0])
 
+    def statistics(self, num_workers: Optional[int] = None, max_bins: int = 1024):
+        """Compute dataset-level statistics (feature mean/variance, graph size
+        and degree distributions) in a single streaming pass over the dataset
+        with bounded memory. Each batch is reduced to partial statistics
+        inside the loader's collate function, so with `num_workers > 0` the
+        reduction runs in worker processes and only the (small) partial
+        statistics are sent back to be merged.
+
+        :param num_workers: number of worker processes (default: same as the loader)
+        :param max_bins: maximum number of bins for size and degree histograms
+        :return: :class:`caldera.data.statistics.GraphStats` (or a tuple for datasets of tuples)
+        """
+        if num_workers is None:
+            num_workers = self.num_workers
+        loader = DataLoader(
+            self.dataset,
+            batch_size=self.batch_size,
+            num_workers=num_workers,
+            collate_fn=functools.partial(collate_stats, max_bins=max_bins),
+        )
+        return accumulate_stats(loader, max_bins=max_bins)
+
     def __call__(
         self,
         device: Optional[str] = None,
@@ -0,0 +1,58 @@
+from typing import Dict
+from typing import Union
+
+import torch
+
+from caldera.data.graph_batch import GraphBatch
+from caldera.data.graph_data import GraphData
+from caldera.utils import index_to_slice
+from caldera.utils import select_columns
+
+
+class GraphProjection:
+    """A lazily evaluated selection of the feature columns of a
+    :class:`caldera.data.GraphData` or :class:`caldera.data.GraphBatch`
+    (see :meth:`caldera.data.GraphData.project`).
+
+    Fields are materialized on first access and cached. Indices that can be
+    expressed as slices produce views of the underlying features, other
+    indices are gathered. Connectivity fields (`edges`, `node_idx`,
+    `edge_idx`) are passed through.
+    """
+
+    def __init__(self, data: Union[GraphData, GraphBatch], indices: Dict[str, object]):
+        self.data = data
+        self.indices = {k: v for k, v in indices.items() if v is not None}
+        self._cache = {}
+
+    def __getattr__(self, name: str) -> torch.Tensor:
+        if name.startswith("_") or name not in self.data.__slots__:
+            raise AttributeError(name)
+        if name not in self._cache:
+            self._cache[name] = select_columns(
+                getattr(self.data, name), self.indices.get(name)
+            )
+        return self._cache[name]
+
+    def is_view(self, name: str) -> bool:
+        """Whether accessing the field returns a view (rather than a copy) of
+        the underlying data."""
+        if name not in self.indices:
+            return True
+        size = getattr(self.data, name).shape[1]
+        return index_to_slice(self.indices[name], size) is not None
+
+    @property
+    def shape(self):
+        return self.x.shape[1:] + self.e.shape[1:] + self.g.shape[1:]
+
+    def materialize(self) -> Union[GraphData, GraphBatch]:
+        """Materialize all fields and return a new GraphData or GraphBatch."""
+        return self.data._from_fields(
+            {k: getattr(self, k) for k in self.data.__slots__}
+        )
+
+    def __repr__(self):
+        return "<{} of {} indices={}>".format(
+            self.__class__.__name__, self.data, sorted(self.indices)
+        )
@@ -0,0 +1,192 @@
+"""sampler.py.
+
+Neighbor sampled mini-batches for training on graphs too large to pass
+through a network at once.
+"""
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Union
+
+import torch
+
+from caldera.data.graph_batch import GraphBatch
+from caldera.data.graph_data import GraphData
+from caldera.utils.topology import _gather_ranges
+from caldera.utils.topology import in_degree
+
+
+class NeighborSample(NamedTuple):
+    """A neighbor sampled mini-batch.
+
+    :param batch: batch with one sampled subgraph per seed node
+    :param node_ids: index of each batch node in the original graph
+    :param seed_idx: index of each seed node in the batch
+    """
+
+    batch: GraphBatch
+    node_ids: torch.LongTensor
+    seed_idx: torch.LongTensor
+
+
+class NeighborSampler:
+    """Sample k-hop subgraphs of a single large graph around seed nodes.
+
+    Starting from each seed, each hop samples (without replacement) at most
+    `fanouts[hop]` incoming edges of every node reached in the previous hop.
+    Edges point toward the seeds, so message passing over `num_hops` steps
+    propagates the sampled neighborhood into the seed nodes. Each seed gets
+    its own subgraph in the returned :class:`caldera.data.GraphBatch`, so
+    per-graph global features and aggregations are per seed.
+
+    Sampling is vectorized over all seeds of a mini-batch and the
+    incoming-edge index of the graph is computed once and reused.
+
+    Usage:
+
+    .. code-block:: python
+
+        sampler = NeighborSampler(data, fanouts=[10, 5], batch_size=256, shuffle=True)
+        for sample in sampler:
+            out = model(sample.batch, steps=2)[-1]
+            loss = loss_fn(out.x[sample.seed_idx], y[sample.node_ids[sample.seed_idx]])
+    """
+
+    def __init__(
+        self,
+        data: GraphData,
+        fanouts: Sequence[int],
+        seeds: Optional[torch.LongTensor] = None,
+        batch_size: int = 1,
+        shuffle: bool = False,
+        seed: Optional[int] = None,
+    ):
+        """
+
+        :param data: the (single) graph to sample from
+        :param fanouts: maximum number of incoming edges sampled per node for
+            each hop. A negative fanout keeps all incoming edges.
+        :param seeds: seed nodes to iterate over (default: all nodes)
+        :param batch_size: number of seed nodes per mini-batch
+        :param shuffle: whether to shuffle seed nodes on each iteration
+        :param seed: random seed for sampling and shuffling
+        """
+        if isinstance(data, GraphBatch):
+            raise ValueError("Can only sample from a single GraphData")
+        self.data = data
+        self.fanouts = list(fanouts)
+        if seeds is None:
+            seeds = torch.arange(data.num_nodes, device=data.x.device)
+        self.seeds = torch.as_tensor(seeds, dtype=torch.long, device=data.x.device)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.generator = torch.Generator(device=data.x.device)
+        if seed is None:
+            self.generator.seed()
+        else:
+            self.generator.manual_seed(seed)
+
+        # incoming edges of each node (sources and edge ids sorted by target)
+        order = torch.argsort(data.edges[1])
+        degree = in_degree(data.edges, data.num_nodes)
+        self._eid = order
+        self._src = data.edges[0][order]
+        self._ptr = torch.cumsum(degree, 0) - degree
+        self._degree = degree
+
+    def __len__(self):
+        return -(-self.seeds.shape[0] // self.batch_size)
+
+    def __iter__(self) -> Iterator[NeighborSample]:
+        seeds = self.seeds
+        if self.shuffle:
+            perm = torch.randperm(
+                seeds.shape[0], generator=self.generator, device=seeds.device
+            )
+            seeds = seeds[perm]
+        for i in range(0, seeds.shape[0], self.batch_size):
+            yield self.sample(seeds[i : i + self.batch_size])
+
+    def _sample_edges(self, nodes: torch.LongTensor, fanout: int):
+        """Sample at most `fanout` incoming edges of each node. Returns the
+        index of the node each edge was sampled for and the position of the
+        edge in the sorted incoming-edge index."""
+        counts = self._degree[nodes]
+        candidates = _gather_ranges(self._ptr[nodes], counts)
+        segment = torch.repeat_interleave(
+            torch.arange(nodes.shape[0], device=nodes.device), counts
+        )
+        if fanout < 0 or not candidates.shape[0]:
+            return segment, candidates
+        # random order within each segment: sort by segment + uniform key
+        keys = torch.rand(
+            candidates.shape[0],
+            generator=self.generator,
+            device=nodes.device,
+            dtype=torch.float64,
+        )
+        order = torch.argsort(segment.double() + keys)
+        segment, candidates = segment[order], candidates[order]
+        rank = (
+            torch.arange(segment.shape[0], device=nodes.device)
+            - (torch.cumsum(counts, 0) - counts)[segment]
+        )
+        keep = rank < fanout
+        return segment[keep], candidates[keep]
+
+    def sample(self, seeds: Union[Sequence[int], torch.LongTensor]) -> NeighborSample:
+        """Sample a subgraph around each of the seed nodes.
+
+        :param seeds: seed node indices
+        :return: the sampled batch, the original id of each node and the
+            batch index of each seed
+        """
+        data = self.data
+        device = data.x.device
+        n_nodes = data.num_nodes
+        n_edges = data.e.shape[0]
+        seeds = torch.as_tensor(seeds, dtype=torch.long, device=device)
+        n_graphs = seeds.shape[0]
+
+        # nodes are identified by `graph * n_nodes + node`, kept sorted
+        frontier = torch.arange(n_graphs, device=device) * n_nodes + seeds
+        visited = frontier
+        edge_keys: List[torch.LongTensor] = []
+        for fanout in self.fanouts:
+            if not frontier.shape[0]:
+                break
+            graph = frontier // n_nodes
+            segment, candidates = self._sample_edges(frontier % n_nodes, fanout)
+            graph = graph[segment]
+            edge_keys.append(graph * n_edges + self._eid[candidates])
+            reached = torch.unique(graph * n_nodes + self._src[candidates])
+            pos = torch.searchsorted(visited, reached).clamp(max=visited.shape[0] - 1)
+            frontier = reached[visited[pos] != reached]
+            visited, _ = torch.sort(torch.cat([visited, frontier]))
+
+        # edges sorted by graph, then by original edge id
+        if edge_keys:
+            edge_keys, _ = torch.sort(torch.cat(edge_keys))
+        else:
+            edge_keys = torch.zeros(0, dtype=torch.long, device=device)
+        edge_idx = edge_keys // n_edges if n_edges else edge_keys
+        eid = edge_keys - edge_idx * n_edges
+        edges = data.edges[:, eid] + (edge_idx * n_nodes).unsqueeze(0)
+
+        node_ids = visited % n_nodes
+        batch = GraphBatch._from_fields(
+            {
+                "x": data.x[node_ids],
+                "e": data.e[eid],
+                "g": data.g.expand(n_graphs, -1).clone(),
+                "edges": torch.searchsorted(visited, edges),
+                "node_idx": visited // n_nodes,
+                "edge_idx": edge_idx,
+            }
+        )
+        seed_idx = torch.searchsorted(
+            visited, torch.arange(n_graphs, device=device) * n_nodes + seeds
+        )
+        return NeighborSample(batch, node_ids, seed_idx)
@@ -0,0 +1,228 @@
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import torch
+
+from caldera.data.graph_batch import GraphBatch
+from caldera.data.graph_data import GraphData
+from caldera.utils.topology import in_degree
+from caldera.utils.topology import out_degree
+
+
+class RunningStats:
+    """Streaming per-feature mean and variance.
+
+    Batches are reduced with Welford's algorithm and combined using Chan et
+    al.'s parallel update, so partial statistics computed on different
+    shards (or worker processes) can be merged exactly.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = None
+        self.m2 = None
+
+    def update(self, x: torch.Tensor) -> "RunningStats":
+        """Update with a (n, features) tensor.
+
+        :param x: the samples
+        :return: self
+        """
+        x = x.detach().to(torch.float64).reshape(x.shape[0], -1)
+        if not x.shape[0]:
+            return self
+        other = RunningStats()
+        other.count = x.shape[0]
+        other.mean = x.mean(0)
+        other.m2 = ((x - other.mean) ** 2).sum(0)
+        return self.merge(other)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """Merge the statistics of another accumulator into this one.
+
+        :param other: the other accumulator
+        :return: self
+        """
+        if not other.count:
+            return self
+        if not self.count:
+            self.count = other.count
+            self.mean = other.mean.clone()
+            self.m2 = other.m2.clone()
+            return self
+        if self.mean.shape != other.mean.shape:
+            raise RuntimeError(
+                "Cannot merge statistics of shape {} and {}".format(
+                    tuple(self.mean.shape), tuple(other.mean.shape)
+                )
+            )
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / count)
+        self.m2 = self.m2 + other.m2 + delta**2 * (self.count * other.count / count)
+        self.count = count
+        return self
+
+    @property
+    def var(self) -> torch.Tensor:
+        """Population variance."""
+        return self.m2 / max(self.count, 1)
+
+    @property
+    def std(self) -> torch.Tensor:
+        """Population standard deviation."""
+        return self.var.sqrt()
+
+    def __repr__(self):
+        return "<{} count={}>".format(self.__class__.__name__, self.count)
+
+
+class Histogram:
+    """Streaming histogram of non-negative integers (e.g. node counts or
+    degrees). Memory is bounded by `max_bins`; larger values are counted in
+    the last bin while the exact maximum is tracked separately."""
+
+    def __init__(self, max_bins: int = 1024):
+        self.max_bins = max_bins
+        self.counts = torch.zeros(0, dtype=torch.long)
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    def update(self, values: torch.LongTensor) -> "Histogram":
+        """Update with a tensor of values.
+
+        :param values: non-negative integer values
+        :return: self
+        """
+        values = values.detach().cpu().long().flatten()
+        if not values.numel():
+            return self
+        self.total += values.numel()
+        self.sum += values.sum().item()
+        self.max = max(self.max, values.max().item())
+        counts = torch.bincount(values.clamp(max=self.max_bins - 1))
+        return self._add(counts)
+
+    def _add(self, counts: torch.LongTensor) -> "Histogram":
+        if counts.shape[0] > self.counts.shape[0]:
+            counts, self.counts = self.counts, counts.clone()
+        self.counts[: counts.shape[0]] += counts
+        return self
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        """Merge another histogram into this one.
+
+        :param other: the other histogram
+        :return: self
+        """
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+        return self._add(other.counts)
+
+    @property
+    def mean(self) -> float:
+        return self.sum / max(self.total, 1)
+
+    def __repr__(self):
+        return "<{} total={} mean={:.3f} max={}>".format(
+            self.__class__.__name__, self.total, self.mean, self.max
+        )
+
+
+class GraphStats:
+    """Streaming dataset-level statistics of graphs: node, edge and global
+    feature mean/variance and the distributions of graph sizes and node
+    degrees.
+
+    Usage:
+
+    .. code-block:: python
+
+        stats = loader.statistics(num_workers=4)
+        print(stats.x.mean, stats.x.std, stats.n_nodes.mean)
+        normalize = GraphNormalize.from_stats(stats)
+    """
+
+    def __init__(self, max_bins: int = 1024):
+        self.x = RunningStats()
+        self.e = RunningStats()
+        self.g = RunningStats()
+        self.n_nodes = Histogram(max_bins)
+        self.n_edges = Histogram(max_bins)
+        self.in_degree = Histogram(max_bins)
+        self.out_degree = Histogram(max_bins)
+
+    @property
+    def n_graphs(self) -> int:
+        return self.n_nodes.total
+
+    def update(self, data: Union[GraphData, GraphBatch]) -> "GraphStats":
+        """Update with a graph or batch of graphs.
+
+        :param data: GraphData or GraphBatch
+        :return: self
+        """
+        self.x.update(data.x)
+        self.e.update(data.e)
+        self.g.update(data.g)
+        if isinstance(data, GraphBatch):
+            n_graphs = data.g.shape[0]
+            self.n_nodes.update(torch.bincount(data.node_idx, minlength=n_graphs))
+            self.n_edges.update(torch.bincount(data.edge_idx, minlength=n_graphs))
+        else:
+            self.n_nodes.update(torch.tensor([data.x.shape[0]]))
+            self.n_edges.update(torch.tensor([data.e.shape[0]]))
+        self.in_degree.update(in_degree(data.edges, data.x.shape[0]))
+        self.out_degree.update(out_degree(data.edges, data.x.shape[0]))
+        return self
+
+    def merge(self, other: "GraphStats") -> "GraphStats":
+        """Merge another accumulator into this one.
+
+        :param other: the other accumulator
+        :return: self
+        """
+        for k in ["x", "e", "g", "n_nodes", "n_edges", "in_degree", "out_degree"]:
+            getattr(self, k).merge(getattr(other, k))
+        return self
+
+    def __repr__(self):
+        return "<{} n_graphs={}>".format(self.__class__.__name__, self.n_graphs)
+
+
+def accumulate_stats(
+    batches: Iterable[Union[GraphData, GraphBatch, Tuple]],
+    stats: Optional[Union[GraphStats, Tuple[GraphStats, ...]]] = None,
+    max_bins: int = 1024,
+) -> Union[GraphStats, Tuple[GraphStats, ...]]:
+    """Accumulate statistics over an iterable of graphs, batches, partial
+    :class:`GraphStats` or tuples thereof (e.g. (input, target) pairs), in a
+    single pass.
+
+    :param batches: iterable of graphs, batches or partial statistics
+    :param stats: optional statistics to update
+    :param max_bins: maximum number of bins for size and degree histograms
+    :return: GraphStats or tuple of GraphStats
+    """
+    if stats is not None and not isinstance(stats, tuple):
+        stats = (stats,)
+    is_tuple = False
+    for b in batches:
+        is_tuple = isinstance(b, tuple)
+        items = b if is_tuple else (b,)
+        if stats is None:
+            stats = tuple(GraphStats(max_bins) for _ in items)
+        for s, item in zip(stats, items):
+            if isinstance(item, GraphStats):
+                s.merge(item)
+            else:
+                s.update(item)
+    if stats is None:
+        return GraphStats(max_bins)
+    if is_tuple:
+        return stats
+    return stats[0]
@@ -0,0 +1,447 @@
+"""stream.py.
+
+Streaming (iterable) graph datasets for :class:`caldera.data.GraphDataLoader`.
+"""
+import itertools
+import json
+import os
+import random
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
+from typing import Union
+
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+from torch.utils.data import get_worker_info
+from torch.utils.data import IterableDataset
+
+from caldera.data.builder import GraphBatchBuilder
+from caldera.data.graph_batch import GraphBatch
+from caldera.data.graph_data import GraphData
+from caldera.data.graph_data import GraphType
+
+T = TypeVar("T")
+
+_SHARD_FIELDS = ["x", "e", "g", "edges", "node_ptr", "edge_ptr"]
+
+
+def shuffle_buffer(items: Iterable[T], size: int, rng: random.Random) -> Iterator[T]:
+    """Approximately shuffle a stream using a buffer of `size` items."""
+    buffer = []
+    for item in items:
+        if len(buffer) < size:
+            buffer.append(item)
+        else:
+            i = rng.randrange(size)
+            yield buffer[i]
+            buffer[i] = item
+    rng.shuffle(buffer)
+    yield from buffer
+
+
+def data_to_json(data: GraphData) -> str:
+    """Serialize a graph to a single JSON line (see
+    :meth:`GraphStream.from_jsonl`)."""
+    return json.dumps(
+        {
+            "x": data.x.tolist(),
+            "e": data.e.tolist(),
+            "g": data.g.flatten().tolist(),
+            "edges": data.edges.tolist(),
+        }
+    )
+
+
+def data_from_json(line: str, dtype: torch.dtype = torch.float32) -> GraphData:
+    """Deserialize a graph from a JSON line."""
+    d = json.loads(line)
+    edges = torch.tensor(d["edges"], dtype=torch.long).reshape(2, -1)
+    x = torch.tensor(d["x"], dtype=dtype)
+    e = torch.tensor(d["e"], dtype=dtype)
+    return GraphData(
+        x.reshape(x.shape[0], -1),
+        e.reshape(edges.shape[1], -1),
+        torch.tensor(d["g"], dtype=dtype).reshape(1, -1),
+        edges,
+    )
+
+
+def write_jsonl(path: str, data_list: Iterable[GraphData]):
+    """Write graphs to a JSON lines file, one graph per line."""
+    with open(path, "w") as f:
+        for data in data_list:
+            f.write(data_to_json(data) + "\n")
+
+
+def write_shard(directory: str, data_list: Iterable[GraphData]):
+    """Write graphs to a shard directory of `.npy` arrays that can be memory
+    mapped (see :meth:`GraphStream.from_shards`).
+
+    :param directory: the shard directory (created if needed)
+    :param data_list: the graphs
+    """
+    batch = GraphBatchBuilder().extend(data_list).build()
+    node_ptr = np.concatenate(
+        [[0], np.cumsum(np.bincount(batch.node_idx.numpy(), minlength=len(batch.g)))]
+    )
+    edge_ptr = np.concatenate(
+        [[0], np.cumsum(np.bincount(batch.edge_idx.numpy(), minlength=len(batch.g)))]
+    )
+    # edges are stored relative to their graph
+    edges = batch.edges.numpy() - node_ptr[batch.edge_idx.numpy()]
+    os.makedirs(directory, exist_ok=True)
+    arrays = dict(
+        x=batch.x.numpy(),
+        e=batch.e.numpy(),
+        g=batch.g.numpy(),
+        edges=edges,
+        node_ptr=node_ptr,
+        edge_ptr=edge_ptr,
+    )
+    for k in _SHARD_FIELDS:
+        np.save(os.path.join(directory, k + ".npy"), arrays[k])
+
+
+def _read_lines(path: str, shard: int, num_shards: int) -> Iterator[bytes]:
+    """Yield the non-empty lines of a file that start in the `shard`-th of
+    `num_shards` equal byte ranges."""
+    size = os.path.getsize(path)
+    start = size * shard // num_shards
+    end = size * (shard + 1) // num_shards
+    with open(path, "rb") as f:
+        if start > 0:
+            # skip the line that starts in the previous range
+            f.seek(start - 1)
+            start += len(f.readline()) - 1
+        while start < end:
+            line = f.readline()
+            if not line:
+                break
+            start += len(line)
+            if line.strip():
+                yield line
+
+
+class _ShardReader:
+    """Lazily memory maps shard directories and reads graphs from them."""
+
+    def __init__(self, directories: List[str]):
+        self.directories = directories
+        self._shards = {}
+
+    def _shard(self, i: int):
+        if i not in self._shards:
+            self._shards[i] = {
+                k: np.load(os.path.join(self.directories[i], k + ".npy"), mmap_mode="r")
+                for k in _SHARD_FIELDS
+            }
+        return self._shards[i]
+
+    def index(self) -> Iterator[Tuple[int, int]]:
+        for i in range(len(self.directories)):
+            for j in range(self._shard(i)["g"].shape[0]):
+                yield i, j
+
+    def __call__(self, key: Tuple[int, int]) -> GraphData:
+        i, j = key
+        s = self._shard(i)
+        n0, n1 = s["node_ptr"][j : j + 2]
+        e0, e1 = s["edge_ptr"][j : j + 2]
+        return GraphData(
+            torch.from_numpy(np.array(s["x"][n0:n1])),
+            torch.from_numpy(np.array(s["e"][e0:e1])),
+            torch.from_numpy(np.array(s["g"][j : j + 1])),
+            torch.from_numpy(np.array(s["edges"][:, e0:e1])),
+        )
+
+    def __getstate__(self):
+        # memory maps are reopened in each worker process
+        return {"directories": self.directories, "_shards": {}}
+
+
+class GraphStream(IterableDataset):
+    """A streaming dataset of graphs for sources that cannot be indexed up
+    front (generators, line-delimited files, memory-mapped shards).
+
+    Items from `source` are sharded across DataLoader workers (and
+    optionally distributed ranks) *before* `transform` is applied, so
+    parsing is parallelized across workers and each item is produced by
+    exactly one worker. By default, every worker iterates over the whole
+    source and keeps every `num_shards`-th item, so the cost of reading the
+    source (but not of `transform`) is paid by every worker. A `sharded`
+    source is instead called with the shard of the worker and only reads
+    that shard (e.g. :meth:`from_jsonl` reads a byte range of each file).
+    :meth:`from_shards` only enumerates graph indices and reads the graphs
+    of the worker in `transform`.
+
+    An optional shuffle buffer approximately shuffles each shard. As with
+    :class:`torch.utils.data.DistributedSampler`, call :meth:`set_epoch`
+    before each epoch to shuffle differently in each epoch, since
+    DataLoader workers iterate over copies of the stream.
+
+    Usage:
+
+    .. code-block:: python
+
+        stream = GraphStream.from_jsonl("graphs.jsonl", shuffle_buffer=1000)
+        loader = GraphDataLoader(stream.batched(max_nodes=10000), batch_size=None, num_workers=4)
+        for batch in loader:
+            ...
+    """
+
+    def __init__(
+        self,
+        source: Callable[[], Iterable[T]],
+        transform: Optional[Callable[[T], GraphData]] = None,
+        shuffle_buffer: int = 0,
+        seed: Optional[int] = None,
+        rank: int = 0,
+        world_size: int = 1,
+        sharded: bool = False,
+    ):
+        """
+
+        :param source: callable returning a new iterable of items (called once per epoch and worker)
+        :param transform: function converting each item to a GraphData
+        :param shuffle_buffer: size of the shuffle buffer (0 to disable shuffling)
+        :param seed: shuffle seed (default: derived from the torch random state)
+        :param rank: distributed rank
+        :param world_size: number of distributed ranks
+        :param sharded: whether `source` is called with `(shard, num_shards)`
+            and returns only the items of that shard
+        """
+        super().__init__()
+        self.source = source
+        self.transform = transform
+        self.shuffle_buffer = shuffle_buffer
+        self.seed = seed
+        self.rank = rank
+        self.world_size = world_size
+        self.sharded = sharded
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int):
+        """Set the epoch, which seeds the shuffle buffer."""
+        self.epoch = epoch
+
+    def shard(self) -> Tuple[int, int]:
+        """Return the shard index and number of shards of the current
+        process (worker and rank)."""
+        info = get_worker_info()
+        if info is None:
+            worker_id, num_workers = 0, 1
+        else:
+            worker_id, num_workers = info.id, info.num_workers
+        return self.rank * num_workers + worker_id, self.world_size * num_workers
+
+    def __iter__(self) -> Iterator[GraphData]:
+        shard, num_shards = self.shard()
+        if self.sharded:
+            items = self.source(shard, num_shards)
+        else:
+            items = itertools.islice(self.source(), shard, None, num_shards)
+        if self.transform is not None:
+            items = map(self.transform, items)
+        if self.shuffle_buffer:
+            if self.seed is None:
+                seed = torch.randint(0, 2**62, (1,)).item()
+            else:
+                seed = self.seed + 7919 * self.epoch + shard
+            items = shuffle_buffer(items, self.shuffle_buffer, random.Random(seed))
+        return items
+
+    def batched(
+        self,
+        max_nodes: Optional[int] = None,
+        max_edges: Optional[int] = None,
+        max_graphs: Optional[int] = None,
+    ) -> "BudgetedGraphStream":
+        """Group the stream into GraphBatches limited by a budget of nodes,
+        edges and/or graphs. Use with `GraphDataLoader(..., batch_size=None)`.
+
+        :param max_nodes: maximum number of nodes per batch
+        :param max_edges: maximum number of edges per batch
+        :param max_graphs: maximum number of graphs per batch
+        :return: the batched stream
+        """
+        return BudgetedGraphStream(self, max_nodes, max_edges, max_graphs)
+
+    @classmethod
+    def from_networkx(
+        cls,
+        graphs: Callable[[], Iterable[GraphType]],
+        *args,
+        nx_kwargs: Optional[dict] = None,
+        **kwargs
+    ) -> "GraphStream":
+        """Stream from a callable returning an iterable of networkx graphs.
+
+        :param graphs: callable returning an iterable (e.g. generator) of networkx graphs
+        :param nx_kwargs: keyword arguments for :meth:`GraphData.from_networkx`
+        :return: the stream
+        """
+        nx_kwargs = nx_kwargs or {}
+
+        def transform(g):
+            return GraphData.from_networkx(g, **nx_kwargs)
+
+        return cls(graphs, transform, *args, **kwargs)
+
+    @classmethod
+    def from_jsonl(
+        cls, paths: Union[str, List[str]], *args, dtype=torch.float32, **kwargs
+    ) -> "GraphStream":
+        """Stream from line-delimited JSON files with one graph per line, with
+        keys 'x', 'e', 'g' and 'edges' (see :func:`write_jsonl`). Each worker
+        only reads its own byte range of each file, so lines are read and
+        parsed by the worker that owns them.
+
+        :param paths: path or list of paths
+        :return: the stream
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+
+        def lines(shard, num_shards):
+            for path in paths:
+                yield from _read_lines(path, shard, num_shards)
+
+        def transform(line):
+            return data_from_json(line, dtype=dtype)
+
+        return cls(lines, transform, *args, sharded=True, **kwargs)
+
+    @classmethod
+    def from_shards(
+        cls, directories: Union[str, List[str]], *args, **kwargs
+    ) -> "GraphStream":
+        """Stream from memory-mapped shard directories (see
+        :func:`write_shard`). Only the graphs owned by a worker are read.
+
+        :param directories: shard directory or list of directories
+        :return: the stream
+        """
+        if isinstance(directories, str):
+            directories = [directories]
+        reader = _ShardReader(list(directories))
+        return cls(reader.index, reader, *args, **kwargs)
+
+
+class BudgetedGraphStream(IterableDataset):
+    """Groups a :class:`GraphStream` into GraphBatches limited by a budget
+    of nodes, edges and/or graphs (see :meth:`GraphStream.batched`).
+
+    A batch is emitted as soon as adding the next graph would exceed the
+    budget; a single graph larger than the budget forms its own batch.
+    """
+
+    def __init__(
+        self,
+        stream: GraphStream,
+        max_nodes: Optional[int] = None,
+        max_edges: Optional[int] = None,
+        max_graphs: Optional[int] = None,
+    ):
+        super().__init__()
+        if max_nodes is None and max_edges is None and max_graphs is None:
+            raise ValueError(
+                "At least one of max_nodes, max_edges or max_graphs is required"
+            )
+        self.stream = stream
+        self.max_nodes = max_nodes
+        self.max_edges = max_edges
+        self.max_graphs = max_graphs
+
+    def set_epoch(self, epoch: int):
+        """Set the epoch of the underlying stream."""
+        self.stream.set_epoch(epoch)
+
+    def _exceeds(self, builder: GraphBatchBuilder, data: GraphData) -> bool:
+        return (
+            (
+                self.max_nodes is not None
+                and builder.num_nodes + data.x.shape[0] > self.max_nodes
+            )
+            or (
+                self.max_edges is not None
+                and builder.num_edges + data.e.shape[0] > self.max_edges
+            )
+            or (
+                self.max_graphs is not None and builder.num_graphs + 1 > self.max_graphs
+            )
+        )
+
+    def __iter__(self) -> Iterator[GraphBatch]:
+        builder = GraphBatchBuilder()
+        for data in self.stream:
+            if len(builder) and self._exceeds(builder, data):
+                yield builder.build()
+            builder.add(data)
+        if len(builder):
+            yield builder.build()
+
+
+class ShardDataset(Dataset):
+    """A map-style dataset of graphs read from memory-mapped shard
+    directories (see :func:`write_shard`).
+
+    Only the shard directories are pickled, so the dataset is cheap to send
+    to worker processes, which memory map the same files and share their
+    pages through the OS page cache.
+
+    If `target_directories` are given, items are `(input, target)` tuples,
+    as expected by :class:`caldera.train.Trainer`.
+
+    Usage:
+
+    .. code-block:: python
+
+        write_shard("data/input", inputs)
+        write_shard("data/target", targets)
+        dataset = ShardDataset("data/input", "data/target")
+        loader = GraphDataLoader(dataset, batch_size=32, num_workers=4)
+    """
+
+    def __init__(
+        self,
+        directories: Union[str, List[str]],
+        target_directories: Optional[Union[str, List[str]]] = None,
+    ):
+        """
+
+        :param directories: shard directory or list of directories
+        :param target_directories: optional shard directories of the targets,
+            with the same number of graphs as `directories`
+        """
+        if isinstance(directories, str):
+            directories = [directories]
+        if isinstance(target_directories, str):
+            target_directories = [target_directories]
+        self.reader = _ShardReader(list(directories))
+        self.keys = list(self.reader.index())
+        self.target_reader = None
+        if target_directories is not None:
+            self.target_reader = _ShardReader(list(target_directories))
+            target_keys = list(self.target_reader.index())
+            if len(target_keys) != len(self.keys):
+                raise ValueError(
+                    "Found {} graphs but {} targets".format(
+                        len(self.keys), len(target_keys)
+                    )
+                )
+            self.target_keys = target_keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, idx: int) -> Union[GraphData, Tuple[GraphData, GraphData]]:
+        data = self.reader(self.keys[idx])
+        if self.target_reader is None:
+            return data
+        return data, self.target_reader(self.target_keys[idx])
@@ -0,0 +1,118 @@
+from typing import Dict
+from typing import NamedTuple
+from typing import Union
+
+import torch
+
+from caldera.data.graph_batch import GraphBatch
+from caldera.data.graph_data import GraphData
+from caldera.utils.topology import in_degree
+from caldera.utils.topology import out_degree
+
+
+class GraphSummary(NamedTuple):
+    """Per graph and per node summary statistics of a
+    :class:`caldera.data.GraphData` or :class:`caldera.data.GraphBatch`.
+
+    Per graph tensors have shape (G,), per node tensors have shape (N,) and
+    degree histograms have shape (G, min(max_degree + 1, max_bins)), with
+    degrees of at least `max_bins - 1` counted in the last bin.
+    """
+
+    n_nodes: torch.LongTensor
+    n_edges: torch.LongTensor
+    density: torch.Tensor
+    n_self_loops: torch.LongTensor
+    n_roots: torch.LongTensor
+    n_leaves: torch.LongTensor
+    in_degree: torch.LongTensor
+    out_degree: torch.LongTensor
+    roots: torch.BoolTensor
+    leaves: torch.BoolTensor
+    in_degree_hist: torch.LongTensor
+    out_degree_hist: torch.LongTensor
+
+    def scalars(self) -> Dict[str, float]:
+        """Reduce the summary to scalars, e.g. for logging."""
+        d = {}
+        for k in ["n_nodes", "n_edges", "density"]:
+            v = getattr(self, k).float()
+            if v.numel():
+                d[k + "_mean"] = v.mean().item()
+                d[k + "_min"] = v.min().item()
+                d[k + "_max"] = v.max().item()
+        for k in ["n_self_loops", "n_roots", "n_leaves"]:
+            d[k] = getattr(self, k).sum().item()
+        for k in ["in_degree", "out_degree"]:
+            v = getattr(self, k)
+            if v.numel():
+                d[k + "_mean"] = v.float().mean().item()
+                d[k + "_max"] = v.max().item()
+        return d
+
+
+def _degree_hist(
+    degree: torch.LongTensor, node_idx: torch.LongTensor, n_graphs: int, max_bins: int
+) -> torch.LongTensor:
+    width = min(int(degree.max().item()) + 1, max_bins) if degree.numel() else 1
+    # bound the (G, width) table; larger degrees go to the last bin
+    degree = degree.clamp(max=width - 1)
+    return torch.bincount(node_idx * width + degree, minlength=n_graphs * width).view(
+        n_graphs, width
+    )
+
+
+def summarize(data: Union[GraphData, GraphBatch], max_bins: int = 1024) -> GraphSummary:
+    """Compute summary statistics of a graph or batch of graphs using
+    `bincount` and without conversion to networkx.
+
+    :param data: GraphData or GraphBatch
+    :param max_bins: maximum number of bins of the degree histograms; larger
+        degrees are counted in the last bin
+    :return: the summary
+    """
+    if max_bins < 1:
+        raise ValueError("max_bins must be at least 1, not {}".format(max_bins))
+    device = data.edges.device
+    n = data.x.shape[0]
+    if isinstance(data, GraphBatch):
+        n_graphs = data.g.shape[0]
+        node_idx, edge_idx = data.node_idx, data.edge_idx
+    else:
+        n_graphs = 1
+        node_idx = torch.zeros(n, dtype=torch.long, device=device)
+        edge_idx = torch.zeros(data.edges.shape[1], dtype=torch.long, device=device)
+
+    indeg = in_degree(data.edges, n)
+    outdeg = out_degree(data.edges, n)
+    roots = indeg == 0
+    leaves = outdeg == 0
+
+    n_nodes = torch.bincount(node_idx, minlength=n_graphs)
+    n_edges = torch.bincount(edge_idx, minlength=n_graphs)
+    self_loops = data.edges[0] == data.edges[1]
+    n_self_loops = torch.bincount(edge_idx[self_loops], minlength=n_graphs)
+    n_roots = torch.bincount(node_idx[roots], minlength=n_graphs)
+    n_leaves = torch.bincount(node_idx[leaves], minlength=n_graphs)
+
+    possible = (n_nodes * (n_nodes - 1)).float()
+    density = torch.where(
+        possible > 0,
+        n_edges.float() / possible.clamp(min=1),
+        torch.zeros_like(possible),
+    )
+
+    return GraphSummary(
+        n_nodes=n_nodes,
+        n_edges=n_edges,
+        density=density,
+        n_self_loops=n_self_loops,
+        n_roots=n_roots,
+        n_leaves=n_leaves,
+        in_degree=indeg,
+        out_degree=outdeg,
+        roots=roots,
+        leaves=leaves,
+        in_degree_hist=_degree_hist(indeg, node_idx, n_graphs, max_bins),
+        out_degree_hist=_degree_hist(outdeg, node_idx, n_graphs, max_bins),
+    )
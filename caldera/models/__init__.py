@@ -1,3 +1,4 @@
+from caldera.models.cost import estimate_cost
 from caldera.models.encoder_core_decoder import EncodeCoreDecode
 from caldera.models.graph_core import GraphCore
 from caldera.models.graph_encoder import GraphEncoder
@@ -1,9 +1,90 @@
+from contextlib import nullcontext
+from typing import Optional
+
 import torch
 
+from caldera.data import GraphBatch
+from caldera.models.profiler import BlockProfiler
+
 
 class GraphNetworkBase(torch.nn.Module):
     """Base class for GraphNetwork modules."""
 
+    def __init__(self):
+        super().__init__()
+        self.autocast_dtype = None
+
+    def mixed_precision(
+        self, enabled: bool = True, dtype: Optional[torch.dtype] = torch.bfloat16
+    ):
+        """Toggle mixed precision execution for this network and any nested
+        graph networks. When enabled, `forward` runs under `torch.autocast`
+        (requires torch>=1.10) and aggregators accumulate in float32.
+
+        Usage:
+
+        .. code-block:: python
+
+            model = EncodeCoreDecode().mixed_precision()
+            outputs = model(batch, steps=5)
+
+        :param enabled: whether to enable autocast
+        :param dtype: the autocast dtype (default: bfloat16)
+        :return: self
+        """
+        for module in self.modules():
+            if isinstance(module, GraphNetworkBase):
+                module.autocast_dtype = dtype if enabled else None
+        return self
+
+    def autocast(self, device_type: str):
+        """Return the autocast context for the given device type."""
+        if self.autocast_dtype is None:
+            return nullcontext()
+        return torch.autocast(device_type, dtype=self.autocast_dtype)
+
+    def resolve(
+        self,
+        n_feat: int,
+        e_feat: int,
+        g_feat: int,
+        device: Optional[str] = None,
+        **kwargs
+    ):
+        """Resolve all flexible dimensions of the network from the input
+        feature dimensions by passing an empty (zero graph) batch through the
+        network. No warmup data is required.
+
+        :param n_feat: number of node features
+        :param e_feat: number of edge features
+        :param g_feat: number of global features
+        :param device: device for the empty batch
+        :param kwargs: additional forward keyword arguments
+        :return: self
+        """
+        with torch.no_grad():
+            self(GraphBatch.empty(n_feat, e_feat, g_feat, device=device), **kwargs)
+        return self
+
+    def profile(self, synchronize: Optional[bool] = None) -> BlockProfiler:
+        """Return an opt-in profiler that records the wall time, estimated
+        FLOPs and output bytes of each block and aggregator call. Profiling
+        hooks are only registered while the profiler is active.
+
+        Usage:
+
+        .. code-block:: python
+
+            with model.profile() as profiler:
+                model(batch, steps=5)
+            print(profiler.report())
+            profiler.to_tensorboard(writer, global_step=epoch)
+
+        :param synchronize: whether to synchronize CUDA before reading timers
+        :return: the profiler
+        """
+        return BlockProfiler(self, synchronize=synchronize)
+
     # def reset_parameters(self):
     #     for child in self.children():
     #         if hasattr(child, 'reset_parameters'):
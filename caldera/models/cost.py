@@ -0,0 +1,195 @@
+import copy
+from collections import OrderedDict
+from typing import Dict
+from typing import NamedTuple
+
+import torch
+
+from caldera.blocks.aggregator import AggregatorBase
+from caldera.blocks.block import Block
+from caldera.blocks.edge_block import AggregatingEdgeBlock
+from caldera.blocks.global_block import AggregatingGlobalBlock
+from caldera.blocks.node_block import AggregatingNodeBlock
+from caldera.data import GraphBatch
+from caldera.exceptions import CalderaNetsException
+from caldera.models.base import GraphNetworkBase
+from caldera.models.profiler import _layer_flops
+from caldera.models.profiler import BlockProfiler
+
+# distinct number of graphs, nodes and edges in the probe batch, used to
+# determine which of the three each layer's rows scale with
+_PROBE_SIZES = OrderedDict([("graphs", 2), ("nodes", 5), ("edges", 7)])
+
+
+class CostEstimate(NamedTuple):
+    """Estimated cost of a single forward pass (or training step)."""
+
+    flops: int
+    training_flops: int
+    params: int
+    param_bytes: int
+    activation_bytes: int
+    intermediate_bytes: int
+    total_activation_bytes: int
+    blocks: Dict[str, Dict[str, int]]
+
+
+class _Counter:
+    def __init__(self):
+        self.per_row = {k: {} for k in _PROBE_SIZES}
+        self.stack = []
+
+    def add(self, rows: int, key: str, value: int):
+        for dim, n in _PROBE_SIZES.items():
+            if rows == n:
+                name = self.stack[-1] if self.stack else ""
+                d = self.per_row[dim].setdefault(
+                    name, {"flops": 0, "activation_bytes": 0, "intermediate_bytes": 0}
+                )
+                d[key] += value // rows
+                return
+        raise CalderaNetsException(
+            "Could not attribute {} rows to graphs, nodes or edges.".format(rows)
+        )
+
+    def scale(self, sizes: Dict[str, int]) -> Dict[str, Dict[str, int]]:
+        blocks = OrderedDict()
+        for dim, per_name in self.per_row.items():
+            for name, d in per_name.items():
+                b = blocks.setdefault(
+                    name, {"flops": 0, "activation_bytes": 0, "intermediate_bytes": 0}
+                )
+                for k, v in d.items():
+                    b[k] += v * sizes[dim]
+        return blocks
+
+
+def estimate_cost(
+    model: GraphNetworkBase,
+    n_graphs: int,
+    n_nodes: int,
+    n_edges: int,
+    n_feat: int,
+    e_feat: int,
+    g_feat: int,
+    dtype: torch.dtype = torch.float32,
+    **kwargs
+) -> CostEstimate:
+    """Estimate the FLOPs, parameter count and activation memory of a model
+    (e.g. :class:`caldera.models.EncodeCoreDecode` or
+    :class:`caldera.models.GraphCore`) for a batch with the given number of
+    graphs, nodes and edges.
+
+    The estimate is analytical: a copy of the model is run once on a tiny
+    probe batch to record the shape of every layer call, and per row costs
+    are scaled to the requested batch size. The model itself is not modified
+    and no batch of the requested size is allocated.
+
+    - `flops` counts the `Linear`, `LayerNorm`, activation and aggregator
+      operations of the forward pass. `training_flops` assumes the backward
+      pass costs twice the forward pass.
+    - `activation_bytes` counts the tensors kept for the backward pass
+      (layer inputs and outputs, block outputs).
+    - `intermediate_bytes` counts the gathered and aggregated inputs of the
+      aggregating blocks and their concatenation.
+    - `total_activation_bytes` is the sum of both. It is the total size of
+      all tensors produced in the forward pass, not the peak of live tensors.
+      When training it is an upper bound on activation memory, since the
+      tensors kept for backward stay alive until the backward pass.
+
+    Usage:
+
+    .. code-block:: python
+
+        model = EncodeCoreDecode(latent_sizes=(128, 128, 128))
+        cost = estimate_cost(model, 32, 32 * 100, 32 * 500, 16, 8, 4, steps=10)
+        print(cost.flops, cost.total_activation_bytes)
+
+    :param model: the graph network
+    :param n_graphs: number of graphs in the batch
+    :param n_nodes: total number of nodes in the batch
+    :param n_edges: total number of edges in the batch
+    :param n_feat: number of node features
+    :param e_feat: number of edge features
+    :param g_feat: number of global features
+    :param dtype: dtype used to compute bytes
+    :param kwargs: additional forward keyword arguments (e.g. `steps`)
+    :return: the estimated cost
+    """
+    sizes = {"graphs": n_graphs, "nodes": n_nodes, "edges": n_edges}
+    element_size = torch.empty(0, dtype=dtype).element_size()
+
+    model = copy.deepcopy(model).cpu().float().eval()
+    model.resolve(n_feat, e_feat, g_feat)
+
+    counter = _Counter()
+    handles = []
+
+    def push(name):
+        def hook(module, inputs):
+            counter.stack.append(name)
+
+        return hook
+
+    def pop(module, inputs, output):
+        counter.stack.pop()
+        for t in [output] if torch.is_tensor(output) else []:
+            counter.add(t.shape[0], "activation_bytes", t.numel() * element_size)
+        if isinstance(module, AggregatorBase):
+            counter.add(inputs[0].shape[0], "flops", inputs[0].numel())
+
+    def layer_hook(module, inputs, output):
+        x = inputs[0]
+        counter.add(x.shape[0], "flops", _layer_flops(module, inputs, output))
+        saved = (
+            x if isinstance(module, (torch.nn.Linear, torch.nn.LayerNorm)) else output
+        )
+        counter.add(saved.shape[0], "activation_bytes", saved.numel() * element_size)
+
+    def concat_hook(module, inputs):
+        x = inputs[0]
+        # the gathered/aggregated pieces and their concatenation
+        counter.add(x.shape[0], "intermediate_bytes", 2 * x.numel() * element_size)
+
+    aggregating = (AggregatingEdgeBlock, AggregatingNodeBlock, AggregatingGlobalBlock)
+    for name, module in model.named_modules():
+        if isinstance(module, (Block, AggregatorBase)):
+            handles.append(module.register_forward_pre_hook(push(name)))
+            handles.append(module.register_forward_hook(pop))
+            if isinstance(module, aggregating):
+                handles.append(
+                    module.block_dict["mlp"].register_forward_pre_hook(concat_hook)
+                )
+        elif isinstance(module, BlockProfiler.flop_layers):
+            handles.append(module.register_forward_hook(layer_hook))
+
+    probe = GraphBatch(
+        torch.randn(_PROBE_SIZES["nodes"], n_feat),
+        torch.randn(_PROBE_SIZES["edges"], e_feat),
+        torch.randn(_PROBE_SIZES["graphs"], g_feat),
+        torch.tensor([[0, 1, 1, 2, 3, 4, 2], [1, 0, 1, 3, 4, 2, 2]]),
+        torch.tensor([0, 0, 1, 1, 1]),
+        torch.tensor([0, 0, 0, 1, 1, 1, 1]),
+    )
+    try:
+        with torch.no_grad():
+            model(probe, **kwargs)
+    finally:
+        for handle in handles:
+            handle.remove()
+
+    blocks = counter.scale(sizes)
+    flops = sum(b["flops"] for b in blocks.values())
+    activation_bytes = sum(b["activation_bytes"] for b in blocks.values())
+    intermediate_bytes = sum(b["intermediate_bytes"] for b in blocks.values())
+    params = sum(p.numel() for p in model.parameters())
+    return CostEstimate(
+        flops=flops,
+        training_flops=3 * flops,
+        params=params,
+        param_bytes=params * element_size,
+        activation_bytes=activation_bytes,
+        intermediate_bytes=intermediate_bytes,
+        total_activation_bytes=activation_bytes + intermediate_bytes,
+        blocks=blocks,
+    )
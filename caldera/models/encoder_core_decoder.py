@@ -12,11 +12,12 @@ from caldera.blocks import GlobalBlock
 from caldera.blocks import MLP
 from caldera.blocks import NodeBlock
 from caldera.data import GraphBatch
+from caldera.models.base import GraphNetworkBase
 from caldera.models.graph_core import GraphCore
 from caldera.models.graph_encoder import GraphEncoder
 
 
-class EncodeCoreDecode(torch.nn.Module):
+class EncodeCoreDecode(GraphNetworkBase):
     def __init__(
         self,
         latent_sizes=(128, 128, 1),
@@ -26,6 +27,7 @@ class EncodeCoreDecode(torch.nn.Module):
         dropout: float = None,
         pass_global_to_edge: bool = True,
         pass_global_to_node: bool = True,
+        aggregator: str = "add",
     ):
         super().__init__()
         self.config = {
@@ -42,9 +44,9 @@ class EncodeCoreDecode(torch.nn.Module):
                 "node": output_sizes[1],
                 "global": output_sizes[2],
             },
-            "node_block_aggregator": "add",
-            "global_block_to_node_aggregator": "add",
-            "global_block_to_edge_aggregator": "add",
+            "node_block_aggregator": aggregator,
+            "global_block_to_node_aggregator": aggregator,
+            "global_block_to_edge_aggregator": aggregator,
             "pass_global_to_edge": pass_global_to_edge,
             "pass_global_to_node": pass_global_to_node,
         }
@@ -100,37 +102,41 @@ class EncodeCoreDecode(torch.nn.Module):
             GlobalBlock(Flex(torch.nn.Linear)(Flex.d(), output_sizes[2])),
         )
 
+    def resolve(self, n_feat: int, e_feat: int, g_feat: int, device: str = None):
+        return super().resolve(n_feat, e_feat, g_feat, device=device, steps=1)
+
     def forward(self, data, steps):
-        # encoded
-        e, x, g = self.encoder(data)
-        data = GraphBatch(x, e, g, data.edges, data.node_idx, data.edge_idx)
-
-        # graph topography data
-        edges = data.edges
-        node_idx = data.node_idx
-        edge_idx = data.edge_idx
-        latent0 = data
-
-        meta = (edges, node_idx, edge_idx)
-
-        outputs = []
-        for _ in range(steps):
-            # core processing step
-            e = torch.cat([latent0.e, e], dim=1)
-            x = torch.cat([latent0.x, x], dim=1)
-            g = torch.cat([latent0.g, g], dim=1)
-            data = GraphBatch(x, e, g, *meta)
-            e, x, g = self.core(data)
-
-            # decode
-            data = GraphBatch(x, e, g, *meta)
-
-            _e, _x, _g = self.decoder(data)
-            decoded = GraphBatch(_x, _e, _g, *meta)
-
-            # transform
-            _e, _x, _g = self.output_transform(decoded)
-            outputs.append(GraphBatch(_x, _e, _g, edges, node_idx, edge_idx))
+        with self.autocast(data.x.device.type):
+            # encoded
+            e, x, g = self.encoder(data)
+            data = GraphBatch(x, e, g, data.edges, data.node_idx, data.edge_idx)
+
+            # graph topography data
+            edges = data.edges
+            node_idx = data.node_idx
+            edge_idx = data.edge_idx
+            latent0 = data
+
+            meta = (edges, node_idx, edge_idx)
+
+            outputs = []
+            for _ in range(steps):
+                # core processing step
+                e = torch.cat([latent0.e, e], dim=1)
+                x = torch.cat([latent0.x, x], dim=1)
+                g = torch.cat([latent0.g, g], dim=1)
+                data = GraphBatch(x, e, g, *meta)
+                e, x, g = self.core(data)
+
+                # decode
+                data = GraphBatch(x, e, g, *meta)
+
+                _e, _x, _g = self.decoder(data)
+                decoded = GraphBatch(_x, _e, _g, *meta)
+
+                # transform
+                _e, _x, _g = self.output_transform(decoded)
+                outputs.append(GraphBatch(_x, _e, _g, edges, node_idx, edge_idx))
 
         # revise connectivity
 
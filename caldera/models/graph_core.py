@@ -28,38 +28,39 @@ class GraphCore(GraphNetworkBase):
         self.pass_to_global_to_node = pass_global_to_node
 
     def forward(self, data: GraphBatch) -> GraphTuple:
-        if self.pass_to_global_to_edge:
-            edge_attr = self.edge_block(
-                edge_attr=data.e,
-                node_attr=data.x,
-                edges=data.edges,
-                global_attr=data.g,
-                edge_idx=data.edge_idx,
-            )
-        else:
-            edge_attr = self.edge_block(
-                edge_attr=data.e, node_attr=data.x, edges=data.edges
-            )
+        with self.autocast(data.x.device.type):
+            if self.pass_to_global_to_edge:
+                edge_attr = self.edge_block(
+                    edge_attr=data.e,
+                    node_attr=data.x,
+                    edges=data.edges,
+                    global_attr=data.g,
+                    edge_idx=data.edge_idx,
+                )
+            else:
+                edge_attr = self.edge_block(
+                    edge_attr=data.e, node_attr=data.x, edges=data.edges
+                )
+
+            if self.pass_to_global_to_node:
+                node_attr = self.node_block(
+                    node_attr=data.x,
+                    edge_attr=edge_attr,
+                    edges=data.edges,
+                    global_attr=data.g,
+                    node_idx=data.node_idx,
+                )
+            else:
+                node_attr = self.node_block(
+                    node_attr=data.x, edge_attr=edge_attr, edges=data.edges
+                )
 
-        if self.pass_to_global_to_node:
-            node_attr = self.node_block(
-                node_attr=data.x,
+            global_attr = self.global_block(
+                global_attr=data.g,
+                node_attr=node_attr,
                 edge_attr=edge_attr,
                 edges=data.edges,
-                global_attr=data.g,
                 node_idx=data.node_idx,
+                edge_idx=data.edge_idx,
             )
-        else:
-            node_attr = self.node_block(
-                node_attr=data.x, edge_attr=edge_attr, edges=data.edges
-            )
-
-        global_attr = self.global_block(
-            global_attr=data.g,
-            node_attr=node_attr,
-            edge_attr=edge_attr,
-            edges=data.edges,
-            node_idx=data.node_idx,
-            edge_idx=data.edge_idx,
-        )
         return GraphTuple(edge_attr, node_attr, global_attr)
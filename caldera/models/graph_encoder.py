@@ -29,7 +29,8 @@ class GraphEncoder(GraphNetworkBase):
                     "error running `{}.forward()`. {}".format(block._get_name(), str(e))
                 ) from e
 
-        edge_attr = run_block(self.edge_block)
-        node_attr = run_block(self.node_block)
-        global_attr = run_block(self.global_block)
+        with self.autocast(data.x.device.type):
+            edge_attr = run_block(self.edge_block)
+            node_attr = run_block(self.node_block)
+            global_attr = run_block(self.global_block)
         return GraphTuple(edge_attr, node_attr, global_attr)
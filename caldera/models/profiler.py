@@ -0,0 +1,220 @@
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import torch
+
+from caldera.blocks.aggregator import AggregatorBase
+from caldera.blocks.block import Block
+from caldera.blocks.edge_block import EdgeBlock
+from caldera.blocks.flex import FlexBlock
+from caldera.blocks.global_block import GlobalBlock
+from caldera.blocks.node_block import NodeBlock
+from caldera.exceptions import CalderaNetsException
+
+
+def _kind(module: torch.nn.Module) -> str:
+    if isinstance(module, EdgeBlock):
+        return "edge"
+    elif isinstance(module, NodeBlock):
+        return "node"
+    elif isinstance(module, GlobalBlock):
+        return "global"
+    elif isinstance(module, AggregatorBase):
+        return "aggregator"
+    return "block"
+
+
+def _tensors(x) -> List[torch.Tensor]:
+    if torch.is_tensor(x):
+        return [x]
+    elif isinstance(x, (tuple, list)):
+        return [t for _x in x for t in _tensors(_x)]
+    return []
+
+
+def _nbytes(x) -> int:
+    return sum(t.element_size() * t.numel() for t in _tensors(x))
+
+
+def _layer_flops(module: torch.nn.Module, inputs, output) -> int:
+    """Estimate the FLOPs of a single layer call."""
+    x = inputs[0]
+    if isinstance(module, torch.nn.Linear):
+        rows = x.numel() // x.shape[-1] if x.shape[-1] else 0
+        flops = 2 * rows * module.in_features * module.out_features
+        if module.bias is not None:
+            flops += rows * module.out_features
+        return flops
+    elif isinstance(module, torch.nn.LayerNorm):
+        return 5 * x.numel()
+    return x.numel()
+
+
+class BlockProfiler:
+    """Records wall time, estimated FLOPs and output bytes for each edge,
+    node and global block and each aggregator call of a graph network.
+
+    FLOPs are estimated from the `nn.Linear`, `nn.LayerNorm` and activation
+    layers inside each block and are attributed to the innermost block or
+    aggregator that is running. Times are inclusive (e.g. a node block's time
+    includes its aggregator). Bytes are the size of the tensors each block
+    or aggregator returns.
+
+    Usage:
+
+    .. code-block:: python
+
+        with model.profile() as profiler:
+            model(batch, steps=5)
+        print(profiler.report())
+    """
+
+    flop_layers = (
+        torch.nn.Linear,
+        torch.nn.LayerNorm,
+        torch.nn.ReLU,
+        torch.nn.LeakyReLU,
+        torch.nn.Sigmoid,
+        torch.nn.Tanh,
+    )
+
+    def __init__(self, network: torch.nn.Module, synchronize: Optional[bool] = None):
+        """
+
+        :param network: the network to profile
+        :param synchronize: whether to synchronize CUDA before reading timers. By default, synchronizes if
+            the network has parameters on a CUDA device.
+        """
+        self.network = network
+        self.synchronize = synchronize
+        self.records = []
+        self.forward_count = 0
+        self._stack = []
+        self._handles = []
+
+    def _sync(self):
+        if self.synchronize:
+            torch.cuda.synchronize()
+
+    def _network_pre_hook(self, module, inputs):
+        self.forward_count += 1
+
+    def _block_pre_hook(self, name: str, kind: str):
+        def hook(module, inputs):
+            self._sync()
+            self._stack.append(
+                {
+                    "name": name,
+                    "kind": kind,
+                    "forward": self.forward_count,
+                    "time": time.perf_counter(),
+                    "flops": 0,
+                    "bytes": 0,
+                }
+            )
+
+        return hook
+
+    def _block_hook(self, module, inputs, output):
+        self._sync()
+        record = self._stack.pop()
+        record["time"] = time.perf_counter() - record["time"]
+        record["bytes"] = _nbytes(output)
+        if isinstance(module, AggregatorBase):
+            record["flops"] += inputs[0].numel()
+        self.records.append(record)
+
+    def _layer_hook(self, module, inputs, output):
+        if self._stack:
+            self._stack[-1]["flops"] += _layer_flops(module, inputs, output)
+
+    def start(self):
+        """Register the profiling hooks."""
+        if self._handles:
+            return self
+        for name, module in self.network.named_modules():
+            if isinstance(module, FlexBlock) and not module.is_resolved:
+                raise CalderaNetsException(
+                    "Cannot profile unresolved module '{}'. Resolve the network"
+                    " first (e.g. `network.resolve(...)`).".format(name)
+                )
+        if self.synchronize is None:
+            self.synchronize = any(p.is_cuda for p in self.network.parameters())
+        self._handles.append(
+            self.network.register_forward_pre_hook(self._network_pre_hook)
+        )
+        for name, module in self.network.named_modules():
+            if isinstance(module, (Block, AggregatorBase)):
+                self._handles.append(
+                    module.register_forward_pre_hook(
+                        self._block_pre_hook(name, _kind(module))
+                    )
+                )
+                self._handles.append(module.register_forward_hook(self._block_hook))
+            elif isinstance(module, self.flop_layers):
+                self._handles.append(module.register_forward_hook(self._layer_hook))
+        return self
+
+    def stop(self):
+        """Remove the profiling hooks."""
+        for handle in self._handles:
+            handle.remove()
+        self._handles = []
+        self._stack = []
+        return self
+
+    def clear(self):
+        self.records = []
+        self.forward_count = 0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Summarize the records by block, averaging over network forward
+        calls.
+
+        :return: dictionary of block name to kind, calls, and total and
+            per forward time (seconds), flops and bytes
+        """
+        report = OrderedDict()
+        for record in self.records:
+            if record["name"] not in report:
+                report[record["name"]] = {
+                    "kind": record["kind"],
+                    "calls": 0,
+                    "time": 0.0,
+                    "flops": 0,
+                    "bytes": 0,
+                }
+            r = report[record["name"]]
+            r["calls"] += 1
+            for k in ["time", "flops", "bytes"]:
+                r[k] += record[k]
+        n = max(self.forward_count, 1)
+        for r in report.values():
+            for k in ["time", "flops", "bytes"]:
+                r["{}_per_forward".format(k)] = r[k] / n
+        return report
+
+    def to_tensorboard(self, writer, global_step: int = None, prefix: str = "profile"):
+        """Write the report to a tensorboard writer (e.g. from
+        :func:`caldera.utils.tensorboard.new_writer`).
+
+        :param writer: the summary writer
+        :param global_step: the global step
+        :param prefix: tag prefix
+        :return: None
+        """
+        for name, r in self.report().items():
+            for k in ["time_per_forward", "flops_per_forward", "bytes_per_forward"]:
+                writer.add_scalar(
+                    "{}/{}/{}".format(prefix, name, k), r[k], global_step=global_step
+                )
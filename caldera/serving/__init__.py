@@ -0,0 +1,2 @@
+from caldera.serving.batcher import MicroBatcher
+from caldera.serving.cache import CachedModel
@@ -0,0 +1,198 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+import torch
+
+from caldera.data import GraphBatch
+from caldera.data import GraphData
+from caldera.data import GraphTuple
+
+
+def split_outputs(
+    out: GraphTuple, node_counts: List[int], edge_counts: List[int]
+) -> List[GraphTuple]:
+    """Split batched network outputs back into per graph outputs using the
+    node and edge counts of each graph in the batch.
+
+    :param out: batched outputs
+    :param node_counts: number of nodes for each graph in the batch
+    :param edge_counts: number of edges for each graph in the batch
+    :return: list of outputs, one for each graph
+    """
+    es = torch.split(out.e, edge_counts)
+    xs = torch.split(out.x, node_counts)
+    gs = torch.split(out.g, 1)
+    return [GraphTuple(e, x, g) for e, x, g in zip(es, xs, gs)]
+
+
+def run_batched(
+    model: torch.nn.Module, data_list: List[GraphData], **kwargs
+) -> List[GraphTuple]:
+    """Run the model on a list of graphs as a single `GraphBatch` and return
+    the outputs for each graph. If the model returns a list of outputs (e.g.
+    one per step in `EncodeCoreDecode`), the last output is used.
+
+    :param model: the network
+    :param data_list: list of graphs
+    :param kwargs: model keyword arguments
+    :return: list of outputs, one for each graph
+    """
+    batch = GraphBatch.from_data_list(data_list)
+    with torch.no_grad():
+        out = model(batch, **kwargs)
+    if isinstance(out, list):
+        out = out[-1]
+    return split_outputs(
+        GraphTuple(out.e, out.x, out.g),
+        [data.x.shape[0] for data in data_list],
+        [data.e.shape[0] for data in data_list],
+    )
+
+
+class MicroBatcher:
+    """Asynchronous micro-batcher for serving predictions one graph at a
+    time. Incoming graphs are queued and flushed as a single batch once
+    `max_batch_size` graphs are waiting or the oldest graph has waited
+    `max_delay` seconds.
+
+    Usage:
+
+    .. code-block:: python
+
+        async with MicroBatcher(model.eval(), model_kwargs={"steps": 5}) as batcher:
+            out = await batcher.predict(data)
+        print(batcher.latency_percentiles())
+    """
+
+    def __init__(
+        self,
+        model: torch.nn.Module,
+        max_batch_size: int = 32,
+        max_delay: float = 0.005,
+        model_kwargs: Optional[Dict] = None,
+        history: int = 10000,
+    ):
+        """
+
+        :param model: the network
+        :param max_batch_size: maximum number of graphs per batch
+        :param max_delay: maximum time (in seconds) a graph waits in the queue before its batch is flushed
+        :param model_kwargs: model keyword arguments (e.g. `steps`)
+        :param history: number of recent requests to keep latency statistics for
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.model_kwargs = model_kwargs or {}
+        self.queue_latencies = deque(maxlen=history)
+        self.batch_sizes = deque(maxlen=history)
+        self._queue = None
+        self._task = None
+        self._executor = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Flush any queued graphs and stop the batcher."""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._executor.shutdown()
+        self._task = None
+        self._executor = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    async def predict(self, data: GraphData) -> GraphTuple:
+        """Queue a graph and wait for its prediction.
+
+        :param data: the graph
+        :return: network output for the graph
+        """
+        if not self.running:
+            raise RuntimeError("{} is not running".format(self.__class__.__name__))
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        await self._queue.put((data, future, loop.time()))
+        return await future
+
+    async def _collect(self) -> Tuple[List, bool]:
+        loop = asyncio.get_running_loop()
+        item = await self._queue.get()
+        if item is None:
+            return [], True
+        items = [item]
+        deadline = item[2] + self.max_delay
+        while len(items) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            try:
+                if timeout > 0:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                else:
+                    item = self._queue.get_nowait()
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+            if item is None:
+                return items, True
+            items.append(item)
+        return items, False
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        done = False
+        while not done:
+            items, done = await self._collect()
+            if not items:
+                continue
+            now = loop.time()
+            self.queue_latencies.extend(now - t for _, _, t in items)
+            self.batch_sizes.append(len(items))
+            data_list = [data for data, _, _ in items]
+            try:
+                results = await loop.run_in_executor(
+                    self._executor,
+                    lambda: run_batched(self.model, data_list, **self.model_kwargs),
+                )
+            except Exception as e:
+                for _, future, _ in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future, _), result in zip(items, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def latency_percentiles(
+        self, percentiles: Tuple[float, ...] = (50, 90, 99)
+    ) -> Dict[str, float]:
+        """Return percentiles of the time (in seconds) requests spent queued
+        before their batch was dispatched.
+
+        :param percentiles: percentiles to compute
+        :return: dictionary of 'p<percentile>' to latency
+        """
+        if not self.queue_latencies:
+            return {"p{}".format(p): float("nan") for p in percentiles}
+        values = np.percentile(np.array(self.queue_latencies), percentiles)
+        return {"p{}".format(p): float(v) for p, v in zip(percentiles, values)}
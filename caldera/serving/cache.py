@@ -0,0 +1,125 @@
+from collections import OrderedDict
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import torch
+
+from caldera.data import GraphData
+from caldera.data import GraphTuple
+from caldera.data.hashing import graph_hash
+from caldera.serving.batcher import run_batched
+
+
+def _clone(out: GraphTuple) -> GraphTuple:
+    return GraphTuple(*[t.detach().clone() for t in out])
+
+
+def _nbytes(out: GraphTuple) -> int:
+    return sum(t.element_size() * t.numel() for t in out)
+
+
+class CachedModel:
+    """Content-addressed result cache around a model. Graphs are keyed by
+    :func:`caldera.data.hashing.graph_hash`. Cached outputs are returned for
+    repeated graphs and only the misses are batched and run through the
+    model.
+
+    Note that in 'wl' mode isomorphic graphs share a cache entry even if
+    their nodes and edges are in a different order. Node and edge outputs
+    are then returned in the order of the graph that populated the entry,
+    so 'wl' mode should only be used for order-invariant (e.g. global)
+    outputs.
+
+    Every returned output is a separate copy, so callers may modify
+    outputs in place without affecting the cache or each other.
+
+    Usage:
+
+    .. code-block:: python
+
+        cached = CachedModel(model.eval(), maxsize=10000, model_kwargs={"steps": 5})
+        outputs = cached(data_list)
+    """
+
+    def __init__(
+        self,
+        model: torch.nn.Module,
+        maxsize: Optional[int] = 1024,
+        max_bytes: Optional[int] = None,
+        hash_mode: str = "exact",
+        model_kwargs: Optional[Dict] = None,
+    ):
+        """
+
+        :param model: the network
+        :param maxsize: maximum number of cached outputs (None for unbounded)
+        :param max_bytes: maximum total size (in bytes) of cached outputs (None for unbounded)
+        :param hash_mode: 'exact' or 'wl' (see :func:`caldera.data.hashing.graph_hash`)
+        :param model_kwargs: model keyword arguments (e.g. `steps`)
+        """
+        self.model = model
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.hash_mode = hash_mode
+        self.model_kwargs = model_kwargs or {}
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def clear(self):
+        self._cache.clear()
+        self.nbytes = 0
+
+    def _get(self, key: str) -> Optional[GraphTuple]:
+        out = self._cache.get(key, None)
+        if out is not None:
+            self._cache.move_to_end(key)
+        return out
+
+    def _put(self, key: str, out: GraphTuple):
+        out = _clone(out)
+        self._cache[key] = out
+        self.nbytes += _nbytes(out)
+        while self._cache and (
+            (self.maxsize is not None and len(self._cache) > self.maxsize)
+            or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            _, evicted = self._cache.popitem(last=False)
+            self.nbytes -= _nbytes(evicted)
+
+    def __call__(self, data_list: List[GraphData]) -> List[GraphTuple]:
+        """Return outputs for each graph, running the model only on graphs
+        that are not cached.
+
+        :param data_list: list of graphs
+        :return: list of outputs, one for each graph
+        """
+        keys = [graph_hash(data, mode=self.hash_mode) for data in data_list]
+        results = [self._get(k) for k in keys]
+        results = [None if out is None else _clone(out) for out in results]
+
+        # unique misses
+        missed = OrderedDict()
+        for i, (k, out) in enumerate(zip(keys, results)):
+            if out is None:
+                missed.setdefault(k, []).append(i)
+        self.hits += len(keys) - sum(len(v) for v in missed.values())
+        self.misses += len(missed)
+
+        if missed:
+            outputs = run_batched(
+                self.model,
+                [data_list[idx[0]] for idx in missed.values()],
+                **self.model_kwargs
+            )
+            for (k, idx), out in zip(missed.items(), outputs):
+                self._put(k, out)
+                results[idx[0]] = out
+                for i in idx[1:]:
+                    results[i] = _clone(out)
+        return results
@@ -0,0 +1,8 @@
+from caldera.train.checkpoint import AsyncCheckpointer
+from caldera.train.sampler import EdgeBalancedSampler
+from caldera.train.sweep import grid
+from caldera.train.sweep import run_sweep
+from caldera.train.sweep import SweepResult
+from caldera.train.trainer import graph_mse
+from caldera.train.trainer import StepMetrics
+from caldera.train.trainer import Trainer
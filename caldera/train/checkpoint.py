@@ -0,0 +1,79 @@
+import os
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import List
+from typing import Optional
+
+import torch
+
+
+def snapshot(obj: Any) -> Any:
+    """Copy all tensors of a (nested) state dict to the CPU, so the copy is
+    unaffected by further training."""
+    if torch.is_tensor(obj):
+        obj = obj.detach()
+        return obj.clone() if obj.device.type == "cpu" else obj.cpu()
+    elif isinstance(obj, dict):
+        return obj.__class__((k, snapshot(v)) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        return obj.__class__(snapshot(v) for v in obj)
+    return obj
+
+
+class AsyncCheckpointer:
+    """Write checkpoints from a background thread.
+
+    :meth:`save` takes a snapshot of the state on the calling thread (a copy
+    of its tensors, which is cheap next to serialization) and writes it to
+    disk in the background, so training continues while the file is
+    written. At most one checkpoint is written at a time; saving while a
+    previous checkpoint is still being written first waits for it, which
+    bounds memory to two snapshots.
+    """
+
+    def __init__(self, directory: str, keep: Optional[int] = None):
+        """
+
+        :param directory: directory to write checkpoints to
+        :param keep: number of most recent checkpoints to keep (default: all)
+        """
+        self.directory = directory
+        self.keep = keep
+        self.paths: List[str] = []
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._future: Optional[Future] = None
+
+    def _write(self, state: Any, path: str):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = path + ".tmp"
+        torch.save(state, tmp)
+        os.replace(tmp, path)
+        self.paths.append(path)
+        if self.keep is not None:
+            while len(self.paths) > self.keep:
+                os.remove(self.paths.pop(0))
+
+    def save(self, state: Any, step: int) -> str:
+        """Snapshot the state and write it in the background.
+
+        :param state: state dict
+        :param step: step number, used in the file name
+        :return: path the checkpoint will be written to
+        """
+        state = snapshot(state)
+        self.wait()
+        path = os.path.join(self.directory, "checkpoint-{:08d}.pt".format(step))
+        self._future = self._executor.submit(self._write, state, path)
+        return path
+
+    def wait(self):
+        """Wait for the pending checkpoint (if any) to be written."""
+        if self._future is not None:
+            future, self._future = self._future, None
+            future.result()
+
+    def close(self):
+        """Wait for the pending checkpoint and stop the background thread."""
+        self.wait()
+        self._executor.shutdown()
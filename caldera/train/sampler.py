@@ -0,0 +1,129 @@
+import math
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+import torch
+import torch.distributed as dist
+from torch.utils.data import Dataset
+from torch.utils.data import Sampler
+
+from caldera.data import GraphData
+
+
+def num_edges(item) -> int:
+    """Number of edges of a graph, or the total number of edges of a tuple of
+    graphs."""
+    if isinstance(item, GraphData):
+        return item.e.shape[0]
+    return sum(num_edges(x) for x in item)
+
+
+class EdgeBalancedSampler(Sampler):
+    """Distributed sampler that balances the number of edges, rather than
+    the number of graphs, of each replica.
+
+    Indices are sorted by edge count (ties in random order) and assigned in
+    rounds of one graph per replica, the largest graph of a round going to
+    the replica with the fewest edges so far (longest processing time
+    first). Each replica gets the same number of graphs (as with
+    :class:`torch.utils.data.DistributedSampler`, the last round is padded
+    by repeating graphs), and the graphs of each replica are put in the
+    same random order, so the i-th batch of each replica has about the same
+    number of edges and replicas wait less on each other at each step.
+
+    Usage:
+
+    .. code-block:: python
+
+        sampler = EdgeBalancedSampler(dataset)
+        loader = GraphDataLoader(dataset, batch_size=32, sampler=sampler)
+        for epoch in range(epochs):
+            sampler.set_epoch(epoch)
+            ...
+    """
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        num_replicas: Optional[int] = None,
+        rank: Optional[int] = None,
+        shuffle: bool = True,
+        seed: int = 0,
+        edge_counts: Optional[Sequence[int]] = None,
+    ):
+        """
+
+        :param dataset: dataset of GraphData or tuples of GraphData
+        :param num_replicas: number of replicas (default: the world size)
+        :param rank: rank of this replica (default: the current rank)
+        :param shuffle: whether to shuffle graphs on each epoch
+        :param seed: random seed, which must be the same on all replicas
+        :param edge_counts: precomputed edge count of each graph. If not given,
+            every item of the dataset is loaded once to count its edges, which
+            can be expensive for lazily loaded datasets.
+        """
+        if num_replicas is None:
+            num_replicas = dist.get_world_size() if dist.is_initialized() else 1
+        if rank is None:
+            rank = dist.get_rank() if dist.is_initialized() else 0
+        if not 0 <= rank < num_replicas:
+            raise ValueError(
+                "Invalid rank {}, rank should be in [0, {}]".format(
+                    rank, num_replicas - 1
+                )
+            )
+        if edge_counts is None:
+            edge_counts = [num_edges(dataset[i]) for i in range(len(dataset))]
+        self.sizes = torch.as_tensor(edge_counts, dtype=torch.long)
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+        self.num_samples = math.ceil(len(self.sizes) / num_replicas)
+
+    def set_epoch(self, epoch: int):
+        """Set the epoch, which seeds the random order of the graphs."""
+        self.epoch = epoch
+
+    def partition(self) -> List[List[int]]:
+        """Return the indices of every replica."""
+        generator = torch.Generator()
+        generator.manual_seed(self.seed + self.epoch)
+        n = len(self.sizes)
+        order = torch.randperm(n, generator=generator) if self.shuffle else None
+        if order is None:
+            order = torch.arange(n)
+        order = order[torch.argsort(self.sizes[order], descending=True)]
+        total = self.num_samples * self.num_replicas
+        if total > n:
+            # pad by repeating the smallest graphs (cycling through all
+            # graphs if there are more replicas than graphs)
+            padding = order.flip(0).repeat(math.ceil((total - n) / n))[: total - n]
+            order = torch.cat([order, padding])
+            order = order[
+                torch.argsort(self.sizes[order], descending=True, stable=True)
+            ]
+
+        sizes = self.sizes[order].view(self.num_samples, self.num_replicas)
+        order = order.view(self.num_samples, self.num_replicas)
+        assigned = torch.empty_like(order)
+        load = torch.zeros(self.num_replicas, dtype=torch.long)
+        for i in range(self.num_samples):
+            # the least loaded replica takes the largest graph of the round
+            replicas = torch.argsort(load)
+            assigned[i, replicas] = order[i]
+            load[replicas] += sizes[i]
+
+        if self.shuffle:
+            perm = torch.randperm(self.num_samples, generator=generator)
+            assigned = assigned[perm]
+        return assigned.t().tolist()
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.partition()[self.rank])
+
+    def __len__(self):
+        return self.num_samples
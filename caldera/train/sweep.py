@@ -0,0 +1,296 @@
+"""sweep.py.
+
+Hyperparameter sweeps of graph networks across a pool of processes.
+"""
+import itertools
+import math
+import multiprocessing as mp
+import os
+import queue
+import tempfile
+import traceback
+from concurrent.futures import as_completed
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+
+import torch
+
+from caldera.data import GraphDataLoader
+from caldera.data import ShardDataset
+from caldera.data.stream import write_shard
+from caldera.models import EncodeCoreDecode
+from caldera.train.trainer import Trainer
+
+# configuration keys that set training options rather than model arguments
+_TRAINING_KEYS = ("lr", "batch_size", "steps")
+
+
+class SweepResult(NamedTuple):
+    """Result of a single sweep configuration.
+
+    :param index: index of the configuration
+    :param config: the configuration
+    :param losses: mean training loss of each epoch
+    :param eval_loss: loss on the evaluation dataset, if given
+    :param steps: number of optimization steps
+    :param seconds: training time (excluding setup and evaluation)
+    :param graphs_per_second: training throughput in graphs
+    :param edges_per_second: training throughput in edges
+    :param error: formatted traceback if the configuration failed
+    """
+
+    index: int
+    config: Dict[str, Any]
+    losses: List[float]
+    eval_loss: Optional[float]
+    steps: int
+    seconds: float
+    graphs_per_second: float
+    edges_per_second: float
+    error: Optional[str] = None
+
+    @property
+    def loss(self) -> float:
+        """Training loss of the last epoch."""
+        return self.losses[-1] if self.losses else math.nan
+
+
+def grid(**options: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Return the configurations of all combinations of options.
+
+    .. code-block:: python
+
+        grid(latent_sizes=[(16, 16, 16), (64, 64, 16)], aggregator=["add", "mean"])
+
+    :param options: list of values of each keyword
+    :return: list of configurations
+    """
+    keys = list(options)
+    return [dict(zip(keys, values)) for values in itertools.product(*options.values())]
+
+
+def _available_cpus() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _init_worker(threads: int, cores: Optional[mp.Queue], timeout: float = 1.0):
+    torch.set_num_threads(threads)
+    if cores is not None:
+        try:
+            os.sched_setaffinity(0, cores.get(timeout=timeout))
+        except queue.Empty:
+            # a worker respawned after all cores were handed out runs unpinned
+            pass
+
+
+def _to_shards(dataset, directory: str) -> ShardDataset:
+    items = [dataset[i] for i in range(len(dataset))]
+    if not items or not isinstance(items[0], tuple) or len(items[0]) != 2:
+        raise ValueError("Expected a dataset of (input, target) graph tuples")
+    write_shard(os.path.join(directory, "input"), [x[0] for x in items])
+    write_shard(os.path.join(directory, "target"), [x[1] for x in items])
+    return ShardDataset(
+        os.path.join(directory, "input"), os.path.join(directory, "target")
+    )
+
+
+def _run_trial(
+    index: int,
+    config: Dict[str, Any],
+    dataset: ShardDataset,
+    eval_dataset: Optional[ShardDataset],
+    build_model: Optional[Callable[..., torch.nn.Module]],
+    options: Dict[str, Any],
+) -> SweepResult:
+    try:
+        kwargs = {k: v for k, v in config.items() if k not in _TRAINING_KEYS}
+        lr = config.get("lr", options["lr"])
+        batch_size = config.get("batch_size", options["batch_size"])
+        steps = config.get("steps", options["steps"])
+
+        torch.manual_seed(options["seed"])
+        input, target = dataset[0]
+        if build_model is None:
+            kwargs.setdefault(
+                "output_sizes",
+                (target.e.shape[1], target.x.shape[1], target.g.shape[1]),
+            )
+            build_model = EncodeCoreDecode
+        model = build_model(**kwargs)
+        model.resolve(input.x.shape[1], input.e.shape[1], input.g.shape[1])
+
+        trainer = Trainer(
+            model,
+            optimizer=torch.optim.AdamW(model.parameters(), lr=lr),
+            model_kwargs={"steps": steps},
+            distributed=False,
+            **options["trainer_kwargs"]
+        )
+        generator = torch.Generator()
+        generator.manual_seed(options["seed"])
+        loader = GraphDataLoader(
+            dataset, batch_size=batch_size, shuffle=True, generator=generator
+        )
+        losses = trainer.fit(loader, epochs=options["epochs"])
+        eval_loss = None
+        if eval_dataset is not None:
+            eval_loss = trainer.evaluate(
+                GraphDataLoader(eval_dataset, batch_size=batch_size)
+            )
+        trainer.close()
+
+        seconds = sum(m.seconds for m in trainer.history)
+        graphs = sum(m.graphs for m in trainer.history)
+        edges = sum(m.edges for m in trainer.history)
+        return SweepResult(
+            index,
+            config,
+            losses,
+            eval_loss,
+            trainer.step,
+            seconds,
+            graphs / seconds if seconds else 0.0,
+            edges / seconds if seconds else 0.0,
+        )
+    except Exception:
+        return SweepResult(
+            index, config, [], None, 0, 0.0, 0.0, 0.0, traceback.format_exc()
+        )
+
+
+def run_sweep(
+    configs: Sequence[Dict[str, Any]],
+    dataset,
+    eval_dataset=None,
+    epochs: int = 1,
+    batch_size: int = 32,
+    lr: float = 1e-3,
+    steps: int = 1,
+    processes: Optional[int] = None,
+    threads_per_worker: Optional[int] = None,
+    pin_cores: bool = False,
+    seed: int = 0,
+    build_model: Optional[Callable[..., torch.nn.Module]] = None,
+    trainer_kwargs: Optional[Dict[str, Any]] = None,
+    callback: Optional[Callable[[SweepResult], Any]] = None,
+) -> List[SweepResult]:
+    """Train a network for each configuration across a pool of processes and
+    record the loss and throughput of each.
+
+    Each configuration holds the keyword arguments of `build_model`
+    (default: :class:`caldera.models.EncodeCoreDecode`, e.g. `latent_sizes`,
+    `depths` and `aggregator`, with `output_sizes` defaulting to the target
+    sizes), and may override the `lr`, `batch_size` and `steps` training
+    options. Each configuration is trained with a :class:`Trainer` in a
+    worker process, from the same seed.
+
+    Each worker runs `threads_per_worker` intra-op threads (default: the
+    available CPUs divided by `processes`) so that workers do not
+    oversubscribe the CPUs; with `pin_cores`, each worker is also bound to
+    its own set of cores. Datasets that are not a
+    :class:`caldera.data.ShardDataset` are first written to temporary
+    memory-mapped shards, so workers share a single copy of the data
+    through the OS page cache rather than each receiving a pickled copy.
+
+    A configuration that raises is reported with its traceback in
+    :attr:`SweepResult.error` and does not stop the sweep.
+
+    Usage:
+
+    .. code-block:: python
+
+        configs = grid(latent_sizes=[(16, 16, 16), (64, 64, 16)],
+                       depths=[(1, 1, 1), (2, 2, 2)], aggregator=["add", "mean"])
+        results = run_sweep(configs, dataset, eval_dataset, epochs=10, processes=4)
+        best = min(results, key=lambda r: r.eval_loss)
+
+    :param configs: list of configurations (see :func:`grid`)
+    :param dataset: dataset of `(input, target)` graph tuples
+    :param eval_dataset: optional dataset of `(input, target)` graph tuples
+        for evaluation after training
+    :param epochs: number of epochs
+    :param batch_size: default batch size
+    :param lr: default AdamW learning rate
+    :param steps: default number of message passing steps
+    :param processes: number of worker processes (default: one per available
+        CPU, or per `threads_per_worker` CPUs, at most one per configuration)
+    :param threads_per_worker: number of torch threads of each worker
+    :param pin_cores: whether to bind each worker to its own cores (Linux only)
+    :param seed: random seed of each configuration
+    :param build_model: picklable (e.g. module level) function that returns
+        the network from the keyword arguments of a configuration
+    :param trainer_kwargs: additional :class:`Trainer` keyword arguments
+    :param callback: function called in the main process with each result as
+        it completes
+    :return: results, in the order of `configs`
+    """
+    configs = list(configs)
+    if not configs:
+        return []
+    cpus = _available_cpus()
+    if processes is None:
+        processes = max(1, len(cpus) // (threads_per_worker or 1))
+    processes = max(1, min(processes, len(configs)))
+    if threads_per_worker is None:
+        threads_per_worker = max(1, len(cpus) // processes)
+    options = dict(
+        epochs=epochs,
+        batch_size=batch_size,
+        lr=lr,
+        steps=steps,
+        seed=seed,
+        trainer_kwargs=dict(trainer_kwargs or {}),
+    )
+
+    context = mp.get_context("spawn")
+    cores = None
+    if pin_cores and hasattr(os, "sched_setaffinity"):
+        if threads_per_worker * processes > len(cpus):
+            raise ValueError(
+                "Cannot pin {} workers of {} threads to {} CPUs".format(
+                    processes, threads_per_worker, len(cpus)
+                )
+            )
+        cores = context.Queue()
+        for i in range(processes):
+            cores.put(set(cpus[i * threads_per_worker : (i + 1) * threads_per_worker]))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if not isinstance(dataset, ShardDataset):
+            dataset = _to_shards(dataset, os.path.join(tmpdir, "train"))
+        if eval_dataset is not None and not isinstance(eval_dataset, ShardDataset):
+            eval_dataset = _to_shards(eval_dataset, os.path.join(tmpdir, "eval"))
+
+        results: List[Optional[SweepResult]] = [None] * len(configs)
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(threads_per_worker, cores),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _run_trial,
+                    i,
+                    config,
+                    dataset,
+                    eval_dataset,
+                    build_model,
+                    options,
+                )
+                for i, config in enumerate(configs)
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                results[result.index] = result
+                if callback is not None:
+                    callback(result)
+    return results
@@ -0,0 +1,436 @@
+import time
+from contextlib import nullcontext
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+import torch
+import torch.distributed as dist
+from torch.nn.parallel import DistributedDataParallel
+
+from caldera.blocks.flex import FlexBlock
+from caldera.data import GraphBatch
+from caldera.data import GraphData
+from caldera.exceptions import CalderaNetsException
+from caldera.train.checkpoint import AsyncCheckpointer
+
+Outputs = Union[GraphBatch, Sequence[GraphBatch]]
+
+
+def graph_mse(outputs: Outputs, target: GraphBatch) -> torch.Tensor:
+    """Mean squared error of the node, edge and global attributes of the
+    outputs against the target, averaged over outputs (e.g. the outputs of
+    each step of :class:`caldera.models.EncodeCoreDecode`).
+
+    :param outputs: output batch or list of output batches
+    :param target: target batch
+    :return: scalar loss
+    """
+    if isinstance(outputs, GraphData):
+        outputs = [outputs]
+    loss = 0.0
+    for out in outputs:
+        for o, t in zip((out.x, out.e, out.g), (target.x, target.e, target.g)):
+            if o.numel():
+                loss = loss + torch.nn.functional.mse_loss(o, t)
+    return loss / len(outputs)
+
+
+class StepMetrics(NamedTuple):
+    """Metrics of a single optimization step.
+
+    :param epoch: epoch
+    :param step: optimization step (starting at 1)
+    :param loss: mean loss of the step's batches (a detached tensor, so
+        reading the metrics does not synchronize the device)
+    :param batches: number of accumulated batches
+    :param graphs: number of graphs
+    :param nodes: number of nodes
+    :param edges: number of edges
+    :param seconds: wall time of the step, including loading its batches but
+        excluding evaluation and checkpointing
+    :param data_seconds: part of `seconds` spent waiting for batches
+    :param eval_loss: evaluation loss, if evaluated after this step
+    """
+
+    epoch: int
+    step: int
+    loss: torch.Tensor
+    batches: int
+    graphs: int
+    nodes: int
+    edges: int
+    seconds: float
+    data_seconds: float
+    eval_loss: Optional[float] = None
+
+    @property
+    def graphs_per_second(self) -> float:
+        return self.graphs / self.seconds
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds
+
+    @property
+    def edges_per_second(self) -> float:
+        return self.edges / self.seconds
+
+
+class Trainer:
+    """Trainer for graph networks (e.g. :class:`caldera.models.EncodeCoreDecode`)
+    on batches of `(input, target)` graphs.
+
+    **Gradient accumulation.** Gradients of consecutive batches are
+    accumulated until a budget of batches, nodes or edges is reached, then a
+    single optimizer step is taken. Losses are weighted by the number of
+    graphs in each batch, so for losses that are means over graphs, a step
+    is the same as a step on all of its graphs at once. Together with size-budgeted batches (e.g.
+    :meth:`caldera.data.GraphStream.batched`), this gives large effective
+    batches with bounded memory.
+
+    **Distributed training.** If a default process group is initialized (or
+    `distributed=True`), the network is wrapped in
+    :class:`torch.nn.parallel.DistributedDataParallel`, which averages
+    gradients across processes. This works on CPU with the `gloo` backend.
+    Gradients are only synchronized on the last batch of a step. The budget
+    is checked on the sizes summed over all processes (one small all-reduce
+    per batch), so all processes step together. Use a distributed sampler
+    (e.g. :class:`caldera.train.EdgeBalancedSampler`) so each process trains
+    on its own share of the dataset and all processes get the same number of
+    batches.
+
+    **Evaluation and checkpoints.** :meth:`fit` optionally evaluates (without
+    gradients) every `eval_every` steps and writes checkpoints every
+    `checkpoint_every` steps from a background thread (on rank 0 only).
+    Evaluation losses are recorded in `eval_history` as `(step, loss)`.
+
+    **Metrics.** Each step produces :class:`StepMetrics` (loss, sizes and
+    throughput), which are appended to `history` and passed to `callback`.
+
+    Usage:
+
+    .. code-block:: python
+
+        model = EncodeCoreDecode().resolve(n_feat, e_feat, g_feat)
+        trainer = Trainer(
+            model,
+            model_kwargs={"steps": 5},
+            max_edges_per_step=100000,
+            checkpoint_dir="checkpoints",
+        )
+        trainer.fit(loader, epochs=10, eval_loader=eval_loader, eval_every=100,
+                    checkpoint_every=1000, callback=lambda m: print(m.edges_per_second))
+        trainer.close()
+    """
+
+    def __init__(
+        self,
+        model: torch.nn.Module,
+        optimizer: Optional[torch.optim.Optimizer] = None,
+        loss_fn: Callable[[Outputs, GraphBatch], torch.Tensor] = graph_mse,
+        device: Optional[Union[str, torch.device]] = None,
+        model_kwargs: Optional[Dict[str, Any]] = None,
+        distributed: Optional[bool] = None,
+        max_batches_per_step: Optional[int] = None,
+        max_nodes_per_step: Optional[int] = None,
+        max_edges_per_step: Optional[int] = None,
+        checkpoint_dir: Optional[str] = None,
+        keep_checkpoints: Optional[int] = None,
+    ):
+        """
+
+        :param model: the network. Flexible dimensions must already be resolved
+            (e.g. with `model.resolve(...)`) so that all parameters exist.
+        :param optimizer: optimizer (default: AdamW with a learning rate of 1e-3)
+        :param loss_fn: function of the network outputs and the target batch
+        :param device: device to train on (default: device of the model parameters)
+        :param model_kwargs: additional forward keyword arguments (e.g. `steps`)
+        :param distributed: whether to wrap the network in DistributedDataParallel
+            (default: whether the default process group is initialized)
+        :param max_batches_per_step: maximum number of batches per optimizer step.
+            If no batch, node or edge budget is given, each batch is a step.
+        :param max_nodes_per_step: step once at least this many nodes (per
+            process) are accumulated
+        :param max_edges_per_step: step once at least this many edges (per
+            process) are accumulated
+        :param checkpoint_dir: directory for checkpoints
+        :param keep_checkpoints: number of most recent checkpoints to keep
+        """
+        for name, module in model.named_modules():
+            if isinstance(module, FlexBlock) and not module.is_resolved:
+                raise CalderaNetsException(
+                    "Cannot train unresolved module '{}'. Resolve the network"
+                    " first (e.g. `network.resolve(...)`).".format(name)
+                )
+        if max_batches_per_step is not None and max_batches_per_step < 1:
+            raise ValueError(
+                "max_batches_per_step must be at least 1, not {}".format(
+                    max_batches_per_step
+                )
+            )
+        if device is None:
+            param = next(model.parameters(), None)
+            device = param.device if param is not None else "cpu"
+        self.device = torch.device(device)
+        self.model = model.to(self.device)
+        if distributed is None:
+            distributed = dist.is_available() and dist.is_initialized()
+        self.distributed = distributed
+        self.world_size = dist.get_world_size() if distributed else 1
+        self.rank = dist.get_rank() if distributed else 0
+        if distributed:
+            device_ids = [self.device] if self.device.type == "cuda" else None
+            self.module = DistributedDataParallel(self.model, device_ids=device_ids)
+        else:
+            self.module = self.model
+        if optimizer is None:
+            optimizer = torch.optim.AdamW(self.model.parameters(), lr=1e-3)
+        self.optimizer = optimizer
+        self.loss_fn = loss_fn
+        self.model_kwargs = dict(model_kwargs or {})
+        self.max_batches_per_step = max_batches_per_step
+        self.max_nodes_per_step = max_nodes_per_step
+        self.max_edges_per_step = max_edges_per_step
+        self.checkpointer = None
+        if checkpoint_dir is not None:
+            self.checkpointer = AsyncCheckpointer(checkpoint_dir, keep=keep_checkpoints)
+        self.epoch = 0
+        self.step = 0
+        self.history: List[StepMetrics] = []
+        self.eval_history: List[Tuple[int, float]] = []
+
+    def _to_device(self, batch: Tuple[GraphBatch, GraphBatch]):
+        non_blocking = self.device.type == "cuda"
+        return tuple(b.to(self.device, non_blocking=non_blocking) for b in batch)
+
+    @staticmethod
+    def _sizes(batch: Tuple[GraphBatch, GraphBatch]) -> List[int]:
+        input = batch[0]
+        return [input.num_graphs, input.num_nodes, input.e.shape[0]]
+
+    def _budget_reached(self, n_batches: int, sizes: torch.Tensor) -> bool:
+        budget = self.world_size
+        if (
+            self.max_batches_per_step is None
+            and self.max_nodes_per_step is None
+            and self.max_edges_per_step is None
+        ):
+            return True
+        return (
+            (
+                self.max_batches_per_step is not None
+                and n_batches >= self.max_batches_per_step
+            )
+            or (
+                self.max_nodes_per_step is not None
+                and sizes[1] >= self.max_nodes_per_step * budget
+            )
+            or (
+                self.max_edges_per_step is not None
+                and sizes[2] >= self.max_edges_per_step * budget
+            )
+        )
+
+    def _backward(self, batch, weight: int, sync: bool) -> torch.Tensor:
+        input, target = self._to_device(batch)
+        context = (
+            self.module.no_sync() if self.distributed and not sync else nullcontext()
+        )
+        with context:
+            loss = self.loss_fn(self.module(input, **self.model_kwargs), target)
+            (loss * weight).backward()
+        return loss.detach()
+
+    def _optimizer_step(self, total_graphs: float):
+        # gradients are sums of graph weighted losses (averaged over
+        # processes by DistributedDataParallel); normalize to the mean
+        scale = self.world_size / max(total_graphs, 1)
+        for group in self.optimizer.param_groups:
+            for p in group["params"]:
+                if p.grad is not None:
+                    p.grad.mul_(scale)
+        self.optimizer.step()
+        self.optimizer.zero_grad(set_to_none=True)
+        self.step += 1
+
+    def train_step(self, batch: Tuple[GraphBatch, GraphBatch]) -> torch.Tensor:
+        """Run a single optimization step on a single batch.
+
+        :param batch: tuple of input and target batches
+        :return: the (detached) loss
+        """
+        self.module.train()
+        self.optimizer.zero_grad(set_to_none=True)
+        loss = self._backward(batch, 1, sync=True)
+        self._optimizer_step(self.world_size)
+        return loss
+
+    def _reduce(self, total: torch.Tensor, count: float) -> float:
+        """Average a sum over all processes."""
+        if self.distributed:
+            t = torch.stack([total.double().cpu(), torch.tensor(float(count))])
+            dist.all_reduce(t)
+            total, count = t[0], t[1]
+        return float(total) / max(float(count), 1)
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {
+            "model": self.model.state_dict(),
+            "optimizer": self.optimizer.state_dict(),
+            "epoch": self.epoch,
+            "step": self.step,
+        }
+
+    def load_state_dict(self, state: Dict[str, Any]):
+        self.model.load_state_dict(state["model"])
+        self.optimizer.load_state_dict(state["optimizer"])
+        self.epoch = state["epoch"]
+        self.step = state["step"]
+
+    def save_checkpoint(self) -> Optional[str]:
+        """Write a checkpoint in the background (on rank 0 only).
+
+        :return: path of the checkpoint
+        """
+        if self.checkpointer is None:
+            raise CalderaNetsException("No `checkpoint_dir` given")
+        if self.rank == 0:
+            return self.checkpointer.save(self.state_dict(), self.step)
+
+    def load_checkpoint(self, path: str):
+        """Restore the model, optimizer, epoch and step from a checkpoint."""
+        self.load_state_dict(torch.load(path, map_location=self.device))
+
+    def fit(
+        self,
+        loader: Iterable[Tuple[GraphBatch, GraphBatch]],
+        epochs: int = 1,
+        eval_loader: Optional[Iterable[Tuple[GraphBatch, GraphBatch]]] = None,
+        eval_every: Optional[int] = None,
+        checkpoint_every: Optional[int] = None,
+        callback: Optional[Callable[[StepMetrics], Any]] = None,
+    ) -> List[float]:
+        """Train for a number of epochs.
+
+        :param loader: loader of `(input, target)` batches
+        :param epochs: number of epochs
+        :param eval_loader: loader for evaluation
+        :param eval_every: evaluate on `eval_loader` every this many steps
+            (default: at the end of each epoch)
+        :param checkpoint_every: write a checkpoint every this many steps
+            (default: at the end of each epoch if a `checkpoint_dir` is given)
+        :param callback: function called with the metrics of each step
+        :return: mean training loss of each epoch (over all processes)
+        """
+        losses = []
+        for _ in range(epochs):
+            # seed epoch dependent shuffling (samplers and streams)
+            for obj in [
+                getattr(loader, "sampler", None),
+                getattr(loader, "dataset", None),
+            ]:
+                if hasattr(obj, "set_epoch"):
+                    obj.set_epoch(self.epoch)
+            self.module.train()
+            epoch_loss = torch.zeros((), dtype=torch.float64, device=self.device)
+            epoch_graphs = 0
+
+            batches = iter(loader)
+            start = time.perf_counter()
+            batch = next(batches, None)
+            data_seconds = time.perf_counter() - start
+            n_batches = 0
+            step_loss = torch.zeros((), dtype=torch.float64, device=self.device)
+            step_sizes = torch.zeros(3, dtype=torch.long)
+            while batch is not None:
+                sizes = torch.tensor(self._sizes(batch))
+                total = step_sizes + sizes
+                if self.distributed:
+                    dist.all_reduce(total)
+                n_batches += 1
+
+                # look ahead, so the last batch of an epoch ends a step
+                fetched = time.perf_counter()
+                following = next(batches, None)
+                data_seconds += time.perf_counter() - fetched
+                sync = following is None or self._budget_reached(n_batches, total)
+
+                loss = self._backward(batch, int(sizes[0]), sync=sync)
+                step_loss += loss * int(sizes[0])
+                step_sizes += sizes
+                batch = following
+                if not sync:
+                    continue
+
+                self._optimizer_step(float(total[0]))
+                seconds = time.perf_counter() - start
+                epoch_loss += step_loss
+                epoch_graphs += int(step_sizes[0])
+                eval_loss = None
+                if (
+                    eval_loader is not None
+                    and eval_every
+                    and self.step % eval_every == 0
+                ):
+                    eval_loss = self.evaluate(eval_loader)
+                    self.eval_history.append((self.step, eval_loss))
+                    self.module.train()
+                if checkpoint_every and self.step % checkpoint_every == 0:
+                    self.save_checkpoint()
+                metrics = StepMetrics(
+                    self.epoch,
+                    self.step,
+                    step_loss / max(int(step_sizes[0]), 1),
+                    n_batches,
+                    *step_sizes.tolist(),
+                    seconds,
+                    data_seconds,
+                    eval_loss,
+                )
+                self.history.append(metrics)
+                if callback is not None:
+                    callback(metrics)
+                # evaluation, checkpointing and the callback are not timed
+                start = time.perf_counter()
+                data_seconds = 0.0
+                n_batches = 0
+                step_loss = torch.zeros((), dtype=torch.float64, device=self.device)
+                step_sizes = torch.zeros(3, dtype=torch.long)
+
+            losses.append(self._reduce(epoch_loss, epoch_graphs))
+            self.epoch += 1
+            if eval_loader is not None and not eval_every:
+                self.eval_history.append((self.step, self.evaluate(eval_loader)))
+            if self.checkpointer is not None and not checkpoint_every:
+                self.save_checkpoint()
+        return losses
+
+    def evaluate(self, loader: Iterable[Tuple[GraphBatch, GraphBatch]]) -> float:
+        """Return the mean loss (per graph) over a loader, without gradients.
+
+        :param loader: loader of `(input, target)` batches
+        :return: mean loss (over all processes)
+        """
+        self.module.eval()
+        total = torch.zeros((), dtype=torch.float64, device=self.device)
+        count = 0
+        with torch.no_grad():
+            for batch in loader:
+                input, target = self._to_device(batch)
+                loss = self.loss_fn(self.model(input, **self.model_kwargs), target)
+                total += loss * input.num_graphs
+                count += input.num_graphs
+        return self._reduce(total, count)
+
+    def close(self):
+        """Wait for pending checkpoints."""
+        if self.checkpointer is not None:
+            self.checkpointer.close()
@@ -8,8 +8,19 @@ from caldera.utils.jit import jit_scatter_group
 from caldera.utils.jit import scatter_group
 from caldera.utils.jit import stable_arg_sort_long
 from caldera.utils.jit import unique_with_counts
+from caldera.utils.topology import dag_depth
+from caldera.utils.topology import in_degree
+from caldera.utils.topology import leaf_mask
+from caldera.utils.topology import out_degree
+from caldera.utils.topology import partition
+from caldera.utils.topology import root_mask
+from caldera.utils.topology import topological_levels
+from caldera.utils.topology import topological_order
 from caldera.utils.torch_utils import deterministic_seed
+from caldera.utils.torch_utils import index_to_slice
+from caldera.utils.torch_utils import pack_tensors
 from caldera.utils.torch_utils import same_storage
+from caldera.utils.torch_utils import select_columns
 
 T = TypeVar("T")
 K = TypeVar("K")
@@ -5,12 +5,12 @@ import networkx as nx
 
 
 def iter_roots(g: nx.DiGraph) -> Generator[Hashable, None, None]:
-    for n in g.nodes():
-        if not list(g.predecessors(n)):
+    for n, d in g.in_degree():
+        if not d:
             yield n
 
 
 def iter_leaves(g: nx.DiGraph) -> Generator[Hashable, None, None]:
-    for n in g.nodes():
-        if not list(g.successors(n)):
+    for n, d in g.out_degree():
+        if not d:
             yield n
@@ -1,26 +1,279 @@
-from os.path import isdir
+import os
+import threading
+import time
+from collections import deque
+from os.path import basename
+from os.path import dirname
+from typing import Any
+from typing import List
+from typing import Optional
+
+import numpy as np
+import torch
 
 try:
     from torch.utils.tensorboard import SummaryWriter
 except ImportError as e:
     SummaryWriter = None
 
+DROP_POLICIES = ("oldest", "newest", "block")
+
+
+def _snapshot(value: Any, events: List[Any]) -> Any:
+    # copy tensors and arrays so later in-place updates (e.g. optimizer
+    # steps) do not change what is logged
+    if torch.is_tensor(value):
+        value = value.detach()
+        if value.device.type == "cuda":
+            # copy asynchronously into pinned memory; the background thread
+            # waits for the recorded event before reading the copy
+            out = torch.empty(
+                value.shape, dtype=value.dtype, layout=value.layout, pin_memory=True
+            )
+            out.copy_(value, non_blocking=True)
+            event = torch.cuda.Event()
+            event.record()
+            events.append(event)
+            return out
+        return value.clone() if value.device.type == "cpu" else value.cpu()
+    elif isinstance(value, np.ndarray):
+        return value.copy()
+    elif isinstance(value, dict):
+        return {k: _snapshot(v, events) for k, v in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return value.__class__(_snapshot(v, events) for v in value)
+    return value
+
+
+def _next_directory(directory: str, suffix: str = "") -> str:
+    """Return the first `directory + "%04d" % index + suffix` that does not
+    exist, listing the parent directory once."""
+    parent = dirname(directory) or "."
+    prefix = basename(directory)
+    existing = set()
+    if os.path.isdir(parent):
+        existing = {
+            name
+            for name in os.listdir(parent)
+            if name.startswith(prefix) and os.path.isdir(os.path.join(parent, name))
+        }
+    i = 0
+    while prefix + "%04d" % i + suffix in existing:
+        i += 1
+    return directory + "%04d" % i + suffix
+
+
+def _to_python(value: Any) -> Any:
+    # scalars are converted in the background thread, so reading a device
+    # tensor does not synchronize the training loop
+    if torch.is_tensor(value) and value.numel() == 1 and value.dim() == 0:
+        return value.item()
+    return value
+
+
+class AsyncWriter:
+    """Wraps a summary writer so that logging never blocks the caller.
+
+    Calls to `add_*` methods (e.g. `add_scalar`, `add_histogram`) are
+    queued and forwarded to the wrapped writer from a background thread,
+    which also flushes the writer every `flush_secs`. On the calling
+    thread, tensors are only detached and copied; converting scalars with
+    `.item()`, computing histograms and serialization all happen in the
+    background. CUDA tensors are copied to pinned memory with
+    `non_blocking=True` and the background thread waits on a CUDA event for
+    the copy to complete, so logging a loss tensor does not synchronize the
+    device.
+
+    The queue holds at most `max_queue` calls. When it is full, the
+    `drop` policy decides what happens to a new call: `"oldest"` drops the
+    oldest queued call, `"newest"` drops the new call and `"block"` waits
+    for space. Dropped calls are counted in :attr:`dropped`.
+
+    Usage:
+
+    .. code-block:: python
+
+        writer = AsyncWriter(SummaryWriter("runs/exp"), max_queue=1000)
+        trainer.fit(loader, callback=lambda m: writer.add_scalar("loss", m.loss, m.step))
+        profiler.to_tensorboard(writer, global_step=epoch)
+        writer.close()
+    """
+
+    def __init__(
+        self,
+        writer: Any,
+        max_queue: int = 1000,
+        drop: str = "oldest",
+        flush_secs: Optional[float] = 10.0,
+    ):
+        """
+
+        :param writer: the wrapped writer (e.g. a `SummaryWriter`)
+        :param max_queue: maximum number of queued calls
+        :param drop: policy when the queue is full, one of `"oldest"`,
+            `"newest"` or `"block"`
+        :param flush_secs: flush the wrapped writer every this many seconds
+            (None to only flush on :meth:`flush` and :meth:`close`)
+        """
+        if drop not in DROP_POLICIES:
+            raise ValueError(
+                "Drop policy '{}' not one of {}".format(drop, DROP_POLICIES)
+            )
+        if max_queue < 1:
+            raise ValueError("max_queue must be at least 1, not {}".format(max_queue))
+        self.writer = writer
+        self.max_queue = max_queue
+        self.drop = drop
+        self.flush_secs = flush_secs
+        self.dropped = 0
+        self.errors = 0
+        self._queue = deque()
+        self._pending = 0
+        self._closed = False
+        self._flush_requested = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __getattr__(self, name: str):
+        writer = self.__dict__.get("writer")
+        if name.startswith("add_") and hasattr(writer, name):
+
+            def log(*args, **kwargs):
+                self._put(name, args, kwargs)
+
+            return log
+        raise AttributeError(
+            "'{}' object has no attribute '{}'".format(self.__class__.__name__, name)
+        )
+
+    def _put(self, method: str, args: tuple, kwargs: dict):
+        events = []
+        item = (method, _snapshot(args, events), _snapshot(kwargs, events), events)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cannot log to a closed writer")
+            if len(self._queue) >= self.max_queue:
+                if self.drop == "newest":
+                    self.dropped += 1
+                    return
+                elif self.drop == "oldest":
+                    self._queue.popleft()
+                    self._pending -= 1
+                    self.dropped += 1
+                else:
+                    self._condition.wait_for(
+                        lambda: len(self._queue) < self.max_queue or self._closed
+                    )
+                    if self._closed:
+                        raise RuntimeError("Cannot log to a closed writer")
+            self._queue.append(item)
+            self._pending += 1
+            self._condition.notify_all()
+
+    def _write(self, item):
+        method, args, kwargs, events = item
+        for event in events:
+            event.synchronize()
+        args = tuple(_to_python(a) for a in args)
+        kwargs = {k: _to_python(v) for k, v in kwargs.items()}
+        try:
+            getattr(self.writer, method)(*args, **kwargs)
+        except Exception:
+            # a bad call must not stop the logging thread
+            self.errors += 1
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            with self._condition:
+                timeout = None
+                if self.flush_secs is not None:
+                    timeout = max(0.0, last_flush + self.flush_secs - time.monotonic())
+                self._condition.wait_for(
+                    lambda: self._queue or self._closed or self._flush_requested,
+                    timeout=timeout,
+                )
+                items = list(self._queue)
+                self._queue.clear()
+                flush = self._flush_requested
+                closed = self._closed
+                # waiting producers can fill the queue while these are written
+                self._condition.notify_all()
+            for item in items:
+                self._write(item)
+            now = time.monotonic()
+            if (
+                flush
+                or closed
+                or (self.flush_secs is not None and now - last_flush >= self.flush_secs)
+            ):
+                if hasattr(self.writer, "flush"):
+                    self.writer.flush()
+                last_flush = now
+            with self._condition:
+                self._pending -= len(items)
+                if flush and not self._queue:
+                    self._flush_requested = False
+                self._condition.notify_all()
+                if closed and not self._queue:
+                    return
+
+    @property
+    def pending(self) -> int:
+        """Number of calls queued or being written."""
+        return self._pending
+
+    def flush(self):
+        """Block until all queued calls are written and the wrapped writer
+        is flushed."""
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            self._condition.wait_for(
+                lambda: not self._flush_requested or not self._thread.is_alive()
+            )
+
+    def close(self):
+        """Write all queued calls, stop the background thread and close the
+        wrapped writer."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        if hasattr(self.writer, "close"):
+            self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 if SummaryWriter is None:
 
     def new_writer(*args, **kwargs):
         raise ImportError("`tensorboard` not installed")
 
-
 else:
 
-    def new_writer(directory: str, suffix=""):
-        i = 0
-
-        def name(index):
-            return directory + "%04d" % index + suffix
+    def new_writer(directory: str, suffix="", asynchronous: bool = False, **kwargs):
+        """Return a writer in a new directory `directory + "%04d" % index +
+        suffix`, using the first free index.
 
-        while isdir(name(i)):
-            i += 1
-        dirname = name(i)
-        print("New writer at '{}'".format(dirname))
-        return SummaryWriter(dirname)
+        :param directory: directory prefix
+        :param suffix: directory suffix
+        :param asynchronous: whether to wrap the writer in an
+            :class:`AsyncWriter` so logging does not block
+        :param kwargs: additional :class:`AsyncWriter` keyword arguments
+        :return: the writer
+        """
+        path = _next_directory(directory, suffix)
+        print("New writer at '{}'".format(path))
+        writer = SummaryWriter(path)
+        if asynchronous:
+            return AsyncWriter(writer, **kwargs)
+        return writer
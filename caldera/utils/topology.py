@@ -0,0 +1,379 @@
+"""Tensor-native graph topology utilities operating on `(2, E)` edge index
+tensors."""
+import math
+from typing import Optional
+
+import torch
+import torch_scatter
+
+
+def in_degree(edges: torch.LongTensor, n_nodes: int) -> torch.LongTensor:
+    """Return the in degree of each node.
+
+    :param edges: edge index tensor of shape (2, E)
+    :param n_nodes: number of nodes
+    :return: in degree tensor of shape (n_nodes,)
+    """
+    return torch.bincount(edges[1], minlength=n_nodes)
+
+
+def out_degree(edges: torch.LongTensor, n_nodes: int) -> torch.LongTensor:
+    """Return the out degree of each node.
+
+    :param edges: edge index tensor of shape (2, E)
+    :param n_nodes: number of nodes
+    :return: out degree tensor of shape (n_nodes,)
+    """
+    return torch.bincount(edges[0], minlength=n_nodes)
+
+
+def root_mask(edges: torch.LongTensor, n_nodes: int) -> torch.BoolTensor:
+    """Return a mask of nodes with no predecessors (see
+    :func:`caldera.utils.nx_utils.iter_roots`)."""
+    return in_degree(edges, n_nodes) == 0
+
+
+def leaf_mask(edges: torch.LongTensor, n_nodes: int) -> torch.BoolTensor:
+    """Return a mask of nodes with no successors (see
+    :func:`caldera.utils.nx_utils.iter_leaves`)."""
+    return out_degree(edges, n_nodes) == 0
+
+
+def _csr(edges: torch.LongTensor, n_nodes: int):
+    """Return the destinations of `edges` sorted by source and the start
+    offset of each node's outgoing edges."""
+    order = torch.argsort(edges[0])
+    degree = out_degree(edges, n_nodes)
+    ptr = torch.cumsum(degree, 0) - degree
+    return edges[1][order], ptr, degree
+
+
+def _gather_ranges(starts: torch.LongTensor, counts: torch.LongTensor):
+    """Concatenate `arange(s, s + c)` for each start and count."""
+    offsets = torch.repeat_interleave(torch.cumsum(counts, 0) - counts, counts)
+    return torch.repeat_interleave(starts, counts) + (
+        torch.arange(offsets.shape[0], device=starts.device) - offsets
+    )
+
+
+def topological_levels(edges: torch.LongTensor, n_nodes: int) -> torch.LongTensor:
+    """Return the topological level of each node using a level synchronous
+    Kahn's algorithm. Roots are at level 0, and every other node is one level
+    below its deepest predecessor. All nodes of a level are processed at once,
+    so the number of iterations is the depth of the deepest graph, not the
+    number of nodes, and disjoint graphs (e.g. a :class:`caldera.data.GraphBatch`)
+    are processed together.
+
+    Nodes that are on (or downstream of) a cycle have level -1.
+
+    :param edges: edge index tensor of shape (2, E)
+    :param n_nodes: number of nodes
+    :return: level tensor of shape (n_nodes,)
+    """
+    dst, ptr, degree = _csr(edges, n_nodes)
+    indegree = in_degree(edges, n_nodes)
+    levels = torch.full((n_nodes,), -1, dtype=torch.long, device=edges.device)
+    frontier = torch.where(indegree == 0)[0]
+    level = 0
+    while frontier.numel():
+        levels[frontier] = level
+        children = dst[_gather_ranges(ptr[frontier], degree[frontier])]
+        decrement = torch.bincount(children, minlength=n_nodes)
+        indegree = indegree - decrement
+        frontier = torch.where((decrement > 0) & (indegree == 0))[0]
+        level += 1
+    return levels
+
+
+def topological_order(edges: torch.LongTensor, n_nodes: int) -> torch.LongTensor:
+    """Return a topological ordering of the nodes, ordered by level.
+
+    :param edges: edge index tensor of shape (2, E)
+    :param n_nodes: number of nodes
+    :return: node indices of shape (n_nodes,)
+    :raises ValueError: if the graph has a cycle
+    """
+    levels = topological_levels(edges, n_nodes)
+    if (levels < 0).any():
+        raise ValueError("Graph contains a cycle.")
+    return torch.argsort(levels)
+
+
+def dag_depth(
+    edges: torch.LongTensor, node_idx: torch.LongTensor, n_graphs: int
+) -> torch.LongTensor:
+    """Return the depth (number of topological levels) of each graph in a
+    batch. Graphs with cycles have depth -1 and empty graphs have depth 0.
+
+    :param edges: edge index tensor of shape (2, E)
+    :param node_idx: graph index of each node
+    :param n_graphs: number of graphs
+    :return: depth tensor of shape (n_graphs,)
+    """
+    levels = topological_levels(edges, node_idx.shape[0])
+    depth = torch_scatter.scatter_max(levels + 1, node_idx, dim=0, dim_size=n_graphs)[0]
+    cyclic = torch.bincount(node_idx[levels < 0], minlength=n_graphs) > 0
+    depth[cyclic] = -1
+    return depth
+
+
+def _refine(
+    src: torch.LongTensor,
+    dst: torch.LongTensor,
+    weight: torch.Tensor,
+    node_weight: torch.Tensor,
+    parts: torch.LongTensor,
+    n_parts: int,
+    max_size: float,
+    min_size: float,
+    iterations: int,
+    generator: torch.Generator,
+    tolerance: float = 1e-3,
+) -> torch.LongTensor:
+    """Size constrained label propagation on a weighted graph. In each
+    iteration, a random half of the nodes moves to the cluster with the
+    largest edge weight among its neighbors if that increases the edge
+    weight to its own cluster and the move keeps the total node weight of
+    every cluster in `[min_size, max_size]`. All moves of an iteration are
+    computed at once. Stops early once at most a `tolerance` fraction of the
+    nodes moves in an iteration."""
+    device = parts.device
+    n_nodes = parts.shape[0]
+    parts = parts.clone()
+    for _ in range(iterations):
+        # edge weight from each node to each cluster
+        key, inverse = torch.unique(src * n_parts + parts[dst], return_inverse=True)
+        counts = torch.bincount(inverse, weights=weight)
+        node, label = key // n_parts, key % n_parts
+        own = torch.zeros(n_nodes, dtype=counts.dtype, device=device)
+        is_own = label == parts[node]
+        own[node[is_own]] = counts[is_own]
+
+        # heaviest neighboring cluster, breaking ties at random
+        noise = torch.rand(counts.shape[0], generator=generator, device=device)
+        arg = torch_scatter.scatter_max(counts + 0.5 * noise, node, dim=0)[1]
+        arg = arg[arg < counts.shape[0]]
+        node, target = node[arg], label[arg]
+        gain = counts[arg] - own[node]
+        improves = gain > 0
+        if not improves.any():
+            break
+        move = improves & (
+            torch.rand(node.shape[0], generator=generator, device=device) < 0.5
+        )
+        node, target, gain = node[move], target[move], gain[move]
+
+        # accept the highest gain moves that fit, first into each target
+        # cluster, then out of each source cluster
+        sizes = torch.bincount(parts, weights=node_weight, minlength=n_parts)
+        for into in [True, False]:
+            if not node.shape[0]:
+                break
+            groups = target if into else parts[node]
+            room = max_size - sizes if into else sizes - min_size
+            order = torch.argsort(groups * (gain.max() + 1) - gain)
+            node, target, gain, groups = (
+                node[order],
+                target[order],
+                gain[order],
+                groups[order],
+            )
+            w = node_weight[node]
+            total = torch.bincount(groups, weights=w, minlength=n_parts)
+            used = torch.cumsum(w, 0) - (torch.cumsum(total, 0) - total)[groups]
+            keep = used <= room[groups]
+            node, target, gain = node[keep], target[keep], gain[keep]
+        parts[node] = target
+        if node.shape[0] <= tolerance * n_nodes:
+            break
+    return parts
+
+
+def _match(
+    src: torch.LongTensor,
+    dst: torch.LongTensor,
+    weight: torch.Tensor,
+    node_weight: torch.Tensor,
+    max_weight: float,
+    generator: torch.Generator,
+    rounds: int = 8,
+) -> torch.LongTensor:
+    """Heavy edge matching. In each round, every unmatched node picks its
+    unmatched neighbor with the heaviest edge (relative to the node
+    weights), and pairs of nodes that pick each other are matched. Edge
+    scores are symmetric, so each round matches at least the locally
+    heaviest edges. Nodes that are still unmatched then join the pair of
+    their heaviest neighbor. Returns a label for each node's group."""
+    device = node_weight.device
+    n = node_weight.shape[0]
+    nodes = torch.arange(n, device=device)
+    partner = nodes.clone()
+    # symmetric random tie breaking
+    salt = int(torch.randint(2**30, (1,), generator=generator, device=device))
+    prime = 2**31 - 1
+    lo, hi = torch.min(src, dst), torch.max(src, dst)
+    noise = ((lo % prime * 48271 + hi + salt) % prime * 16807 % prime).double()
+    score = (
+        weight**2 / (node_weight[src] * node_weight[dst]) * (1 + 1e-6 * noise / prime)
+    )
+    fits = node_weight[src] + node_weight[dst] <= max_weight
+    for _ in range(rounds):
+        free = partner == nodes
+        ok = fits & free[src] & free[dst]
+        if not ok.any():
+            break
+        s, d = src[ok], dst[ok]
+        best = torch_scatter.scatter_max(score[ok], s, dim=0, dim_size=n)[1]
+        u = torch.where(best < s.shape[0])[0]
+        v = d[best[u]]
+        mutual = d[best[v]] == u
+        partner[u[mutual]] = v[mutual]
+    labels = torch.min(nodes, partner)
+
+    # unmatched nodes join the pair of their heaviest neighbor
+    free = partner == nodes
+    ok = fits & free[src]
+    s, d = src[ok], dst[ok]
+    best = torch_scatter.scatter_max(score[ok], s, dim=0, dim_size=n)[1]
+    u = torch.where(best < s.shape[0])[0]
+    labels[u] = labels[d[best[u]]]
+    return labels
+
+
+def _contract(
+    src: torch.LongTensor,
+    dst: torch.LongTensor,
+    weight: torch.Tensor,
+    node_weight: torch.Tensor,
+    labels: torch.LongTensor,
+):
+    """Contract each label into a single node, summing node and edge
+    weights and dropping edges within a label."""
+    _, labels = torch.unique(labels, return_inverse=True)
+    n = int(labels.max()) + 1
+    src, dst = labels[src], labels[dst]
+    between = src != dst
+    key, inverse = torch.unique(src[between] * n + dst[between], return_inverse=True)
+    weight = torch.bincount(inverse, weights=weight[between])
+    node_weight = torch.bincount(labels, weights=node_weight, minlength=n)
+    return labels, key // n, key % n, weight, node_weight
+
+
+def _bfs_order(src: torch.LongTensor, dst: torch.LongTensor, n_nodes: int):
+    """Return the nodes in breadth first order, one connected component
+    after another, with isolated nodes last."""
+    indices, ptr, degree = _csr(torch.stack([src, dst]), n_nodes)
+    rank = torch.full((n_nodes,), -1, dtype=torch.long, device=src.device)
+    count = 0
+    while True:
+        unvisited = torch.where((rank < 0) & (degree > 0))[0]
+        if not unvisited.shape[0]:
+            break
+        frontier = unvisited[:1]
+        while frontier.shape[0]:
+            rank[frontier] = torch.arange(
+                count, count + frontier.shape[0], device=src.device
+            )
+            count += frontier.shape[0]
+            neighbors = indices[_gather_ranges(ptr[frontier], degree[frontier])]
+            neighbors = neighbors[rank[neighbors] < 0]
+            # keep the first discovery of each node, in order of the frontier
+            unique, inverse = torch.unique(neighbors, return_inverse=True)
+            first = torch_scatter.scatter_min(
+                torch.arange(inverse.shape[0], device=src.device), inverse
+            )[0]
+            frontier = unique[torch.argsort(first)]
+    isolated = rank < 0
+    rank[isolated] = torch.arange(count, count + int(isolated.sum()), device=src.device)
+    return torch.argsort(rank)
+
+
+def partition(
+    edges: torch.LongTensor,
+    n_nodes: int,
+    n_parts: int,
+    iterations: int = 10,
+    imbalance: float = 1.1,
+    seed: Optional[int] = None,
+) -> torch.LongTensor:
+    """Partition the nodes of a graph into `n_parts` balanced clusters with
+    few edges between clusters (ignoring edge direction).
+
+    This is a multilevel heuristic in the style of METIS. The graph is
+    repeatedly coarsened by contracting a heavy edge matching, until it has
+    a few nodes per cluster. The coarsest graph is split into balanced
+    clusters of consecutive nodes in breadth first order, and the clusters
+    are projected back through each level and refined by label propagation
+    that keeps every cluster size within `imbalance` of the mean. All steps
+    except the (small) breadth first search are vectorized over nodes and
+    edges.
+
+    :param edges: edge index tensor of shape (2, E)
+    :param n_nodes: number of nodes
+    :param n_parts: number of clusters
+    :param iterations: maximum number of refinement iterations per level
+    :param imbalance: maximum ratio of a cluster size to the mean cluster size
+    :param seed: random seed
+    :return: cluster index of each node, of shape (n_nodes,)
+    """
+    if not 0 < n_parts <= max(n_nodes, 1):
+        raise ValueError(
+            "Number of parts must be between 1 and the number of nodes, not {}".format(
+                n_parts
+            )
+        )
+    if imbalance < 1:
+        raise ValueError("Imbalance must be at least 1, not {}".format(imbalance))
+    device = edges.device
+    generator = torch.Generator(device=device)
+    if seed is None:
+        generator.seed()
+    else:
+        generator.manual_seed(seed)
+
+    nodes = torch.arange(n_nodes, device=device)
+    not_loop = edges[0] != edges[1]
+    src = torch.cat([edges[0][not_loop], edges[1][not_loop]])
+    dst = torch.cat([edges[1][not_loop], edges[0][not_loop]])
+    if not src.shape[0] or n_parts == 1:
+        return nodes * n_parts // max(n_nodes, 1)
+    mean_size = n_nodes / n_parts
+    max_size = math.ceil(imbalance * mean_size)
+    min_size = math.floor(mean_size / imbalance)
+
+    # coarsen until there are a few nodes per cluster
+    weight = torch.ones(src.shape[0], dtype=torch.float64, device=device)
+    node_weight = torch.ones(n_nodes, dtype=torch.float64, device=device)
+    graphs = [(src, dst, weight, node_weight)]
+    maps = []
+    while graphs[-1][3].shape[0] > 8 * n_parts and graphs[-1][0].shape[0]:
+        n = graphs[-1][3].shape[0]
+        labels = _match(*graphs[-1], max(mean_size / 4, 2), generator)
+        labels, *graph = _contract(*graphs[-1], labels)
+        if graph[3].shape[0] > 0.75 * n:
+            break
+        maps.append(labels)
+        graphs.append(tuple(graph))
+
+    # balanced clusters of consecutive coarse nodes in breadth first order
+    src, dst, _, node_weight = graphs[-1]
+    order = _bfs_order(src, dst, node_weight.shape[0])
+    w = node_weight[order]
+    mid = torch.cumsum(w, 0) - w / 2
+    parts = torch.empty_like(order)
+    parts[order] = (mid * n_parts / n_nodes).long().clamp(max=n_parts - 1)
+
+    # refine, then project to the next finer level
+    for level in reversed(range(len(graphs))):
+        parts = _refine(
+            *graphs[level],
+            parts,
+            n_parts,
+            max_size,
+            min_size,
+            iterations,
+            generator,
+        )
+        if level:
+            parts = parts[maps[level - 1]]
+    return parts
@@ -1,18 +1,138 @@
+import math
 import random
+from typing import List
+from typing import Optional
 from typing import overload
+from typing import Sequence
+from typing import Tuple
+from typing import Union
 
 import numpy
 import torch
 
 
+def _byte_span(x: torch.Tensor) -> Tuple[int, int]:
+    start = x.data_ptr()
+    extent = sum((n - 1) * stride for n, stride in zip(x.shape, x.stride()))
+    return start, start + (extent + 1) * x.element_size()
+
+
 def same_storage(x: torch.Tensor, y: torch.Tensor) -> bool:
-    """Checks if two tensors share storage."""
-    print(x)
-    print(y)
-    print(x.shape)
-    x_ptrs = {e.data_ptr() for e in x.view(-1)}
-    y_ptrs = {e.data_ptr() for e in y.view(-1)}
-    return (x_ptrs <= y_ptrs) or (y_ptrs <= x_ptrs)
+    """Checks if two tensors share storage, i.e. if the memory spanned by one
+    tensor is contained in the memory spanned by the other (as for views).
+    Unlike comparing element pointers, this works for non-contiguous
+    tensors and does not iterate over elements."""
+    if x.device != y.device:
+        return False
+    if x.untyped_storage().data_ptr() != y.untyped_storage().data_ptr():
+        return False
+    if not x.numel() or not y.numel():
+        return True
+    x0, x1 = _byte_span(x)
+    y0, y1 = _byte_span(y)
+    return (y0 <= x0 and x1 <= y1) or (x0 <= y0 and y1 <= x1)
+
+
+def index_to_slice(
+    index: Union[slice, Sequence[int], torch.Tensor], size: int
+) -> Optional[slice]:
+    """Convert an index (slice, list of integers, long tensor or bool mask)
+    into an equivalent slice, if possible. Indexing with a slice returns a
+    view, while indexing with a list or mask copies.
+
+    :param index: the index
+    :param size: size of the indexed dimension
+    :return: an equivalent slice or None if the index is not an arithmetic
+        progression with a positive step
+    :raises IndexError: if an integer index is out of range
+    """
+    if isinstance(index, slice):
+        return index
+    index = torch.as_tensor(index)
+    if index.dtype == torch.bool:
+        if index.shape[0] != size:
+            return None
+        index = torch.where(index)[0]
+    index = index.flatten().cpu().long()
+    if index.numel() and (index.min() < -size or index.max() >= size):
+        # a slice would silently truncate or wrap out of range indices
+        raise IndexError(
+            "Index out of range for dimension of size {}: {}".format(
+                size, index.tolist()
+            )
+        )
+    index = torch.where(index < 0, index + size, index)
+    if not index.numel():
+        return slice(0, 0)
+    if index.numel() == 1:
+        i = index.item()
+        return slice(i, i + 1)
+    step = (index[1] - index[0]).item()
+    if step <= 0 or not torch.all(index[1:] - index[:-1] == step):
+        return None
+    return slice(index[0].item(), index[-1].item() + 1, step)
+
+
+def select_columns(x: torch.Tensor, index) -> torch.Tensor:
+    """Select columns of a 2D tensor, returning a view if `index` can be
+    expressed as a slice and gathering otherwise.
+
+    :param x: the tensor
+    :param index: None (all columns), slice, list of integers, long tensor or bool mask
+    :return: the selected columns
+    """
+    if index is None:
+        return x
+    s = index_to_slice(index, x.shape[1])
+    if s is not None:
+        return x[:, s]
+    index = torch.as_tensor(index, device=x.device)
+    return x[:, index]
+
+
+def pack_tensors(
+    tensors: Sequence[torch.Tensor],
+    alignment: int = 64,
+    device: Optional[Union[str, torch.device]] = None,
+    shared: bool = False,
+    pin_memory: bool = False,
+) -> Tuple[torch.Tensor, List[torch.Tensor]]:
+    """Copy tensors into a single contiguous byte buffer and return the
+    buffer along with views of each tensor into it. Each view starts at an
+    offset aligned to `alignment` bytes and to the element size of its dtype.
+
+    :param tensors: tensors to pack (may have different dtypes)
+    :param alignment: byte alignment of each tensor in the buffer
+    :param device: device of the buffer (default: device of the first tensor)
+    :param shared: if True, allocate the buffer in shared memory
+    :param pin_memory: if True, allocate the buffer in pinned memory
+    :return: tuple of the uint8 buffer and the list of views
+    """
+    if alignment < 1:
+        raise ValueError("Alignment must be at least 1, not {}".format(alignment))
+    offsets = []
+    nbytes = 0
+    for t in tensors:
+        # views of a dtype must start at a multiple of its element size
+        size = t.element_size()
+        align = alignment * size // math.gcd(alignment, size)
+        nbytes = -(-nbytes // align) * align
+        offsets.append(nbytes)
+        nbytes += t.numel() * t.element_size()
+    if device is None:
+        device = tensors[0].device if tensors else "cpu"
+    buffer = torch.empty(nbytes, dtype=torch.uint8, device=device)
+    if shared:
+        buffer.share_memory_()
+    if pin_memory:
+        buffer = buffer.pin_memory()
+    views = []
+    for t, offset in zip(tensors, offsets):
+        n = t.numel() * t.element_size()
+        view = buffer[offset : offset + n].view(t.dtype).view(t.shape)
+        view.copy_(t)
+        views.append(view)
+    return buffer, views
 
 
 # TODO: add more options for deterministic_seed?
@@ -25,17 +145,93 @@ def deterministic_seed(seed: int, cudnn_deterministic: bool = False):
         torch.backends.cudnn.benchmark = False
 
 
+def _check_1d(arr):
+    if len(arr.shape) != 1:
+        raise ValueError(
+            "Sparse one hot encoding requires a 1D array, not shape {}".format(
+                tuple(arr.shape)
+            )
+        )
+
+
+def _check_classes(arr, mx: int):
+    # sparse constructors and `put_along_axis` do not reject (or wrap)
+    # invalid class indices
+    if (arr.numel() if torch.is_tensor(arr) else arr.size) == 0:
+        return
+    lo, hi = int(arr.min()), int(arr.max())
+    if lo < 0 or hi >= mx:
+        raise ValueError(
+            "Class indices must be in [0, {}), not [{}, {}]".format(mx, lo, hi)
+        )
+
+
 @overload
-def to_one_hot(arr: numpy.ndarray, mx: int) -> numpy.ndarray:
+def to_one_hot(
+    arr: numpy.ndarray,
+    mx: int,
+    dtype: Optional[numpy.dtype] = None,
+    device: None = None,
+    sparse: bool = False,
+) -> numpy.ndarray:
     ...
 
 
-def to_one_hot(arr: torch.tensor, mx: int) -> torch.tensor:
-    if torch.is_tensor(arr):
+def to_one_hot(
+    arr: torch.tensor,
+    mx: int,
+    dtype: Optional[torch.dtype] = None,
+    device: Optional[Union[str, torch.device]] = None,
+    sparse: bool = False,
+) -> torch.tensor:
+    """One hot encode an array of integer class indices without a Python
+    loop.
+
+    Usage:
 
-        oh = torch.zeros((arr.shape[0], mx))
+    .. code-block:: python
+
+        # node types to one hot features for each batch
+        for batch in loader(f=lambda b: to_one_hot(b.x[:, 0].long(), n_types)):
+            ...
+
+    :param arr: integer array or tensor of class indices of any shape
+    :param mx: number of classes
+    :param dtype: output dtype (default: default float dtype for tensors, float64 for numpy arrays)
+    :param device: output device (tensors only; default: device of `arr`)
+    :param sparse: if True, return a 2D sparse matrix (`torch.sparse_coo_tensor`
+        for tensors, `scipy.sparse.csr_matrix` for numpy arrays). Requires a 1D `arr`.
+    :return: one hot encoded array of shape `arr.shape + (mx,)`
+    :raises ValueError: if a class index is not in `[0, mx)`
+    """
+    if torch.is_tensor(arr):
+        arr = arr.to(device=device, dtype=torch.long)
+    else:
+        arr = numpy.asarray(arr, dtype=numpy.int64)
+    _check_classes(arr, mx)
+    if torch.is_tensor(arr):
+        if dtype is None:
+            dtype = torch.get_default_dtype()
+        if sparse:
+            _check_1d(arr)
+            n = arr.shape[0]
+            indices = torch.stack([torch.arange(n, device=arr.device), arr])
+            values = torch.ones(n, dtype=dtype, device=arr.device)
+            return torch.sparse_coo_tensor(indices, values, (n, mx))
+        return torch.nn.functional.one_hot(arr, mx).to(dtype)
     else:
-        oh = numpy.zeros((arr.shape[0], mx))
-    for i, a in enumerate(arr):
-        oh[i, a] = 1.0
-    return oh
+        if dtype is None:
+            dtype = numpy.float64
+        if sparse:
+            _check_1d(arr)
+            try:
+                from scipy.sparse import csr_matrix
+            except ImportError:
+                raise ImportError("`scipy` must be installed for sparse numpy output")
+            n = arr.shape[0]
+            return csr_matrix(
+                (numpy.ones(n, dtype=dtype), (numpy.arange(n), arr)), shape=(n, mx)
+            )
+        oh = numpy.zeros(arr.shape + (mx,), dtype=dtype)
+        numpy.put_along_axis(oh, arr[..., None], 1, axis=-1)
+        return oh
@@ -14,6 +14,27 @@ def pytest_addoption(parser):
     parser.addoption(
         "--cuda", action="store", default=False, help="option: true or false"
     )
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="run tests marked with 'benchmark'",
+    )
+    parser.addoption(
+        "--benchmark-json",
+        action="store",
+        default=None,
+        help="path to write benchmark results to",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="need --benchmark option to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
 
 
 @pytest.fixture
@@ -0,0 +1,97 @@
+import json
+from os.path import join
+
+import pytest
+import torch
+
+from caldera import bench
+from caldera.blocks.flex import FlexBlock
+
+
+def test_quick_run(tmp_path):
+    output = join(str(tmp_path), "results.json")
+    report = bench.run(suites=["data"], quick=True, repeats=1, warmup=0, output=output)
+    with open(output) as f:
+        assert json.load(f) == json.loads(json.dumps(report))
+    names = {r["name"] for r in report["results"]}
+    assert {"from_data_list", "to_data_list", "scatter_group"} <= names
+    for r in report["results"]:
+        assert r["median"] > 0
+        assert r["peak_rss_mb"] is None or r["peak_rss_mb"] > 0
+
+
+@pytest.mark.skipif(not bench.core.reset_peak_rss(), reason="requires Linux")
+def test_peak_rss_per_case():
+    def setup(n):
+        return bench.Case(lambda: torch.ones(n, dtype=torch.uint8).fill_(1))
+
+    results = bench.core.run_benchmark(
+        bench.core.Benchmark("test", "alloc", setup, {"n": [200 * 2**20, 2**10]}),
+        repeats=1,
+        warmup=0,
+    )
+    large, small = [r["peak_rss_mb"] for r in results]
+    # the peak of the small case does not include the large allocation
+    assert large - small > 100
+
+
+def test_invalid_suite():
+    with pytest.raises(ValueError):
+        bench.run(suites=["not a suite"])
+
+
+def test_compare():
+    def report(median):
+        return {
+            "results": [
+                {"suite": "data", "name": "a", "params": {"n": 1}, "median": median}
+            ]
+        }
+
+    assert bench.compare(report(1.0), report(1.1), threshold=1.2) == []
+    regressions = bench.compare(report(1.0), report(2.0), threshold=1.2)
+    assert len(regressions) == 1
+    assert regressions[0]["ratio"] == 2.0
+
+
+@pytest.mark.benchmark
+def test_benchmark_data(request, tmp_path):
+    output = request.config.getoption("--benchmark-json") or join(
+        str(tmp_path), "results.json"
+    )
+    bench.run(suites=["data"], output=output, verbose=True)
+
+
+def test_quick_run_models():
+    report = bench.run(suites=["models"], quick=True, repeats=1, warmup=1)
+    names = {r["name"] for r in report["results"]}
+    assert {"encode_core_decode", "graph_core", "aggregating_node_block"} <= names
+    for r in report["results"]:
+        assert r["graphs_per_sec"] > 0
+        assert r["edges_per_sec"] > 0
+
+
+@pytest.mark.parametrize(
+    "name",
+    ["aggregating_edge_block", "aggregating_node_block", "aggregating_global_block"],
+)
+def test_model_cases_resolved_in_setup(name):
+    (b,) = [b for b in bench.registry["models"] if b.name == name]
+    case = b.setup(**b.grid(quick=True)[0])
+    model = case.fn.__closure__
+    modules = [
+        c.cell_contents for c in model if isinstance(c.cell_contents, torch.nn.Module)
+    ]
+    assert modules
+    for module in modules:
+        for m in module.modules():
+            if isinstance(m, FlexBlock):
+                assert m.is_resolved
+
+
+@pytest.mark.benchmark
+def test_benchmark_models(request, tmp_path):
+    output = request.config.getoption("--benchmark-json") or join(
+        str(tmp_path), "results.json"
+    )
+    bench.run(suites=["models"], output=output, verbose=True)
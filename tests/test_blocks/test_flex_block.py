@@ -1,7 +1,12 @@
+import json
+
 import pytest
 import torch
 
 from caldera.blocks import Flex
+from caldera.data import GraphBatch
+from caldera.exceptions import CalderaNetsException
+from caldera.models import EncodeCoreDecode
 
 
 def test_flex_block():
@@ -79,3 +84,52 @@ def test_flex_block_to_playback(dtype, dtype2):
     for p in net.parameters():
         if dtype2:
             assert p.dtype is dtype2
+
+
+def test_flex_block_resolve_dims():
+    block = Flex(torch.nn.Linear)(Flex.d(), 11)
+    block.resolve_dims([7])
+    assert block.is_resolved
+    assert block.resolved_dims == [7]
+    assert block(torch.randn(3, 7)).shape == (3, 11)
+
+
+def test_flex_block_resolve_dims_invalid():
+    block = Flex(torch.nn.Linear)(Flex.d(), 11)
+    with pytest.raises(ValueError):
+        block.resolve_dims([7, 8])
+
+
+def test_flex_spec_round_trip():
+    def new_model():
+        return torch.nn.Sequential(
+            Flex(torch.nn.Linear)(Flex.d(), 16), Flex(torch.nn.Linear)(Flex.d(), 4)
+        )
+
+    model = new_model()
+    model(torch.randn(5, 9))
+    spec = Flex.spec(model)
+    assert spec == {"0": [9], "1": [16]}
+
+    model2 = Flex.load_spec(new_model(), json.loads(json.dumps(spec)))
+    model2.load_state_dict(model.state_dict())
+    x = torch.randn(5, 9)
+    assert torch.allclose(model(x), model2(x))
+
+
+def test_flex_spec_unresolved_raises():
+    with pytest.raises(CalderaNetsException):
+        Flex.spec(Flex(torch.nn.Linear)(Flex.d(), 16))
+
+
+def test_encode_core_decode_resolve_without_example():
+    model = EncodeCoreDecode(latent_sizes=(16, 16, 4))
+    model.resolve(5, 4, 3)
+    assert len(list(model.parameters()))
+
+    model2 = EncodeCoreDecode(latent_sizes=(16, 16, 4))
+    Flex.load_spec(model2, Flex.spec(model))
+    model2.load_state_dict(model.state_dict())
+
+    batch = GraphBatch.random_batch(10, 5, 4, 3)
+    assert torch.allclose(model(batch, 2)[-1].x, model2(batch, 2)[-1].x)
@@ -1,7 +1,13 @@
 import pytest
 import torch
 
+from caldera.blocks import Flex
 from caldera.blocks import MLP
+from caldera.blocks.mlp import compare_quantized
+from caldera.blocks.mlp import quantize_dynamic
+from caldera.data import GraphBatch
+from caldera.exceptions import CalderaNetsException
+from caldera.models import EncodeCoreDecode
 
 
 @pytest.mark.parametrize("layers", [(8, 32), (16, 16, 32), (64, 16, 8)])
@@ -13,3 +19,27 @@ def test_mlp(layers, dropout, layer_norm):
     assert out.shape[1] == layers[-1]
     print(list(block.modules()))
     # assert len(list(block.modules())) == 4 * len(layers)
+
+
+def test_quantize_mlp():
+    block = MLP(8, 32, 4)
+    qblock = quantize_dynamic(block)
+    assert isinstance(qblock.layers[0].layers[0], torch.nn.quantized.dynamic.Linear)
+    assert isinstance(qblock.layers[0].layers[2], torch.nn.LayerNorm)
+    x = torch.randn(10, 8)
+    assert qblock(x).shape == block(x).shape
+
+
+def test_quantize_unresolved_raises():
+    with pytest.raises(CalderaNetsException):
+        quantize_dynamic(Flex(MLP)(Flex.d(), 16))
+
+
+def test_compare_quantized_encode_core_decode():
+    model = EncodeCoreDecode(latent_sizes=(16, 16, 4))
+    batch = GraphBatch.random_batch(10, 5, 4, 3)
+    model(batch, steps=1)
+    qmodel = quantize_dynamic(model.eval())
+    report = compare_quantized(model, qmodel, batch, steps=2, repeats=2)
+    assert report["mean_abs_error"] < 0.1
+    assert report["quantized_latency"] > 0
@@ -0,0 +1,31 @@
+import torch
+
+from caldera.blocks import GraphNormalize
+from caldera.blocks import Normalize
+from caldera.data import GraphBatch
+from caldera.data import GraphData
+from caldera.data import GraphDataLoader
+from caldera.data.statistics import RunningStats
+
+
+def test_normalize():
+    x = torch.randn(100, 4) * 5 + 3
+    norm = Normalize.from_stats(RunningStats().update(x))
+    y = norm(x)
+    assert torch.allclose(y.mean(0), torch.zeros(4), atol=1e-4)
+    assert torch.allclose(y.std(0, unbiased=False), torch.ones(4), atol=1e-3)
+    assert torch.allclose(norm.inverse(y), x, atol=1e-4)
+    assert "mean" in norm.state_dict()
+
+
+def test_graph_normalize():
+    data_list = [GraphData.random(5, 4, 3) for _ in range(20)]
+    stats = GraphDataLoader(data_list, batch_size=5).statistics()
+    normalize = GraphNormalize.from_stats(stats)
+    batch = GraphBatch.from_data_list(data_list)
+    out = normalize(batch)
+    assert isinstance(out, GraphBatch)
+    assert torch.all(out.edges == batch.edges)
+    assert torch.allclose(out.x.mean(0), torch.zeros(5), atol=1e-4)
+    assert torch.allclose(out.e.mean(0), torch.zeros(4), atol=1e-4)
+    assert isinstance(normalize(data_list[0]), GraphData)
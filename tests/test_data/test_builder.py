@@ -0,0 +1,79 @@
+import pytest
+import torch
+
+from caldera.data import GraphBatch
+from caldera.data import GraphBatchBuilder
+from caldera.data import GraphData
+
+
+def assert_batch_equal(a, b):
+    for k in a.__slots__:
+        assert torch.equal(getattr(a, k), getattr(b, k)), k
+
+
+@pytest.mark.parametrize("n_graphs", [1, 10, 200])
+def test_builder_matches_from_data_list(n_graphs):
+    data_list = [GraphData.random(5, 4, 3) for _ in range(n_graphs)]
+    builder = GraphBatchBuilder(node_capacity=4, edge_capacity=4, graph_capacity=2)
+    for data in data_list:
+        builder.add(data)
+    assert len(builder) == n_graphs
+    batch = builder.build()
+    assert_batch_equal(batch, GraphBatch.from_data_list(data_list))
+    assert len(builder) == 0
+
+
+def test_builder_add_arrays_numpy():
+    data_list = [GraphData.random(5, 4, 3) for _ in range(5)]
+    builder = GraphBatchBuilder()
+    for data in data_list:
+        builder.add_arrays(
+            data.x.numpy(), data.e.numpy(), data.g.numpy()[0], data.edges.numpy()
+        )
+    assert_batch_equal(builder.build(), GraphBatch.from_data_list(data_list))
+
+
+def test_builder_build_is_zero_copy():
+    builder = GraphBatchBuilder(node_capacity=1000, edge_capacity=1000)
+    builder.extend(GraphData.random(5, 4, 3) for _ in range(3))
+    x_buffer = builder._x
+    batch = builder.build()
+    assert batch.x.data_ptr() == x_buffer.data_ptr()
+    compact = builder.extend([GraphData.random(5, 4, 3)]).build(compact=True)
+    assert compact.x.untyped_storage().nbytes() == compact.x.numel() * 4
+
+
+def test_builder_reuse_after_build():
+    builder = GraphBatchBuilder()
+    first = [GraphData.random(5, 4, 3) for _ in range(3)]
+    second = [GraphData.random(5, 4, 3) for _ in range(4)]
+    batch1 = builder.extend(first).build()
+    batch2 = builder.extend(second).build()
+    assert_batch_equal(batch1, GraphBatch.from_data_list(first))
+    assert_batch_equal(batch2, GraphBatch.from_data_list(second))
+
+
+def test_builder_dimension_mismatch():
+    builder = GraphBatchBuilder(n_feat=5)
+    with pytest.raises(RuntimeError):
+        builder.add(GraphData.random(6, 4, 3))
+    builder = GraphBatchBuilder()
+    builder.add(GraphData.random(5, 4, 3))
+    with pytest.raises(RuntimeError):
+        builder.add(GraphData.random(5, 3, 3))
+
+
+def test_builder_invalid_edges():
+    builder = GraphBatchBuilder()
+    with pytest.raises(RuntimeError):
+        builder.add_arrays(
+            torch.randn(2, 5),
+            torch.randn(1, 4),
+            torch.randn(1, 3),
+            torch.tensor([[0], [2]]),
+        )
+
+
+def test_builder_build_empty():
+    with pytest.raises(RuntimeError):
+        GraphBatchBuilder().build()
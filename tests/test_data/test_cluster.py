@@ -0,0 +1,95 @@
+import os
+
+import pytest
+import torch
+
+from caldera.data import ClusterLoader
+from caldera.data import GraphBatch
+from caldera.data import GraphData
+from caldera.models import EncodeCoreDecode
+
+
+@pytest.fixture
+def data():
+    torch.manual_seed(0)
+    n_nodes, n_edges = 300, 1200
+    return GraphData(
+        torch.randn(n_nodes, 4),
+        torch.randn(n_edges, 3),
+        torch.randn(1, 2),
+        torch.randint(0, n_nodes, (2, n_edges)),
+    )
+
+
+def edge_set(edges, e, node_ids=None):
+    if node_ids is not None:
+        edges = node_ids[edges]
+    return sorted(zip(map(tuple, edges.t().tolist()), map(tuple, e.tolist())))
+
+
+def test_cluster_sample_is_induced_subgraph(data):
+    loader = ClusterLoader(data, n_parts=6, seed=0)
+    sample = loader.sample([4, 1])
+    batch = sample.batch
+    assert isinstance(batch, GraphBatch)
+    assert batch.num_graphs == 1
+    selected = (loader.parts == 4) | (loader.parts == 1)
+    assert sorted(sample.node_ids.tolist()) == torch.where(selected)[0].tolist()
+    assert torch.all(batch.x == data.x[sample.node_ids])
+    assert torch.all(batch.g == data.g)
+    induced = selected[data.edges[0]] & selected[data.edges[1]]
+    assert edge_set(batch.edges, batch.e, sample.node_ids) == edge_set(
+        data.edges[:, induced], data.e[induced]
+    )
+
+
+def test_cluster_loader_covers_all_nodes(data):
+    loader = ClusterLoader(data, n_parts=7, clusters_per_batch=3, seed=0)
+    assert len(loader) == 3
+    samples = list(loader)
+    assert len(samples) == 3
+    node_ids = torch.cat([s.node_ids for s in samples])
+    assert sorted(node_ids.tolist()) == list(range(data.num_nodes))
+    assert sorted(torch.cat([s.clusters for s in samples]).tolist()) == list(range(7))
+
+
+def test_cluster_loader_all_clusters_is_whole_graph(data):
+    loader = ClusterLoader(data, n_parts=5, clusters_per_batch=5, shuffle=False)
+    (sample,) = list(loader)
+    assert edge_set(sample.batch.edges, sample.batch.e, sample.node_ids) == edge_set(
+        data.edges, data.e
+    )
+
+
+def test_cluster_loader_cache(data, tmpdir):
+    loader = ClusterLoader(data, n_parts=4, seed=0, cache_dir=str(tmpdir))
+    files = os.listdir(str(tmpdir))
+    assert len(files) == 1
+    torch.save(torch.arange(data.num_nodes) % 4, os.path.join(str(tmpdir), files[0]))
+    cached = ClusterLoader(data, n_parts=4, seed=0, cache_dir=str(tmpdir))
+    assert torch.all(cached.parts == torch.arange(data.num_nodes) % 4)
+    assert not torch.all(cached.parts == loader.parts)
+    ClusterLoader(data, n_parts=3, seed=0, cache_dir=str(tmpdir))
+    assert len(os.listdir(str(tmpdir))) == 2
+
+
+def test_cluster_loader_parts(data):
+    parts = torch.arange(data.num_nodes) % 3
+    loader = ClusterLoader(data, n_parts=3, parts=parts, shuffle=False)
+    sample = next(iter(loader))
+    assert torch.all(sample.node_ids == torch.arange(0, data.num_nodes, 3))
+
+
+def test_cluster_loader_trains_encode_core_decode(data):
+    model = EncodeCoreDecode(
+        latent_sizes=(8, 8, 8), output_sizes=(1, 1, 1), depths=(1, 1, 1)
+    ).resolve(4, 3, 2)
+    y = torch.randn(data.num_nodes, 1)
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.01)
+    for sample in ClusterLoader(data, n_parts=6, clusters_per_batch=2, seed=0):
+        out = model(sample.batch, steps=2)[-1]
+        loss = ((out.x - y[sample.node_ids]) ** 2).mean()
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+    assert torch.isfinite(loss)
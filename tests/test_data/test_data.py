@@ -664,6 +664,65 @@ class TestGraphBatch:
         for data, graph in zip(datalist, graphs):
             Comparator.data_to_nx(data, graph, fkey, gkey)
 
+    def test_to_networkx_list_unsorted(self):
+        datalist = [random_graph_data(5, 5, 5) for _ in range(4)]
+        batch = GraphBatch.from_data_list(datalist)
+        node_perm = torch.randperm(batch.x.shape[0])
+        edge_perm = torch.randperm(batch.e.shape[0])
+        inv = torch.empty_like(node_perm)
+        inv[node_perm] = torch.arange(node_perm.shape[0])
+        shuffled = GraphBatch(
+            batch.x[node_perm],
+            batch.e[edge_perm],
+            batch.g,
+            inv[batch.edges[:, edge_perm]],
+            batch.node_idx[node_perm],
+            batch.edge_idx[edge_perm],
+        )
+        for graph, expected in zip(
+            shuffled.to_networkx_list(), batch.to_networkx_list()
+        ):
+
+            def feature_edges(g):
+                return sorted(
+                    (
+                        tuple(g.nodes[n1]["features"].tolist()),
+                        tuple(g.nodes[n2]["features"].tolist()),
+                        tuple(edata["features"].tolist()),
+                    )
+                    for n1, n2, edata in g.edges(data=True)
+                )
+
+            assert graph.number_of_nodes() == expected.number_of_nodes()
+            assert feature_edges(graph) == feature_edges(expected)
+            assert torch.all(graph.data["features"] == expected.data["features"])
+
+    def test_to_networkx_list_empty_graph(self):
+        datalist = [
+            random_graph_data(5, 5, 5),
+            GraphData(
+                torch.randn(0, 5),
+                torch.randn(0, 5),
+                torch.randn(1, 5),
+                torch.empty(2, 0, dtype=torch.long),
+            ),
+            random_graph_data(5, 5, 5),
+        ]
+        graphs = GraphBatch.from_data_list(datalist).to_networkx_list()
+        assert len(graphs) == 3
+        assert graphs[1].number_of_nodes() == 0
+        Comparator.data_to_nx(datalist[2], graphs[2], "features", "data")
+
+    def test_to_networkx_list_digraph(self):
+        datalist = [random_graph_data(5, 5, 5) for _ in range(3)]
+        graphs = GraphBatch.from_data_list(datalist).to_networkx_list(
+            graph_type=nx.DiGraph
+        )
+        for data, graph in zip(datalist, graphs):
+            assert isinstance(graph, nx.DiGraph)
+            assert graph.number_of_nodes() == data.num_nodes
+            assert len(graph.ordered_edges) == data.edges.shape[1]
+
 
 def test_graph_data_random():
     assert GraphData.random(5, 5, 5)
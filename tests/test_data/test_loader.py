@@ -1,3 +1,6 @@
+import pytest
+import torch
+
 from caldera.data import GraphBatch
 from caldera.data import GraphData
 from caldera.data import GraphDataLoader
@@ -19,3 +22,32 @@ def test_loader_first():
     assert isinstance(batch, GraphBatch)
     assert batch.shape == (5, 4, 3)
     assert batch.num_graphs == 32
+
+
+def test_graph_data_share_memory():
+    batch = GraphBatch.random_batch(10, 5, 4, 3)
+    expected = batch.clone()
+    assert batch.share_memory_() is batch
+    assert batch.is_shared()
+    for k in batch.__slots__:
+        a, b = getattr(batch, k), getattr(expected, k)
+        assert a.dtype == b.dtype
+        assert torch.all(a == b)
+        assert a.untyped_storage().data_ptr() == batch.x.untyped_storage().data_ptr()
+
+
+@pytest.mark.parametrize("share_memory", [True, False])
+def test_loader_workers_share_memory(share_memory):
+    datalist = [
+        (GraphData.random(5, 4, 3), GraphData.random(1, 1, 1)) for _ in range(40)
+    ]
+    loader = GraphDataLoader(
+        datalist, batch_size=8, num_workers=2, share_memory=share_memory
+    )
+    expected = list(GraphDataLoader(datalist, batch_size=8))
+    for (x, y), (ex, ey) in zip(loader, expected):
+        for a, b in [(x, ex), (y, ey)]:
+            for k in a.__slots__:
+                assert torch.all(getattr(a, k) == getattr(b, k))
+        same = x.x.untyped_storage().data_ptr() == x.e.untyped_storage().data_ptr()
+        assert same == share_memory
@@ -0,0 +1,111 @@
+import copy
+import pickle
+
+import pytest
+import torch
+
+from caldera.data import GraphBatch
+from caldera.data import GraphData
+
+
+def assert_equal(a, b):
+    assert type(a) is type(b)
+    for k in a.__slots__:
+        x, y = getattr(a, k), getattr(b, k)
+        assert x.dtype == y.dtype
+        assert torch.equal(x, y)
+
+
+@pytest.fixture(params=["data", "batch"])
+def data(request):
+    if request.param == "data":
+        return GraphData.random(5, 4, 3)
+    return GraphBatch.random_batch(10, 5, 4, 3)
+
+
+def test_pack(data):
+    assert not data.is_packed
+    packed = data.pack()
+    assert packed.is_packed
+    assert_equal(data, packed)
+    ptr = packed.x.untyped_storage().data_ptr()
+    for k in packed.__slots__:
+        assert getattr(packed, k).untyped_storage().data_ptr() == ptr
+        assert getattr(packed, k).data_ptr() % 64 == 0
+
+
+def test_pack_is_a_copy(data):
+    packed = data.pack()
+    packed.x.zero_()
+    assert not torch.all(data.x == 0)
+
+
+@pytest.mark.parametrize("alignment", [1, 2, 4, 8, 512])
+def test_pack_small_alignment(alignment):
+    data = GraphData(
+        torch.randn(3, 1),
+        torch.randn(1, 1),
+        torch.randn(1, 1),
+        torch.tensor([[0], [1]]),
+    )
+    packed = data.pack(alignment=alignment)
+    assert_equal(data, packed)
+    assert packed.is_packed
+    ptr = packed.x.untyped_storage().data_ptr()
+    for k in packed.__slots__:
+        t = getattr(packed, k)
+        assert (t.data_ptr() - ptr) % max(alignment, t.element_size()) == 0
+
+
+@pytest.mark.parametrize("alignment", [1024, 0, -1, 3, 48])
+def test_pack_alignment(alignment):
+    with pytest.raises(ValueError):
+        GraphData.random(5, 4, 3).pack(alignment=alignment)
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        lambda d: d.clone(),
+        lambda d: d.copy(),
+        lambda d: d.to("cpu"),
+        lambda d: pickle.loads(pickle.dumps(d)),
+        lambda d: copy.deepcopy(d),
+    ],
+    ids=["clone", "copy", "to", "pickle", "deepcopy"],
+)
+def test_packed_operations(data, method):
+    packed = data.pack()
+    other = method(packed)
+    assert other.is_packed
+    assert_equal(packed, other)
+    if other.x.data_ptr() != packed.x.data_ptr():
+        other.x.zero_()
+        assert_equal(data.pack(), packed)
+
+
+def test_packed_pickle_size():
+    batch = GraphBatch.random_batch(100, 16, 16, 16)
+    packed = batch.pack()
+    assert len(pickle.dumps(packed)) < 1.5 * len(pickle.dumps(batch))
+
+
+def test_not_packed_views_of_large_tensor():
+    big = torch.randn(1000, 10)
+    data = GraphData(
+        big[:5, :5], big[5:8, :4], big[8:9, :3], torch.tensor([[0, 1, 2], [1, 2, 3]])
+    )
+    assert not data.is_packed
+    # edges that are themselves a view of a larger tensor
+    edges = torch.tensor([[0, 1, 2, 3], [1, 2, 0, 4]])[:, :3]
+    data = GraphData(big[:5, :5], big[5:8, :4], big[8:9, :3], edges)
+    assert not data.is_packed
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="requires cuda")
+def test_packed_pin_memory_and_cuda(data):
+    packed = data.pack(pin_memory=True)
+    assert packed.x.is_pinned()
+    cuda = packed.to("cuda", non_blocking=True)
+    assert cuda.is_packed
+    assert_equal(packed, cuda.to("cpu"))
@@ -0,0 +1,68 @@
+import pytest
+import torch
+
+from caldera.data import GraphBatch
+from caldera.data import GraphData
+from caldera.utils import same_storage
+
+
+@pytest.fixture(params=["data", "batch"])
+def data(request):
+    if request.param == "data":
+        return GraphData.random(10, 8, 6)
+    return GraphBatch.random_batch(5, 10, 8, 6)
+
+
+def test_project_views(data):
+    proj = data.project(x=[0, 1, 2], e=slice(2, 6), g=[0, 2, 4])
+    assert proj.is_view("x") and proj.is_view("e") and proj.is_view("g")
+    assert torch.equal(proj.x, data.x[:, :3])
+    assert torch.equal(proj.g, data.g[:, [0, 2, 4]])
+    assert same_storage(proj.x, data.x)
+    assert same_storage(proj.e, data.e)
+    assert same_storage(proj.g, data.g)
+    assert proj.edges is data.edges
+    assert proj.shape == (3, 4, 3)
+
+
+def test_project_is_lazy(data):
+    proj = data.project(x=[0, 5, 1])
+    assert not proj.is_view("x")
+    assert "x" not in proj._cache
+    x = proj.x
+    assert torch.equal(x, data.x[:, [0, 5, 1]])
+    assert proj.x is x
+
+
+def test_project_materialize(data):
+    out = data.project(x=[1, 3], e=[0, 1, 7]).materialize()
+    assert type(out) is type(data)
+    assert out.shape == (2, 3, 6)
+    assert torch.equal(out.e, data.e[:, [0, 1, 7]])
+    assert out.g is data.g
+
+
+def test_project_invalid_field(data):
+    with pytest.raises(AttributeError):
+        data.project().foo
+
+
+def test_mask_view(data):
+    node_mask = torch.tensor([True, False] * 5)
+    masked = data.mask(node_mask, None, None)
+    assert torch.equal(masked.x, data.x[:, node_mask])
+    assert same_storage(masked.x, data.x)
+    assert masked.e is data.e
+
+
+def test_mask_gather_and_invert(data):
+    node_mask = torch.tensor([True, True, False, True] + [False] * 6)
+    masked = data.mask(node_mask, None, None, invert=True)
+    assert torch.equal(masked.x, data.x[:, ~node_mask])
+    assert not same_storage(masked.x, data.x)
+
+
+def test_view_shares_storage(data):
+    view = data.view(slice(None, 2), slice(None, 3), None)
+    assert view.shape == (2, 3, 6)
+    assert view.share_storage(data)
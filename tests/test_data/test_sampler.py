@@ -0,0 +1,124 @@
+import pytest
+import torch
+
+from caldera.data import GraphBatch
+from caldera.data import GraphData
+from caldera.data import NeighborSampler
+from caldera.models import EncodeCoreDecode
+
+
+@pytest.fixture
+def data():
+    torch.manual_seed(0)
+    n_nodes, n_edges = 200, 1000
+    edges = torch.randint(0, n_nodes, (2, n_edges))
+    return GraphData(
+        torch.randn(n_nodes, 4), torch.randn(n_edges, 3), torch.randn(1, 2), edges
+    )
+
+
+def khop_in_neighborhood(data, seed, hops):
+    nodes = {seed}
+    frontier = {seed}
+    for _ in range(hops):
+        frontier = {
+            s for s, t in data.edges.t().tolist() if t in frontier and s not in nodes
+        }
+        nodes |= frontier
+    return nodes
+
+
+def test_sample_full_fanout_is_khop_neighborhood(data):
+    sampler = NeighborSampler(data, fanouts=[-1, -1])
+    seeds = torch.tensor([3, 17, 3])
+    sample = sampler.sample(seeds)
+    batch = sample.batch
+    assert isinstance(batch, GraphBatch)
+    assert batch.num_graphs == 3
+    assert torch.all(sample.node_ids[sample.seed_idx] == seeds)
+    for i, seed in enumerate(seeds.tolist()):
+        nodes = sample.node_ids[batch.node_idx == i]
+        assert set(nodes.tolist()) == khop_in_neighborhood(data, seed, 2)
+
+
+def test_sample_features_and_edges_map_to_original(data):
+    sampler = NeighborSampler(data, fanouts=[5, 3], seed=0)
+    sample = sampler.sample(torch.arange(10))
+    batch = sample.batch
+    assert torch.all(batch.x == data.x[sample.node_ids])
+    assert torch.all(batch.node_idx[batch.edges[0]] == batch.edge_idx)
+    assert torch.all(batch.node_idx[batch.edges[1]] == batch.edge_idx)
+    original = set(map(tuple, data.edges.t().tolist()))
+    for (s, t), e in zip(sample.node_ids[batch.edges].t().tolist(), batch.e):
+        assert (s, t) in original
+    assert torch.all(batch.g == data.g)
+
+
+def test_sample_fanout_limit(data):
+    sampler = NeighborSampler(data, fanouts=[2], seed=0)
+    sample = sampler.sample(torch.arange(50))
+    batch = sample.batch
+    in_deg = torch.bincount(batch.edges[1], minlength=batch.num_nodes)
+    assert in_deg.max() <= 2
+    assert torch.all(
+        in_deg[sample.seed_idx]
+        == torch.clamp(
+            torch.bincount(data.edges[1], minlength=data.num_nodes)[:50], max=2
+        )
+    )
+
+
+def test_sample_is_seeded(data):
+    a = NeighborSampler(data, fanouts=[3, 3], seed=1).sample(torch.arange(20))
+    b = NeighborSampler(data, fanouts=[3, 3], seed=1).sample(torch.arange(20))
+    assert torch.all(a.node_ids == b.node_ids)
+    assert torch.all(a.batch.edges == b.batch.edges)
+
+
+def test_sample_isolated_seed():
+    data = GraphData(
+        torch.randn(3, 2),
+        torch.randn(1, 2),
+        torch.randn(1, 2),
+        torch.tensor([[0], [1]]),
+    )
+    sample = NeighborSampler(data, fanouts=[2, 2]).sample([2, 1])
+    assert sample.batch.num_graphs == 2
+    assert sample.node_ids.tolist() == [2, 0, 1]
+    assert sample.seed_idx.tolist() == [0, 2]
+    assert sample.batch.edges.tolist() == [[1], [2]]
+    assert sample.batch.to_networkx_list()[0].number_of_edges() == 0
+
+
+def test_sampler_iteration(data):
+    sampler = NeighborSampler(
+        data, fanouts=[3], seeds=torch.arange(0, 100, 2), batch_size=16, shuffle=True
+    )
+    assert len(sampler) == 4
+    seeds = []
+    for sample in sampler:
+        seeds += sample.node_ids[sample.seed_idx].tolist()
+    assert sorted(seeds) == list(range(0, 100, 2))
+
+
+def test_sampler_rejects_batch(data):
+    with pytest.raises(ValueError):
+        NeighborSampler(GraphBatch.from_data_list([data, data]), fanouts=[1])
+
+
+def test_sampler_trains_encode_core_decode(data):
+    model = EncodeCoreDecode(
+        latent_sizes=(8, 8, 8), output_sizes=(1, 1, 1), depths=(1, 1, 1)
+    ).resolve(4, 3, 2)
+    sampler = NeighborSampler(data, fanouts=[4, 4], batch_size=32, seed=0)
+    y = torch.randn(data.num_nodes, 1)
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.01)
+    for sample in sampler:
+        out = model(sample.batch, steps=2)[-1]
+        loss = (
+            (out.x[sample.seed_idx] - y[sample.node_ids[sample.seed_idx]]) ** 2
+        ).mean()
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+    assert torch.isfinite(loss)
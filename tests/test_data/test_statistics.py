@@ -0,0 +1,89 @@
+import pytest
+import torch
+
+from caldera.data import GraphBatch
+from caldera.data import GraphData
+from caldera.data import GraphDataLoader
+from caldera.data.statistics import GraphStats
+from caldera.data.statistics import Histogram
+from caldera.data.statistics import RunningStats
+
+
+def test_running_stats():
+    x = torch.randn(1000, 5, dtype=torch.float64) * 3 + 2
+    stats = RunningStats()
+    for chunk in torch.split(x, 37):
+        stats.update(chunk)
+    assert stats.count == 1000
+    assert torch.allclose(stats.mean, x.mean(0))
+    assert torch.allclose(stats.var, x.var(0, unbiased=False))
+
+
+def test_running_stats_merge():
+    x = torch.randn(500, 3, dtype=torch.float64)
+    a = RunningStats().update(x[:100])
+    b = RunningStats().update(x[100:])
+    a.merge(b).merge(RunningStats())
+    assert torch.allclose(a.mean, x.mean(0))
+    assert torch.allclose(a.std, x.std(0, unbiased=False))
+
+
+def test_running_stats_merge_shape_mismatch():
+    a = RunningStats().update(torch.randn(10, 3))
+    b = RunningStats().update(torch.randn(10, 4))
+    with pytest.raises(RuntimeError):
+        a.merge(b)
+
+
+def test_histogram():
+    values = torch.randint(0, 100, (1000,))
+    hist = Histogram(max_bins=50)
+    hist.update(values[:400]).merge(Histogram(max_bins=50).update(values[400:]))
+    assert hist.counts.shape[0] <= 50
+    assert hist.counts.sum() == 1000
+    assert hist.max == values.max().item()
+    assert hist.mean == pytest.approx(values.float().mean().item())
+    assert (
+        hist.counts[:49].tolist() == torch.bincount(values, minlength=49)[:49].tolist()
+    )
+
+
+def test_graph_stats():
+    data_list = [GraphData.random(5, 4, 3) for _ in range(50)]
+    stats = GraphStats().update(GraphBatch.from_data_list(data_list[:20]))
+    for data in data_list[20:]:
+        stats.update(data)
+    batch = GraphBatch.from_data_list(data_list)
+    assert stats.n_graphs == 50
+    assert stats.n_nodes.sum == batch.num_nodes
+    assert stats.n_edges.sum == batch.e.shape[0]
+    assert stats.in_degree.sum == batch.e.shape[0]
+    assert torch.allclose(stats.x.mean.float(), batch.x.mean(0), atol=1e-5)
+    assert torch.allclose(stats.e.mean.float(), batch.e.mean(0), atol=1e-5)
+    assert torch.allclose(
+        stats.g.var.float(), batch.g.var(0, unbiased=False), atol=1e-5
+    )
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_loader_statistics(num_workers):
+    data_list = [GraphData.random(5, 4, 3) for _ in range(100)]
+    loader = GraphDataLoader(data_list, batch_size=16, shuffle=True)
+    stats = loader.statistics(num_workers=num_workers)
+    batch = GraphBatch.from_data_list(data_list)
+    assert stats.n_graphs == 100
+    assert stats.n_nodes.sum == batch.num_nodes
+    assert torch.allclose(stats.x.mean.float(), batch.x.mean(0), atol=1e-5)
+    assert torch.allclose(
+        stats.x.std.float(), batch.x.std(0, unbiased=False), atol=1e-5
+    )
+
+
+def test_loader_statistics_tuples():
+    data_list = [
+        (GraphData.random(5, 4, 3), GraphData.random(1, 2, 3)) for _ in range(10)
+    ]
+    loader = GraphDataLoader(data_list, batch_size=4)
+    input_stats, target_stats = loader.statistics()
+    assert input_stats.x.mean.shape == (5,)
+    assert target_stats.x.mean.shape == (1,)
@@ -0,0 +1,183 @@
+import networkx as nx
+import numpy as np
+import pytest
+import torch
+
+from caldera.data import GraphBatch
+from caldera.data import GraphData
+from caldera.data import GraphDataLoader
+from caldera.data.stream import _read_lines
+from caldera.data.stream import GraphStream
+from caldera.data.stream import ShardDataset
+from caldera.data.stream import shuffle_buffer
+from caldera.data.stream import write_jsonl
+from caldera.data.stream import write_shard
+
+
+def key(data: GraphData):
+    return tuple(data.x.flatten().tolist())
+
+
+def keys(batches):
+    out = []
+    for batch in batches:
+        out += [key(d) for d in batch.to_data_list()]
+    return out
+
+
+@pytest.fixture
+def data_list():
+    torch.manual_seed(0)
+    return [GraphData.random(5, 4, 3) for _ in range(50)]
+
+
+@pytest.fixture(params=["list", "jsonl", "shards"])
+def stream_factory(request, data_list, tmpdir):
+    if request.param == "list":
+        return lambda **kwargs: GraphStream(lambda: iter(data_list), **kwargs)
+    elif request.param == "jsonl":
+        path = str(tmpdir.join("graphs.jsonl"))
+        write_jsonl(path, data_list)
+        return lambda **kwargs: GraphStream.from_jsonl(path, **kwargs)
+    else:
+        directories = [str(tmpdir.join("shard0")), str(tmpdir.join("shard1"))]
+        write_shard(directories[0], data_list[:20])
+        write_shard(directories[1], data_list[20:])
+        return lambda **kwargs: GraphStream.from_shards(directories, **kwargs)
+
+
+def test_stream_sources(stream_factory, data_list):
+    out = list(stream_factory())
+    assert len(out) == len(data_list)
+    for a, b in zip(out, data_list):
+        assert a.allclose(b)
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_stream_workers_each_item_once(stream_factory, data_list, num_workers):
+    loader = GraphDataLoader(stream_factory(), batch_size=4, num_workers=num_workers)
+    assert sorted(keys(loader)) == sorted(key(d) for d in data_list)
+
+
+def test_stream_rank_sharding(stream_factory, data_list):
+    seen = []
+    for rank in range(3):
+        seen += [key(d) for d in stream_factory(rank=rank, world_size=3)]
+    assert sorted(seen) == sorted(key(d) for d in data_list)
+
+
+def test_stream_shuffle_buffer(stream_factory, data_list):
+    stream = stream_factory(shuffle_buffer=10, seed=1)
+    first = [key(d) for d in stream]
+    assert [key(d) for d in stream] == first
+    stream.set_epoch(1)
+    second = [key(d) for d in stream]
+    assert sorted(first) == sorted(key(d) for d in data_list)
+    assert first != [key(d) for d in data_list]
+    assert first != second
+
+
+def test_stream_set_epoch_workers(stream_factory):
+    stream = stream_factory(shuffle_buffer=10, seed=1)
+    loader = GraphDataLoader(stream, batch_size=4, num_workers=2)
+    epochs = []
+    for epoch in range(2):
+        stream.set_epoch(epoch)
+        epochs.append(keys(loader))
+    assert sorted(epochs[0]) == sorted(epochs[1])
+    assert epochs[0] != epochs[1]
+    stream.set_epoch(0)
+    assert keys(loader) == epochs[0]
+
+
+@pytest.mark.parametrize("num_shards", [1, 2, 3, 7])
+def test_read_lines_sharded(tmpdir, num_shards):
+    path = str(tmpdir.join("lines.txt"))
+    lines = ["{}\n".format("x" * (i % 5)) for i in range(40)]
+    with open(path, "w") as f:
+        f.write("".join(lines))
+    out = []
+    for shard in range(num_shards):
+        out += [l.decode() for l in _read_lines(path, shard, num_shards)]
+    assert out == [l for l in lines if l.strip()]
+
+
+def test_jsonl_workers_read_own_lines(data_list, tmpdir):
+    path = str(tmpdir.join("graphs.jsonl"))
+    write_jsonl(path, data_list)
+    stream = GraphStream.from_jsonl(path, rank=1, world_size=2)
+    assert stream.sharded
+    out = [key(d) for d in stream]
+    assert 0 < len(out) < len(data_list)
+
+
+def test_shuffle_buffer():
+    import random
+
+    out = list(shuffle_buffer(range(100), 10, random.Random(0)))
+    assert sorted(out) == list(range(100))
+    # items cannot move earlier than the buffer size allows
+    assert all(x < i + 10 for i, x in enumerate(out))
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_budgeted_batches(stream_factory, data_list, num_workers):
+    stream = stream_factory().batched(max_nodes=20, max_graphs=5)
+    loader = GraphDataLoader(stream, batch_size=None, num_workers=num_workers)
+    batches = list(loader)
+    for batch in batches:
+        assert isinstance(batch, GraphBatch)
+        assert batch.num_graphs <= 5
+        assert batch.num_nodes <= 20 or batch.num_graphs == 1
+    assert sorted(keys(batches)) == sorted(key(d) for d in data_list)
+
+
+def test_budgeted_requires_budget(data_list):
+    with pytest.raises(ValueError):
+        GraphStream(lambda: iter(data_list)).batched()
+
+
+def test_stream_from_networkx():
+    def graphs():
+        for i in range(10):
+            g = nx.path_graph(i + 2, create_using=nx.DiGraph)
+            for _, ndata in g.nodes(data=True):
+                ndata["features"] = np.random.randn(3)
+            for _, _, edata in g.edges(data=True):
+                edata["features"] = np.random.randn(2)
+            g.data = {"features": np.random.randn(1)}
+            yield g
+
+    loader = GraphDataLoader(GraphStream.from_networkx(graphs), batch_size=3)
+    batches = list(loader)
+    assert sum(b.num_graphs for b in batches) == 10
+    assert batches[0].shape == (3, 2, 1)
+
+
+def test_stream_statistics(data_list):
+    stream = GraphStream(lambda: iter(data_list)).batched(max_nodes=30)
+    stats = GraphDataLoader(stream, batch_size=None).statistics()
+    assert stats.n_graphs == len(data_list)
+
+
+def test_shard_dataset(data_list, tmpdir):
+    directories = [str(tmpdir.join("shard0")), str(tmpdir.join("shard1"))]
+    write_shard(directories[0], data_list[:20])
+    write_shard(directories[1], data_list[20:])
+    dataset = ShardDataset(directories)
+    assert len(dataset) == len(data_list)
+    assert [key(dataset[i]) for i in range(len(dataset))] == [key(d) for d in data_list]
+
+    target_dir = str(tmpdir.join("target"))
+    write_shard(target_dir, data_list[::-1])
+    dataset = ShardDataset(directories, target_dir)
+    loader = GraphDataLoader(dataset, batch_size=10, num_workers=2)
+    inputs, targets = [], []
+    for input, target in loader:
+        inputs += [key(d) for d in input.to_data_list()]
+        targets += [key(d) for d in target.to_data_list()]
+    assert inputs == [key(d) for d in data_list]
+    assert targets == [key(d) for d in data_list[::-1]]
+
+    with pytest.raises(ValueError):
+        ShardDataset(directories[0], target_dir)
@@ -0,0 +1,91 @@
+import networkx as nx
+import pytest
+import torch
+
+from caldera.data import GraphBatch
+from caldera.data import GraphData
+from caldera.data import summarize
+from caldera.utils.nx_utils import iter_leaves
+from caldera.utils.nx_utils import iter_roots
+
+
+def nx_digraph(data: GraphData) -> nx.MultiDiGraph:
+    g = nx.MultiDiGraph()
+    g.add_nodes_from(range(data.num_nodes))
+    g.add_edges_from(data.edges.T.tolist())
+    return g
+
+
+def test_summary_graph_data():
+    edges = torch.tensor([[0, 0, 1, 2, 2, 3, 4], [1, 2, 3, 3, 2, 1, 5]])
+    data = GraphData(torch.randn(7, 5), torch.randn(7, 4), torch.randn(1, 3), edges)
+    summary = data.summary()
+    g = nx_digraph(data)
+
+    assert summary.n_nodes.tolist() == [g.number_of_nodes()]
+    assert summary.n_edges.tolist() == [g.number_of_edges()]
+    assert summary.in_degree.tolist() == [g.in_degree(n) for n in g.nodes]
+    assert summary.out_degree.tolist() == [g.out_degree(n) for n in g.nodes]
+    assert torch.where(summary.roots)[0].tolist() == list(iter_roots(g))
+    assert torch.where(summary.leaves)[0].tolist() == list(iter_leaves(g))
+    assert summary.n_self_loops.tolist() == [nx.number_of_selfloops(g)]
+    n = g.number_of_nodes()
+    assert torch.allclose(
+        summary.density, torch.tensor([g.number_of_edges() / (n * (n - 1))])
+    )
+
+
+def test_summary_graph_batch():
+    data_list = [GraphData.random(5, 4, 3) for _ in range(20)]
+    batch = GraphBatch.from_data_list(data_list)
+    summary = summarize(batch)
+    assert summary.n_nodes.shape == (20,)
+    assert summary.in_degree_hist.shape[0] == 20
+    for i, data in enumerate(data_list):
+        expected = data.summary()
+        assert summary.n_nodes[i] == expected.n_nodes[0]
+        assert summary.n_edges[i] == expected.n_edges[0]
+        assert summary.n_roots[i] == expected.n_roots[0]
+        assert summary.n_leaves[i] == expected.n_leaves[0]
+        assert summary.n_self_loops[i] == expected.n_self_loops[0]
+        assert torch.allclose(summary.density[i], expected.density[0])
+        width = expected.in_degree_hist.shape[1]
+        assert torch.all(
+            summary.in_degree_hist[i, :width] == expected.in_degree_hist[0]
+        )
+        assert summary.in_degree_hist[i].sum() == data.num_nodes
+        assert summary.out_degree_hist[i].sum() == data.num_nodes
+
+
+def test_summary_degree_hist_max_bins():
+    # a hub with a very high in degree must not widen the histograms
+    n = 5000
+    edges = torch.stack([torch.arange(1, n), torch.zeros(n - 1, dtype=torch.long)])
+    data = GraphData(torch.randn(n, 5), torch.randn(n - 1, 4), torch.randn(1, 3), edges)
+    batch = GraphBatch.from_data_list([data, GraphData.random(5, 4, 3)])
+    summary = batch.summary(max_bins=16)
+    assert summary.in_degree_hist.shape == (2, 16)
+    assert summary.in_degree_hist[0, -1] == 1
+    assert summary.in_degree_hist[0, 0] == n - 1
+    assert summary.in_degree_hist.sum(1).tolist() == summary.n_nodes.tolist()
+    assert summary.in_degree.max() == n - 1
+    assert summarize(data).in_degree_hist.shape == (1, 1024)
+
+
+def test_summary_invalid_max_bins():
+    with pytest.raises(ValueError):
+        summarize(GraphData.random(5, 4, 3), max_bins=0)
+
+
+def test_summary_empty_batch():
+    summary = GraphBatch.empty(5, 4, 3).summary()
+    assert summary.n_nodes.shape == (0,)
+    assert summary.in_degree_hist.shape == (0, 1)
+    assert summary.scalars()["n_roots"] == 0
+
+
+def test_summary_scalars():
+    batch = GraphBatch.random_batch(10, 5, 4, 3)
+    scalars = batch.summary().scalars()
+    assert scalars["n_nodes_mean"] == pytest.approx(batch.num_nodes / 10)
+    assert scalars["n_nodes_max"] >= scalars["n_nodes_min"]
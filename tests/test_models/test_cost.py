@@ -0,0 +1,57 @@
+import pytest
+import torch
+
+from caldera.data import GraphBatch
+from caldera.models import EncodeCoreDecode
+from caldera.models import estimate_cost
+
+
+@pytest.mark.parametrize("steps", [1, 3])
+def test_estimate_cost_matches_profiler(steps):
+    model = EncodeCoreDecode(latent_sizes=(16, 16, 4)).resolve(5, 4, 3)
+    batch = GraphBatch.random_batch(10, 5, 4, 3)
+    with model.profile() as profiler:
+        model(batch, steps)
+    measured = sum(r["flops"] for r in profiler.report().values())
+
+    cost = estimate_cost(
+        model,
+        batch.g.shape[0],
+        batch.x.shape[0],
+        batch.e.shape[0],
+        5,
+        4,
+        3,
+        steps=steps,
+    )
+    assert cost.flops == measured
+    assert cost.training_flops == 3 * measured
+    assert cost.params == sum(p.numel() for p in model.parameters())
+    assert cost.param_bytes == 4 * cost.params
+    assert cost.intermediate_bytes > 0
+    assert (
+        cost.total_activation_bytes == cost.activation_bytes + cost.intermediate_bytes
+    )
+
+
+def test_estimate_cost_scales_linearly():
+    model = EncodeCoreDecode(latent_sizes=(16, 16, 4))
+    small = estimate_cost(model, 10, 100, 200, 5, 4, 3, steps=2)
+    large = estimate_cost(model, 20, 200, 400, 5, 4, 3, steps=2)
+    assert large.flops == 2 * small.flops
+    assert large.activation_bytes == 2 * small.activation_bytes
+    assert large.params == small.params
+
+
+def test_estimate_cost_does_not_modify_model():
+    model = EncodeCoreDecode(latent_sizes=(16, 16, 4))
+    estimate_cost(model, 10, 100, 200, 5, 4, 3, steps=1)
+    assert not list(model.parameters())
+
+
+def test_estimate_cost_dtype():
+    model = EncodeCoreDecode(latent_sizes=(16, 16, 4))
+    full = estimate_cost(model, 10, 100, 200, 5, 4, 3, steps=1)
+    half = estimate_cost(model, 10, 100, 200, 5, 4, 3, dtype=torch.float16, steps=1)
+    assert half.flops == full.flops
+    assert 2 * half.activation_bytes == full.activation_bytes
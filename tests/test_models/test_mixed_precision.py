@@ -0,0 +1,46 @@
+import pytest
+import torch
+
+from caldera.blocks import Aggregator
+from caldera.blocks import MultiAggregator
+from caldera.data import GraphBatch
+from caldera.models import EncodeCoreDecode
+
+
+@pytest.mark.parametrize("method", ["mean", "max", "min", "add"])
+def test_aggregator_accumulates_in_float32(method):
+    x = torch.rand(1000, 3)
+    idx = torch.zeros(1000, dtype=torch.long)
+    expected = Aggregator(method)(x, idx, dim=0)
+    out = Aggregator(method)(x.to(torch.bfloat16), idx, dim=0)
+    assert out.dtype is torch.bfloat16
+    assert torch.allclose(out.float(), expected, rtol=1e-2)
+
+
+def test_multi_aggregator_bfloat16():
+    block = MultiAggregator(5, ["add", "mean"])
+    x = torch.randn(10, 5)
+    idx = torch.randint(0, 3, (10,))
+    with torch.autocast("cpu", dtype=torch.bfloat16):
+        out = block(x, idx, dim=0, dim_size=3)
+    assert out.shape == (3, 5)
+
+
+def test_encode_core_decode_mixed_precision():
+    batch = GraphBatch.random_batch(10, 5, 4, 3)
+    model = EncodeCoreDecode(latent_sizes=(16, 16, 4))
+    model(batch, steps=1)
+
+    model.mixed_precision()
+    assert model.core.autocast_dtype is torch.bfloat16
+    outputs = model(batch, steps=2)
+    assert outputs[-1].x.dtype is torch.bfloat16
+
+    loss = sum(out.x.float().sum() for out in outputs)
+    loss.backward()
+    for p in model.parameters():
+        assert p.dtype is torch.float32
+
+    model.mixed_precision(False)
+    assert model.core.autocast_dtype is None
+    assert model(batch, steps=1)[-1].x.dtype is torch.float32
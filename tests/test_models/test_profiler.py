@@ -0,0 +1,82 @@
+import pytest
+import torch
+
+from caldera.data import GraphBatch
+from caldera.exceptions import CalderaNetsException
+from caldera.models import EncodeCoreDecode
+
+
+def new_model():
+    return EncodeCoreDecode(latent_sizes=(8, 8, 4), output_sizes=(1, 1, 1)).resolve(
+        5, 4, 3
+    )
+
+
+def test_profile_report():
+    model = new_model()
+    batch = GraphBatch.random_batch(10, 5, 4, 3)
+    with model.profile() as profiler:
+        model(batch, 3)
+    report = profiler.report()
+    assert profiler.forward_count == 1
+    assert report["core.edge_block"]["kind"] == "edge"
+    assert report["core.edge_block"]["calls"] == 3
+    assert report["core.node_block"]["kind"] == "node"
+    assert report["core.global_block"]["kind"] == "global"
+    assert any(r["kind"] == "aggregator" for r in report.values())
+    for r in report.values():
+        assert r["time"] > 0
+        assert r["bytes"] > 0
+    assert report["encoder.edge_block"]["flops"] > 0
+
+
+def test_profile_linear_flops():
+    model = new_model()
+    batch = GraphBatch.random_batch(10, 5, 4, 3)
+    with model.profile() as profiler:
+        model(batch, 1)
+    linear = [
+        m for m in model.encoder.edge_block.modules() if isinstance(m, torch.nn.Linear)
+    ][0]
+    rows = batch.e.shape[0]
+    expected = 2 * rows * linear.in_features * linear.out_features
+    assert profiler.report()["encoder.edge_block"]["flops"] >= expected
+
+
+def test_profile_removes_hooks():
+    model = new_model()
+    batch = GraphBatch.random_batch(10, 5, 4, 3)
+    with model.profile() as profiler:
+        model(batch, 1)
+    n = len(profiler.records)
+    model(batch, 1)
+    assert len(profiler.records) == n
+    for module in model.modules():
+        assert not module._forward_hooks
+        assert not module._forward_pre_hooks
+
+
+def test_profile_unresolved_raises():
+    model = EncodeCoreDecode(latent_sizes=(8, 8, 4))
+    with pytest.raises(CalderaNetsException):
+        with model.profile():
+            pass
+
+
+def test_profile_to_tensorboard():
+    class Writer:
+        def __init__(self):
+            self.scalars = {}
+
+        def add_scalar(self, tag, value, global_step=None):
+            self.scalars[tag] = (value, global_step)
+
+    model = new_model()
+    batch = GraphBatch.random_batch(10, 5, 4, 3)
+    with torch.no_grad(), model.profile() as profiler:
+        model(batch, 2)
+        model(batch, 2)
+    assert profiler.forward_count == 2
+    writer = Writer()
+    profiler.to_tensorboard(writer, global_step=3)
+    assert writer.scalars["profile/core.edge_block/time_per_forward"][1] == 3
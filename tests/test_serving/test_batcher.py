@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+import torch
+
+from caldera.data import GraphBatch
+from caldera.data import GraphData
+from caldera.models import EncodeCoreDecode
+from caldera.serving import MicroBatcher
+from caldera.serving.batcher import run_batched
+
+
+@pytest.fixture
+def model():
+    model = EncodeCoreDecode(latent_sizes=(8, 8, 4), output_sizes=(2, 3, 1))
+    model.resolve(5, 4, 3)
+    return model.eval()
+
+
+def test_run_batched(model):
+    datalist = [GraphData.random(5, 4, 3) for _ in range(10)]
+    results = run_batched(model, datalist, steps=2)
+    assert len(results) == 10
+    for data, out in zip(datalist, results):
+        expected = model(GraphBatch.from_data_list([data]), steps=2)[-1]
+        assert out.x.shape == (data.num_nodes, 3)
+        assert out.e.shape == (data.e.shape[0], 2)
+        assert torch.allclose(out.x, expected.x, atol=1e-5)
+        assert torch.allclose(out.e, expected.e, atol=1e-5)
+        assert torch.allclose(out.g, expected.g, atol=1e-5)
+
+
+@pytest.mark.parametrize("max_batch_size", [1, 4, 64])
+def test_micro_batcher(model, max_batch_size):
+    datalist = [GraphData.random(5, 4, 3) for _ in range(20)]
+
+    async def client(batcher):
+        return await asyncio.gather(*[batcher.predict(data) for data in datalist])
+
+    async def main():
+        batcher = MicroBatcher(
+            model, max_batch_size=max_batch_size, model_kwargs={"steps": 2}
+        )
+        async with batcher:
+            results = await client(batcher)
+        return batcher, results
+
+    batcher, results = asyncio.run(main())
+    assert not batcher.running
+    assert max(batcher.batch_sizes) <= max_batch_size
+    assert sum(batcher.batch_sizes) == 20
+    for data, out in zip(datalist, results):
+        assert out.x.shape[0] == data.num_nodes
+        assert out.e.shape[0] == data.e.shape[0]
+
+    percentiles = batcher.latency_percentiles()
+    assert set(percentiles) == {"p50", "p90", "p99"}
+    assert 0 <= percentiles["p50"] <= percentiles["p99"]
+
+
+def test_micro_batcher_propagates_errors(model):
+    async def main():
+        async with MicroBatcher(model, model_kwargs={"steps": 1}) as batcher:
+            return await batcher.predict(GraphData.random(2, 4, 3))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(main())
@@ -0,0 +1,98 @@
+import pytest
+import torch
+
+from caldera.data import GraphData
+from caldera.data.hashing import graph_hash
+from caldera.models import EncodeCoreDecode
+from caldera.serving import CachedModel
+
+
+def permute(data):
+    p = torch.randperm(data.num_nodes)
+    return GraphData(data.x[p], data.e, data.g, torch.argsort(p)[data.edges])
+
+
+@pytest.mark.parametrize("mode", ["exact", "wl"])
+def test_graph_hash_deterministic(mode):
+    data = GraphData.random(5, 4, 3)
+    assert graph_hash(data, mode) == graph_hash(data.clone(), mode)
+
+
+@pytest.mark.parametrize("mode", ["exact", "wl"])
+def test_graph_hash_features(mode):
+    data = GraphData.random(5, 4, 3)
+    data2 = data.clone()
+    data2.x[0, 0] += 1.0
+    assert graph_hash(data, mode) != graph_hash(data2, mode)
+
+
+def test_graph_hash_wl_permutation_invariant():
+    data = GraphData(
+        torch.randn(6, 5),
+        torch.randn(7, 4),
+        torch.randn(1, 3),
+        torch.randint(0, 6, (2, 7)),
+    )
+    data2 = permute(data)
+    assert graph_hash(data, "wl") == graph_hash(data2, "wl")
+
+
+def test_graph_hash_invalid_mode():
+    with pytest.raises(ValueError):
+        graph_hash(GraphData.random(5, 4, 3), "not a mode")
+
+
+@pytest.fixture
+def model():
+    model = EncodeCoreDecode(latent_sizes=(8, 8, 4))
+    model.resolve(5, 4, 3)
+    return model.eval()
+
+
+def test_cached_model(model):
+    datalist = [GraphData.random(5, 4, 3) for _ in range(5)]
+    cached = CachedModel(model, model_kwargs={"steps": 2})
+    out1 = cached(datalist)
+    assert cached.misses == 5
+    assert cached.hits == 0
+
+    out2 = cached(datalist + [datalist[0].clone()])
+    assert cached.misses == 5
+    assert cached.hits == 6
+    for a, b in zip(out1 + [out1[0]], out2):
+        assert torch.allclose(a.x, b.x)
+        assert torch.allclose(a.g, b.g)
+
+
+def test_cached_model_deduplicates_misses(model):
+    data = GraphData.random(5, 4, 3)
+    cached = CachedModel(model, model_kwargs={"steps": 1})
+    out = cached([data, data.clone(), data])
+    assert cached.misses == 1
+    assert len(cached) == 1
+    assert out[0] is not out[1]
+    assert torch.equal(out[0].x, out[1].x)
+
+
+def test_cached_model_outputs_are_copies(model):
+    data = GraphData.random(5, 4, 3)
+    cached = CachedModel(model, model_kwargs={"steps": 1})
+    (first,) = cached([data])
+    expected = first.x.clone()
+    first.x.add_(1)
+    second, third = cached([data, data])
+    assert second.x.data_ptr() != third.x.data_ptr()
+    second.x.add_(1)
+    assert torch.equal(third.x, expected)
+    assert torch.equal(cached([data])[0].x, expected)
+
+
+@pytest.mark.parametrize("limits", [{"maxsize": 3}, {"max_bytes": 1}])
+def test_cached_model_eviction(model, limits):
+    cached = CachedModel(model, model_kwargs={"steps": 1}, **limits)
+    datalist = [GraphData.random(5, 4, 3) for _ in range(10)]
+    cached(datalist)
+    assert len(cached) <= 3
+    if "max_bytes" in limits:
+        assert len(cached) == 0
+        assert cached.nbytes == 0
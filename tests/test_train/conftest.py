@@ -1,4 +1,58 @@
 """test_train/conftest.py.
 
-Tests blocks and networks are differentiable and trainable
+Factory fixtures for a small dataset of `(input, target)` graphs and a
+matching resolved network.
 """
+import pytest
+import torch
+
+from caldera.data import GraphData
+from caldera.models import EncodeCoreDecode
+
+
+def _make_dataset(n_graphs: int, seed: int = 0):
+    torch.manual_seed(seed)
+    dataset = []
+    for i in range(n_graphs):
+        n_nodes = 2 + i % 7
+        n_edges = 1 + (i * 5) % 23
+        data = GraphData(
+            torch.randn(n_nodes, 3),
+            torch.randn(n_edges, 2),
+            torch.randn(1, 1),
+            torch.randint(0, n_nodes, (2, n_edges)),
+        )
+        target = GraphData(
+            data.x.sum(1, keepdim=True),
+            data.e.sum(1, keepdim=True),
+            data.g.clone(),
+            data.edges,
+        )
+        dataset.append((data, target))
+    return dataset
+
+
+def _make_model():
+    torch.manual_seed(0)
+    return EncodeCoreDecode(
+        latent_sizes=(8, 8, 8), output_sizes=(1, 1, 1), depths=(1, 1, 1)
+    ).resolve(3, 2, 1)
+
+
+@pytest.fixture
+def make_dataset():
+    """Return a function that creates a dataset of `(input, target)` graphs.
+
+    .. code-block:: python
+
+        def test_fit(make_dataset):
+            dataset = make_dataset(40, seed=0)
+    """
+    return _make_dataset
+
+
+@pytest.fixture
+def make_model():
+    """Return a function that creates a small resolved network for
+    :func:`make_dataset` graphs."""
+    return _make_model
@@ -0,0 +1,92 @@
+"""test_distributed.py.
+
+Distributed data parallel training with multiple local processes on CPU
+(gloo backend).
+"""
+import os
+
+import pytest
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+
+from caldera.data import GraphDataLoader
+from caldera.train import EdgeBalancedSampler
+from caldera.train import Trainer
+
+WORLD_SIZE = 2
+
+
+def run(
+    rank: int,
+    world_size: int,
+    directory: str,
+    trainer_kwargs: dict,
+    dataset: list,
+    model: torch.nn.Module,
+):
+    torch.set_num_threads(1)
+    dist.init_process_group(
+        "gloo",
+        init_method="file://" + os.path.join(directory, "store"),
+        rank=rank,
+        world_size=world_size,
+    )
+    try:
+        sampler = EdgeBalancedSampler(dataset, seed=0)
+        loader = GraphDataLoader(dataset, batch_size=4, sampler=sampler)
+        with torch.no_grad():
+            # DistributedDataParallel broadcasts the parameters of rank 0
+            for p in model.parameters():
+                p.add_(rank)
+        trainer = Trainer(model, model_kwargs={"steps": 2}, **trainer_kwargs)
+        losses = trainer.fit(loader, epochs=5)
+        torch.save(
+            {
+                "losses": losses,
+                "indices": list(sampler),
+                "params": [p.detach() for p in trainer.model.parameters()],
+                "steps": trainer.step,
+            },
+            os.path.join(directory, "rank{}.pt".format(rank)),
+        )
+    finally:
+        dist.destroy_process_group()
+
+
+@pytest.mark.skipif(not dist.is_available(), reason="torch.distributed not available")
+@pytest.mark.parametrize(
+    "trainer_kwargs",
+    [{}, {"max_edges_per_step": 80}],
+    ids=["no_accumulation", "edge_budget"],
+)
+def test_distributed_data_parallel(tmpdir, trainer_kwargs, make_dataset, make_model):
+    directory = str(tmpdir)
+    mp.spawn(
+        run,
+        args=(WORLD_SIZE, directory, trainer_kwargs, make_dataset(40), make_model()),
+        nprocs=WORLD_SIZE,
+        join=True,
+    )
+    results = [
+        torch.load(os.path.join(directory, "rank{}.pt".format(r)))
+        for r in range(WORLD_SIZE)
+    ]
+
+    # every rank trained on its own share of the dataset
+    indices = [set(r["indices"]) for r in results]
+    assert not indices[0] & indices[1]
+    assert indices[0] | indices[1] == set(range(40))
+
+    # gradients were averaged, so parameters are identical on all ranks
+    for a, b in zip(results[0]["params"], results[1]["params"]):
+        assert torch.allclose(a, b)
+
+    # all ranks step together
+    assert results[0]["steps"] == results[1]["steps"]
+    if trainer_kwargs:
+        assert results[0]["steps"] < 5 * len(results[0]["indices"]) // 4
+
+    # losses are reduced over ranks
+    assert results[0]["losses"] == pytest.approx(results[1]["losses"])
+    assert results[0]["losses"][-1] < results[0]["losses"][0]
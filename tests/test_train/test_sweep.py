@@ -0,0 +1,79 @@
+import multiprocessing
+import os
+
+import pytest
+import torch
+
+from caldera.models import EncodeCoreDecode
+from caldera.train import grid
+from caldera.train import run_sweep
+from caldera.train.sweep import _init_worker
+
+
+def test_grid():
+    configs = grid(latent_sizes=[(8, 8, 8), (16, 16, 8)], aggregator=["add", "mean"])
+    assert len(configs) == 4
+    assert configs[1] == {"latent_sizes": (8, 8, 8), "aggregator": "mean"}
+
+
+def test_encode_core_decode_aggregator():
+    model = EncodeCoreDecode(aggregator="max")
+    assert model.core.node_block.block_dict["edge_aggregator"].aggregator == "max"
+    with pytest.raises(ValueError):
+        EncodeCoreDecode(aggregator="median")
+
+
+def test_init_worker_threads():
+    threads = torch.get_num_threads()
+    try:
+        _init_worker(1, None)
+        assert torch.get_num_threads() == 1
+    finally:
+        torch.set_num_threads(threads)
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "sched_getaffinity"), reason="requires sched_getaffinity"
+)
+def test_init_worker_no_cores_left():
+    threads = torch.get_num_threads()
+    affinity = os.sched_getaffinity(0)
+    cores = multiprocessing.get_context("spawn").Queue()
+    try:
+        _init_worker(1, cores, timeout=0.01)
+        assert os.sched_getaffinity(0) == affinity
+    finally:
+        torch.set_num_threads(threads)
+
+
+def test_run_sweep(make_dataset):
+    configs = grid(
+        latent_sizes=[(8, 8, 8)], depths=[(1, 1, 1), (2, 2, 2)], aggregator=["add"]
+    )
+    configs.append({"latent_sizes": (8, 8, 8), "aggregator": "median"})
+    configs.append({"latent_sizes": (8, 8, 8), "lr": 1e-2, "steps": 2})
+    completed = []
+    results = run_sweep(
+        configs,
+        make_dataset(30),
+        make_dataset(10, seed=1),
+        epochs=3,
+        batch_size=10,
+        processes=2,
+        threads_per_worker=1,
+        callback=completed.append,
+    )
+    assert [r.index for r in results] == list(range(len(configs)))
+    assert sorted(r.index for r in completed) == list(range(len(configs)))
+    for result, config in zip(results, configs):
+        assert result.config == config
+        if config.get("aggregator") == "median":
+            assert "ValueError" in result.error
+            continue
+        assert result.error is None
+        assert len(result.losses) == 3
+        assert result.loss < result.losses[0]
+        assert result.eval_loss is not None
+        assert result.steps == 9
+        assert result.graphs_per_second > 0
+        assert result.edges_per_second > 0
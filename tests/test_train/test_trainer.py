@@ -0,0 +1,264 @@
+import os
+import time
+
+import pytest
+import torch
+
+from caldera.data import GraphDataLoader
+from caldera.exceptions import CalderaNetsException
+from caldera.models import EncodeCoreDecode
+from caldera.train import AsyncCheckpointer
+from caldera.train import EdgeBalancedSampler
+from caldera.train import graph_mse
+from caldera.train import Trainer
+
+
+def test_trainer_fit(make_dataset, make_model):
+    dataset = make_dataset(40)
+    loader = GraphDataLoader(dataset, batch_size=8, shuffle=True)
+    trainer = Trainer(
+        make_model(),
+        optimizer=None,
+        model_kwargs={"steps": 2},
+    )
+    before = trainer.evaluate(loader)
+    losses = trainer.fit(loader, epochs=10)
+    assert len(losses) == 10
+    assert trainer.epoch == 10
+    assert losses[-1] < losses[0]
+    assert trainer.evaluate(loader) < before
+    assert not trainer.distributed
+
+
+def test_trainer_requires_resolved_model():
+    with pytest.raises(CalderaNetsException):
+        Trainer(EncodeCoreDecode())
+
+
+def test_graph_mse(make_dataset):
+    (data, target), _ = make_dataset(2)
+    out = data.__class__(target.x + 1, target.e + 1, target.g + 1, target.edges)
+    assert graph_mse(out, target).item() == pytest.approx(3.0)
+    assert graph_mse([out, target], target).item() == pytest.approx(1.5)
+
+
+@pytest.mark.parametrize("n_graphs", [40, 41, 3])
+@pytest.mark.parametrize("num_replicas", [1, 2, 3])
+def test_edge_balanced_sampler_partition(n_graphs, num_replicas, make_dataset):
+    dataset = make_dataset(n_graphs)
+    samplers = [
+        EdgeBalancedSampler(dataset, num_replicas=num_replicas, rank=r, seed=1)
+        for r in range(num_replicas)
+    ]
+    indices = [list(s) for s in samplers]
+    assert all(len(i) == len(samplers[0]) for i in indices)
+    flat = sum(indices, [])
+    assert set(flat) == set(range(n_graphs))
+    assert len(flat) - n_graphs < num_replicas
+
+
+@pytest.mark.parametrize(("n_graphs", "num_replicas"), [(1, 5), (2, 7), (3, 16)])
+def test_edge_balanced_sampler_more_replicas_than_graphs(
+    n_graphs, num_replicas, make_dataset
+):
+    dataset = make_dataset(n_graphs)
+    indices = [
+        list(EdgeBalancedSampler(dataset, num_replicas=num_replicas, rank=r))
+        for r in range(num_replicas)
+    ]
+    assert all(len(i) == 1 for i in indices)
+    assert {i[0] for i in indices} == set(range(n_graphs))
+
+
+def test_edge_balanced_sampler_edge_counts():
+    class Dataset:
+        def __len__(self):
+            return 4
+
+        def __getitem__(self, idx):
+            raise AssertionError("items should not be loaded")
+
+    sampler = EdgeBalancedSampler(
+        Dataset(), num_replicas=2, rank=0, edge_counts=[4, 3, 2, 1]
+    )
+    assert len(sampler) == 2
+    assert sorted(sum(sampler.partition(), [])) == [0, 1, 2, 3]
+
+
+def test_edge_balanced_sampler_balances_edges():
+    sizes = torch.randint(1, 1000, (1001,)).tolist()
+    dataset = list(range(len(sizes)))
+    loads = []
+    for rank in range(4):
+        sampler = EdgeBalancedSampler(
+            dataset, num_replicas=4, rank=rank, edge_counts=sizes, seed=0
+        )
+        loads.append([sizes[i] for i in sampler])
+    totals = [sum(load) for load in loads]
+    assert max(totals) - min(totals) <= max(sizes)
+    # the i-th graphs of each replica have similar sizes
+    for step in zip(*loads):
+        assert max(step) - min(step) < 0.1 * max(sizes)
+
+
+def test_edge_balanced_sampler_epochs(make_dataset):
+    dataset = make_dataset(20)
+    sampler = EdgeBalancedSampler(dataset, num_replicas=2, rank=0)
+    first = list(sampler)
+    assert list(sampler) == first
+    sampler.set_epoch(1)
+    assert list(sampler) != first
+    unshuffled = EdgeBalancedSampler(dataset, num_replicas=2, rank=0, shuffle=False)
+    unshuffled.set_epoch(1)
+    assert list(unshuffled) == list(
+        EdgeBalancedSampler(dataset, num_replicas=2, rank=0, shuffle=False)
+    )
+
+
+def test_edge_balanced_sampler_invalid_rank(make_dataset):
+    with pytest.raises(ValueError):
+        EdgeBalancedSampler(make_dataset(4), num_replicas=2, rank=2)
+
+
+def global_mse(outputs, target):
+    # mean over graphs, so accumulated steps equal full batch steps
+    return ((outputs[-1].g - target.g) ** 2).mean()
+
+
+def test_trainer_accumulation_matches_full_batch(make_dataset, make_model):
+    dataset = make_dataset(8)
+    full = Trainer(make_model(), loss_fn=global_mse, model_kwargs={"steps": 2})
+    accumulated = Trainer(
+        make_model(),
+        loss_fn=global_mse,
+        model_kwargs={"steps": 2},
+        max_batches_per_step=3,
+    )
+    for trainer in [full, accumulated]:
+        trainer.optimizer = torch.optim.SGD(trainer.model.parameters(), lr=0.1)
+    full.fit(GraphDataLoader(dataset, batch_size=8))
+    accumulated.fit(GraphDataLoader(dataset, batch_size=3))
+    assert full.step == accumulated.step == 1
+    assert accumulated.history[0].batches == 3
+    assert accumulated.history[0].graphs == 8
+    assert accumulated.history[0].loss.item() == pytest.approx(
+        full.history[0].loss.item()
+    )
+    for a, b in zip(full.model.parameters(), accumulated.model.parameters()):
+        assert torch.allclose(a, b, atol=1e-6)
+
+
+def test_trainer_edge_budget(make_dataset, make_model):
+    dataset = make_dataset(40)
+    loader = GraphDataLoader(dataset, batch_size=2)
+    trainer = Trainer(
+        make_model(),
+        model_kwargs={"steps": 1},
+        max_edges_per_step=60,
+    )
+    trainer.fit(loader, epochs=2)
+    assert trainer.step == len(trainer.history)
+    for epoch in range(2):
+        steps = [m for m in trainer.history if m.epoch == epoch]
+        assert sum(m.graphs for m in steps) == 40
+        assert sum(m.batches for m in steps) == 20
+        assert all(m.edges >= 60 for m in steps[:-1])
+        assert all(m.batches > 1 for m in steps[:-1])
+
+
+@pytest.mark.parametrize(
+    "budget", [{"max_nodes_per_step": 10**9}, {"max_edges_per_step": 10**9}]
+)
+def test_trainer_size_budget_only(budget, make_dataset, make_model):
+    loader = GraphDataLoader(make_dataset(10), batch_size=2)
+    trainer = Trainer(make_model(), model_kwargs={"steps": 1}, **budget)
+    trainer.fit(loader)
+    # the budget is never reached, so the epoch is a single step
+    assert trainer.step == 1
+    assert trainer.history[0].batches == 5
+
+
+def test_trainer_batch_budget_with_size_budget(make_dataset, make_model):
+    loader = GraphDataLoader(make_dataset(10), batch_size=2)
+    trainer = Trainer(
+        make_model(),
+        model_kwargs={"steps": 1},
+        max_batches_per_step=2,
+        max_edges_per_step=10**9,
+    )
+    trainer.fit(loader)
+    assert [m.batches for m in trainer.history] == [2, 2, 1]
+
+
+def test_trainer_metrics_and_eval(make_dataset, make_model):
+    dataset = make_dataset(20)
+    loader = GraphDataLoader(dataset, batch_size=5)
+    trainer = Trainer(make_model(), model_kwargs={"steps": 1})
+    metrics = []
+    trainer.fit(
+        loader, epochs=2, eval_loader=loader, eval_every=2, callback=metrics.append
+    )
+    assert metrics == trainer.history
+    assert [m.step for m in metrics] == list(range(1, 9))
+    assert [m.eval_loss is not None for m in metrics] == [False, True] * 4
+    assert [s for s, _ in trainer.eval_history] == [2, 4, 6, 8]
+    for m in metrics:
+        assert m.graphs == 5
+        assert m.nodes > 0 and m.edges > 0
+        assert 0 <= m.data_seconds <= m.seconds
+        assert m.edges_per_second > 0
+
+    trainer.fit(loader, epochs=1, eval_loader=loader)
+    assert trainer.eval_history[-1][0] == 12
+
+
+def test_trainer_step_seconds_exclude_eval(make_dataset, make_model):
+    class SlowEvalTrainer(Trainer):
+        def evaluate(self, loader):
+            time.sleep(0.2)
+            return 0.0
+
+    loader = GraphDataLoader(make_dataset(10), batch_size=5)
+    trainer = SlowEvalTrainer(make_model(), model_kwargs={"steps": 1})
+    trainer.fit(loader, epochs=2, eval_loader=loader, eval_every=1)
+    assert len(trainer.eval_history) == 4
+    for m in trainer.history:
+        assert m.seconds < 0.2
+
+
+def test_trainer_async_checkpoints(tmpdir, make_dataset, make_model):
+    dataset = make_dataset(20)
+    loader = GraphDataLoader(dataset, batch_size=5)
+    trainer = Trainer(
+        make_model(),
+        model_kwargs={"steps": 1},
+        checkpoint_dir=str(tmpdir),
+        keep_checkpoints=2,
+    )
+    trainer.fit(loader, epochs=3, checkpoint_every=3)
+    trainer.close()
+    assert sorted(os.listdir(str(tmpdir))) == [
+        "checkpoint-00000009.pt",
+        "checkpoint-00000012.pt",
+    ]
+
+    restored = Trainer(make_model(), model_kwargs={"steps": 1})
+    restored.load_checkpoint(os.path.join(str(tmpdir), "checkpoint-00000012.pt"))
+    assert restored.step == 12
+    assert restored.epoch == 2
+    for a, b in zip(trainer.model.parameters(), restored.model.parameters()):
+        assert torch.equal(a, b)
+
+
+def test_checkpoint_snapshot_is_a_copy(tmpdir, make_model):
+    model = make_model()
+    checkpointer = AsyncCheckpointer(str(tmpdir))
+    path = checkpointer.save({"model": model.state_dict()}, 1)
+    with torch.no_grad():
+        for p in model.parameters():
+            p.add_(1)
+    checkpointer.close()
+    state = torch.load(path)["model"]
+    for k, v in model.state_dict().items():
+        if v.is_floating_point() and v.numel():
+            assert not torch.equal(state[k], v)
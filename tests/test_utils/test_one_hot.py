@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+import torch
+
+from caldera.utils.torch_utils import to_one_hot
+
+
+def test_to_one_hot_torch():
+    arr = torch.randint(0, 5, (100,))
+    oh = to_one_hot(arr, 5)
+    assert oh.shape == (100, 5)
+    assert oh.dtype == torch.get_default_dtype()
+    assert torch.all(oh.argmax(1) == arr)
+    assert torch.all(oh.sum(1) == 1)
+
+
+def test_to_one_hot_numpy():
+    arr = np.random.randint(0, 5, (100,))
+    oh = to_one_hot(arr, 5)
+    assert isinstance(oh, np.ndarray)
+    assert oh.shape == (100, 5)
+    assert oh.dtype == np.float64
+    assert np.all(oh.argmax(1) == arr)
+    assert np.all(oh.sum(1) == 1)
+
+
+def test_to_one_hot_dtype_and_device():
+    arr = torch.tensor([0, 2, 1])
+    oh = to_one_hot(arr, 3, dtype=torch.uint8, device="cpu")
+    assert oh.dtype == torch.uint8
+    assert oh.tolist() == [[1, 0, 0], [0, 0, 1], [0, 1, 0]]
+    assert to_one_hot(np.array([1]), 2, dtype=np.float32).dtype == np.float32
+
+
+def test_to_one_hot_nd():
+    arr = torch.randint(0, 4, (3, 7))
+    oh = to_one_hot(arr, 4)
+    assert oh.shape == (3, 7, 4)
+    assert np.array_equal(to_one_hot(arr.numpy(), 4), oh.numpy())
+
+
+def test_to_one_hot_sparse_torch():
+    arr = torch.randint(0, 5, (20,))
+    oh = to_one_hot(arr, 5, sparse=True)
+    assert oh.is_sparse
+    assert torch.all(oh.to_dense() == to_one_hot(arr, 5))
+
+
+def test_to_one_hot_sparse_numpy():
+    pytest.importorskip("scipy")
+    arr = np.random.randint(0, 5, (20,))
+    oh = to_one_hot(arr, 5, sparse=True)
+    assert np.array_equal(oh.toarray(), to_one_hot(arr, 5))
+
+
+@pytest.mark.parametrize("arr", [torch.zeros(3, 2).long(), np.zeros((3, 2), dtype=int)])
+def test_to_one_hot_sparse_requires_1d(arr):
+    with pytest.raises(ValueError):
+        to_one_hot(arr, 5, sparse=True)
+    assert to_one_hot(arr, 5).shape == (3, 2, 5)
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+@pytest.mark.parametrize("values", [[0, 5, 1], [0, -1, 1]], ids=["over", "negative"])
+def test_to_one_hot_invalid_class_torch(values, sparse):
+    with pytest.raises(ValueError):
+        to_one_hot(torch.tensor(values), 5, sparse=sparse)
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+@pytest.mark.parametrize("values", [[0, 5, 1], [0, -1, 1]], ids=["over", "negative"])
+def test_to_one_hot_invalid_class_numpy(values, sparse):
+    # indices are checked before scipy is imported
+    with pytest.raises(ValueError):
+        to_one_hot(np.array(values), 5, sparse=sparse)
+
+
+def test_to_one_hot_empty():
+    assert to_one_hot(torch.zeros(0).long(), 5, sparse=True).shape == (0, 5)
+    assert to_one_hot(np.zeros(0, dtype=int), 5).shape == (0, 5)
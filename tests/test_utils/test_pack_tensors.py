@@ -0,0 +1,52 @@
+import pytest
+import torch
+
+from caldera.utils import pack_tensors
+
+
+def test_pack_tensors():
+    tensors = [
+        torch.randn(10, 5),
+        torch.randint(0, 10, (2, 7)),
+        torch.randn(3, dtype=torch.float64),
+        torch.empty(0, 4),
+        torch.tensor([True, False, True]),
+    ]
+    buffer, views = pack_tensors(tensors, alignment=64)
+    assert buffer.dtype == torch.uint8
+    for t, v in zip(tensors, views):
+        assert v.dtype == t.dtype
+        assert v.shape == t.shape
+        assert torch.all(v == t)
+        assert v.untyped_storage().data_ptr() == buffer.untyped_storage().data_ptr()
+        assert (v.data_ptr() - buffer.data_ptr()) % 64 == 0
+
+
+@pytest.mark.parametrize("alignment", [1, 3, 4])
+def test_pack_tensors_element_alignment(alignment):
+    tensors = [torch.tensor([True]), torch.randn(3, dtype=torch.float64)]
+    buffer, views = pack_tensors(tensors, alignment=alignment)
+    for t, v in zip(tensors, views):
+        assert torch.all(v == t)
+        offset = v.data_ptr() - buffer.data_ptr()
+        assert offset % alignment == 0
+        assert offset % t.element_size() == 0
+
+
+@pytest.mark.parametrize("alignment", [0, -1])
+def test_pack_tensors_invalid_alignment(alignment):
+    with pytest.raises(ValueError):
+        pack_tensors([torch.randn(3)], alignment=alignment)
+
+
+def test_pack_tensors_copies():
+    x = torch.randn(10)
+    _, (v,) = pack_tensors([x])
+    v.zero_()
+    assert not torch.all(x == 0)
+
+
+def test_pack_tensors_shared():
+    buffer, views = pack_tensors([torch.randn(10), torch.arange(5)], shared=True)
+    assert buffer.is_shared()
+    assert all(v.is_shared() for v in views)
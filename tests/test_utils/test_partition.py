@@ -0,0 +1,80 @@
+import pytest
+import torch
+
+from caldera.utils import partition
+
+
+def grid_edges(size: int, shuffle: bool = True):
+    idx = torch.arange(size * size).view(size, size)
+    edges = torch.cat(
+        [
+            torch.stack([idx[:, :-1].flatten(), idx[:, 1:].flatten()]),
+            torch.stack([idx[:-1].flatten(), idx[1:].flatten()]),
+        ],
+        1,
+    )
+    if shuffle:
+        edges = torch.randperm(size * size)[edges]
+    return edges
+
+
+def cut(parts, edges):
+    return (parts[edges[0]] != parts[edges[1]]).float().mean().item()
+
+
+@pytest.mark.parametrize("n_parts", [2, 7, 16])
+def test_partition_is_balanced(n_parts):
+    torch.manual_seed(0)
+    edges = grid_edges(40)
+    parts = partition(edges, 1600, n_parts, imbalance=1.1, seed=0)
+    assert parts.shape == (1600,)
+    sizes = torch.bincount(parts, minlength=n_parts)
+    assert sizes.max() <= 1.1 * 1600 / n_parts + 1
+    assert sizes.min() >= 1600 / n_parts / 1.1 - 1
+
+
+def test_partition_has_small_cut():
+    torch.manual_seed(0)
+    edges = grid_edges(60)
+    parts = partition(edges, 3600, 16, seed=0)
+    random_parts = torch.randint(0, 16, (3600,))
+    assert cut(parts, edges) < 0.15
+    assert cut(random_parts, edges) > 0.8
+
+
+def test_partition_planted_clusters():
+    torch.manual_seed(0)
+    k, size = 8, 100
+    n = k * size
+    src = torch.randint(0, n, (n * 8,))
+    dst = (src // size) * size + torch.randint(0, size, (n * 8,))
+    perm = torch.randperm(n)
+    edges = torch.stack([perm[src], perm[dst]])
+    parts = partition(edges, n, k, seed=0)
+    assert cut(parts, edges) < 0.1
+
+
+def test_partition_is_seeded():
+    edges = grid_edges(20)
+    assert torch.all(
+        partition(edges, 400, 4, seed=1) == partition(edges, 400, 4, seed=1)
+    )
+
+
+def test_partition_isolated_nodes_and_loops():
+    edges = torch.tensor([[0, 1, 2, 2], [1, 0, 3, 2]])
+    parts = partition(edges, 10, 2, seed=0)
+    assert torch.bincount(parts, minlength=2).tolist() == [5, 5]
+    assert parts[0] == parts[1]
+    assert parts[2] == parts[3]
+
+
+def test_partition_no_edges():
+    parts = partition(torch.zeros(2, 0, dtype=torch.long), 10, 3)
+    assert torch.bincount(parts).tolist() == [4, 3, 3]
+
+
+@pytest.mark.parametrize("n_parts", [0, 11])
+def test_partition_invalid_parts(n_parts):
+    with pytest.raises(ValueError):
+        partition(grid_edges(2), 10, n_parts)
@@ -0,0 +1,73 @@
+import pytest
+import torch
+
+from caldera.data import GraphData
+from caldera.utils import index_to_slice
+from caldera.utils import same_storage
+from caldera.utils import select_columns
+
+
+@pytest.mark.parametrize(
+    ("index", "expected"),
+    [
+        ([2, 3, 4], slice(2, 5, 1)),
+        ([0, 2, 4, 6], slice(0, 7, 2)),
+        ([5], slice(5, 6)),
+        ([], slice(0, 0)),
+        ([-2, -1], slice(8, 10, 1)),
+        (torch.tensor([1, 4, 7]), slice(1, 8, 3)),
+        (torch.arange(10) % 2 == 1, slice(1, 10, 2)),
+        ([0, 1, 3], None),
+        ([3, 2, 1], None),
+        ([1, 1], None),
+        (slice(1, 3), slice(1, 3)),
+    ],
+)
+def test_index_to_slice(index, expected):
+    assert index_to_slice(index, 10) == expected
+
+
+@pytest.mark.parametrize(
+    ("index", "is_view"),
+    [
+        (None, True),
+        ([1, 2, 3], True),
+        ([0, 3, 6], True),
+        (torch.tensor([True, False] * 5), True),
+        ([0, 2, 3], False),
+        (torch.tensor([3, 0]), False),
+    ],
+)
+def test_select_columns(index, is_view):
+    x = torch.randn(20, 10)
+    y = select_columns(x, index)
+    expected = x if index is None else x[:, torch.as_tensor(index)]
+    assert torch.equal(y, expected)
+    assert same_storage(x, y) == is_view
+
+
+@pytest.mark.parametrize("index", [[3, 4, 5], [-7], [5], [-6, -5], torch.arange(7)])
+def test_select_columns_out_of_range(index):
+    x = torch.randn(3, 5)
+    with pytest.raises(IndexError):
+        select_columns(x, index)
+
+
+def test_select_columns_negative():
+    x = torch.randn(3, 5)
+    assert torch.equal(select_columns(x, [-5]), x[:, [0]])
+    assert torch.equal(select_columns(x, [-2, -1]), x[:, 3:])
+
+
+def test_mask_out_of_range():
+    data = GraphData.random(5, 4, 3)
+    with pytest.raises(IndexError):
+        data.mask(list(range(7)), None, None)
+
+
+def test_same_storage_non_contiguous():
+    x = torch.randn(10, 10)
+    assert same_storage(x, x[:, :3])
+    assert same_storage(x[:, ::2], x)
+    assert not same_storage(x[:, :3], x[:, 5:])
+    assert not same_storage(x, x[:, :3].clone())
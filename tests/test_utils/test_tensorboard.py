@@ -0,0 +1,115 @@
+import os
+import threading
+
+import pytest
+import torch
+
+from caldera.utils.tensorboard import _next_directory
+from caldera.utils.tensorboard import AsyncWriter
+
+
+class Writer:
+    def __init__(self, gate=None):
+        self.calls = []
+        self.flushes = 0
+        self.closed = False
+        self.gate = gate
+
+    def add_scalar(self, tag, value, global_step=None):
+        if self.gate is not None:
+            self.gate.wait()
+        self.calls.append(("scalar", tag, value, global_step))
+
+    def add_histogram(self, tag, values, global_step=None):
+        self.calls.append(("histogram", tag, values, global_step))
+
+    def flush(self):
+        self.flushes += 1
+
+    def close(self):
+        self.closed = True
+
+
+def test_async_writer():
+    writer = Writer()
+    with AsyncWriter(writer) as async_writer:
+        loss = torch.tensor(2.0)
+        latents = torch.ones(10, 4)
+        async_writer.add_scalar("loss", loss, global_step=1)
+        async_writer.add_histogram("latents", latents, global_step=1)
+        latents.add_(1)
+        async_writer.flush()
+        assert writer.flushes >= 1
+        assert async_writer.pending == 0
+        with pytest.raises(AttributeError):
+            async_writer.add_unknown
+    assert writer.closed
+    assert writer.calls[0] == ("scalar", "loss", 2.0, 1)
+    assert isinstance(writer.calls[0][2], float)
+    assert torch.all(writer.calls[1][2] == 1)
+    with pytest.raises(RuntimeError):
+        async_writer.add_scalar("loss", 1.0)
+
+
+@pytest.mark.parametrize(
+    ("drop", "expected"), [("oldest", [0, 3, 4]), ("newest", [0, 1, 2])]
+)
+def test_async_writer_drop(drop, expected):
+    gate = threading.Event()
+    writer = Writer(gate)
+    async_writer = AsyncWriter(writer, max_queue=2, drop=drop)
+    async_writer.add_scalar("x", 0)
+    # wait until the background thread is blocked on the first call
+    while async_writer._queue:
+        pass
+    for i in range(1, 5):
+        async_writer.add_scalar("x", i)
+    assert async_writer.dropped == 2
+    gate.set()
+    async_writer.close()
+    assert [c[2] for c in writer.calls] == expected
+
+
+def test_async_writer_block():
+    gate = threading.Event()
+    writer = Writer(gate)
+    async_writer = AsyncWriter(writer, max_queue=1, drop="block")
+    thread = threading.Thread(
+        target=lambda: [async_writer.add_scalar("x", i) for i in range(5)]
+    )
+    thread.start()
+    thread.join(0.1)
+    assert thread.is_alive()
+    gate.set()
+    thread.join()
+    async_writer.close()
+    assert [c[2] for c in writer.calls] == list(range(5))
+    assert async_writer.dropped == 0
+
+
+def test_async_writer_invalid():
+    with pytest.raises(ValueError):
+        AsyncWriter(Writer(), drop="random")
+
+
+def test_next_directory(tmpdir):
+    prefix = str(tmpdir.join("run"))
+    assert _next_directory(prefix, "_test") == prefix + "0000_test"
+    for i in [0, 1, 3]:
+        os.makedirs(prefix + "%04d" % i + "_test")
+    assert _next_directory(prefix, "_test") == prefix + "0002_test"
+    assert _next_directory(prefix) == prefix + "0000"
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="requires cuda")
+def test_async_writer_cuda():
+    writer = Writer()
+    with AsyncWriter(writer) as async_writer:
+        latents = torch.ones(1000, 4, device="cuda")
+        async_writer.add_histogram("latents", latents, global_step=1)
+        async_writer.add_scalar("loss", latents.sum(), global_step=1)
+        latents.add_(1)
+    histogram, loss = writer.calls
+    assert histogram[2].device.type == "cpu"
+    assert torch.all(histogram[2] == 1)
+    assert loss[2] == 4000.0
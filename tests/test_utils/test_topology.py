@@ -0,0 +1,90 @@
+import networkx as nx
+import pytest
+import torch
+
+from caldera.data import GraphBatch
+from caldera.data import GraphData
+from caldera.utils import dag_depth
+from caldera.utils import leaf_mask
+from caldera.utils import root_mask
+from caldera.utils import topological_levels
+from caldera.utils import topological_order
+from caldera.utils.nx_utils import iter_leaves
+from caldera.utils.nx_utils import iter_roots
+
+
+def random_dag(n_nodes: int, n_edges: int) -> torch.LongTensor:
+    edges = torch.randint(0, n_nodes, (2, n_edges))
+    edges = torch.stack([edges.min(0)[0], edges.max(0)[0]])
+    edges = edges[:, edges[0] != edges[1]]
+    perm = torch.randperm(n_nodes)
+    return perm[edges]
+
+
+def to_nx(edges: torch.LongTensor, n_nodes: int) -> nx.DiGraph:
+    g = nx.DiGraph()
+    g.add_nodes_from(range(n_nodes))
+    g.add_edges_from(edges.T.tolist())
+    return g
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_roots_and_leaves(seed):
+    torch.manual_seed(seed)
+    edges = random_dag(30, 50)
+    g = to_nx(edges, 30)
+    assert torch.where(root_mask(edges, 30))[0].tolist() == list(iter_roots(g))
+    assert torch.where(leaf_mask(edges, 30))[0].tolist() == list(iter_leaves(g))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_topological_levels(seed):
+    torch.manual_seed(seed)
+    edges = random_dag(50, 100)
+    levels = topological_levels(edges, 50)
+    g = to_nx(edges, 50)
+    for i, generation in enumerate(nx.topological_generations(g)):
+        for n in generation:
+            assert levels[n] == i
+
+
+def test_topological_order():
+    edges = random_dag(50, 100)
+    order = topological_order(edges, 50)
+    position = torch.empty_like(order)
+    position[order] = torch.arange(50)
+    assert torch.all(position[edges[0]] < position[edges[1]])
+
+
+def test_topological_levels_cycle():
+    edges = torch.tensor([[0, 1, 2, 3], [1, 2, 1, 4]])
+    levels = topological_levels(edges, 6)
+    assert levels.tolist() == [0, -1, -1, 0, 1, 0]
+    with pytest.raises(ValueError):
+        topological_order(edges, 6)
+
+
+def test_dag_depth_batch():
+    data_list = []
+    for _ in range(10):
+        n = torch.randint(1, 20, (1,)).item()
+        edges = random_dag(n, 30)
+        data_list.append(
+            GraphData(
+                torch.randn(n, 1),
+                torch.randn(edges.shape[1], 1),
+                torch.randn(1, 1),
+                edges,
+            )
+        )
+    batch = GraphBatch.from_data_list(data_list)
+    depth = dag_depth(batch.edges, batch.node_idx, batch.num_graphs)
+    for d, data in zip(depth, data_list):
+        g = to_nx(data.edges, data.num_nodes)
+        assert d == len(list(nx.topological_generations(g)))
+
+
+def test_dag_depth_cyclic_and_empty():
+    edges = torch.tensor([[0, 1, 2], [1, 0, 3]])
+    node_idx = torch.tensor([0, 0, 1, 1])
+    assert dag_depth(edges, node_idx, 3).tolist() == [-1, 2, 0]